@@ -0,0 +1,139 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Content Compression
+    ~~~~~~~~~~~~~~~~~~~
+
+    Encrypt & decrypt a content mix (short/long text, web pages, chat
+    histories) without compression, with zlib and with lzma, and report
+    message size against CPU time.
+
+    usage:
+        python benchmarks/compression.py [count]
+
+    NOTICE: crypto keys come from 'dimplugins', install it first.
+"""
+
+import os
+import random
+import sys
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import ID, Envelope, InstantMessage, SecureMessage
+from dimp import TextContent, PageContent, CombineContent
+from dimp import SymmetricKey, SymmetricAlgorithms
+from dimp import json_encode, json_decode
+from dimp.utils import ContentCompressor
+from dimp.utils.transform import encrypt_message, decrypt_message
+
+
+WORDS = ('the of and to in is you that it he was for on are as with his they at be this have from or one had by '
+         'word but not what all were we when your can said there use an each which she do how their if will up '
+         'other about out many then them these so some her would make like him into time has look two more write '
+         'go see number no way could people my than first water been call who oil its now find long down day did '
+         'message group member station meta visa document receipt forward secret key data signature').split()
+
+
+def sentence(count: int) -> str:
+    return ' '.join(random.choice(WORDS) for _ in range(count)).capitalize() + '.'
+
+
+def paragraph(size: int) -> str:
+    text = ''
+    while len(text) < size:
+        text += sentence(random.randint(6, 18)) + ' '
+    return text
+
+
+def html(size: int) -> str:
+    body = ''
+    while len(body) < size:
+        body += '<div class="post"><h2>%s</h2><p>%s</p><a href="https://example.com/%d">more</a></div>\n' % (
+            sentence(5), paragraph(300), random.getrandbits(32))
+    return '<html><head><title>%s</title></head><body>\n%s</body></html>' % (sentence(4), body)
+
+
+def prepare(count: int):
+    sender = ID.parse(identifier='moky@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ')
+    receiver = ID.parse(identifier='hulk@4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj')
+
+    def message(body) -> InstantMessage:
+        return InstantMessage.create(head=Envelope.create(sender=sender, receiver=receiver), body=body)
+
+    def history():
+        return CombineContent.create(title='Chat history', messages=[
+            message(TextContent.create(text=sentence(random.randint(3, 30)))) for _ in range(40)
+        ])
+
+    mix = [
+        ('short text', lambda: TextContent.create(text=sentence(random.randint(3, 20))), 60),
+        ('long text', lambda: TextContent.create(text=paragraph(random.randint(2048, 8192))), 20),
+        ('web page', lambda: PageContent.create(url='https://example.com/', html=html(random.randint(8192, 32768)),
+                                                title='Page', desc=None, icon=None), 10),
+        ('history', history, 10),
+    ]
+    kinds = [(name, build) for name, build, weight in mix for _ in range(weight)]
+    items = []
+    for _ in range(count):
+        name, build = random.choice(kinds)
+        items.append((name, message(build())))
+    return [name for name, _, _ in mix], items
+
+
+def run(items, password, compressor):
+    expected = {id(msg): json_decode(string=json_encode(container=msg.content.to_dict())) for _, msg in items}
+    sizes = {}
+    start = time.perf_counter()
+    for name, msg in items:
+        info = encrypt_message(msg, password=password, keys=None, compressor=compressor)
+        total, number = sizes.get(name, (0, 0))
+        sizes[name] = (total + len(info['data']), number + 1)
+        plain = decrypt_message(SecureMessage.parse(msg=info), receiver='', keys=[], password=password)
+        assert plain is not None and plain['content'] == expected[id(msg)], 'round trip failed'
+    return sizes, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ExtensionLoader().load()
+    PluginLoader().load()
+    random.seed(1189795)
+    kinds, items = prepare(count)
+    password = SymmetricKey.generate(algorithm=SymmetricAlgorithms.AES)
+    modes = [
+        ('none', None),
+        ('zlib', ContentCompressor(algorithm=ContentCompressor.ZLIB)),
+        ('lzma', ContentCompressor(algorithm=ContentCompressor.LZMA)),
+    ]
+    results = {mode: run(items, password=password, compressor=compressor) for mode, compressor in modes}
+    base_sizes, base_time = results['none']
+    print('%-12s %6s %12s %12s %12s' % ('kind', 'count', 'none', 'zlib', 'lzma'))
+    for name in kinds:
+        total, number = base_sizes.get(name, (0, 0))
+        if number == 0:
+            continue
+        row = ['%12.0f' % (total / number)]
+        for mode in ['zlib', 'lzma']:
+            size, _ = results[mode][0][name]
+            row.append('%5.0f(%4.0f%%)' % (size / number, (size / total - 1) * 100))
+        print('%-12s %6d %s' % (name, number, ' '.join(row)))
+    print()
+    for mode, compressor in modes:
+        sizes, elapsed = results[mode]
+        total = sum(size for size, _ in sizes.values())
+        line = '%-5s bytes %10d, cpu %7.1f us/msg (%+.1f%%)' % (mode, total, elapsed / count * 1e6,
+                                                               (elapsed / base_time - 1) * 100)
+        if compressor is not None:
+            metrics = compressor.metrics
+            line += ', compressed %d of %d attempts' % (metrics['compressed'], metrics['attempts'])
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
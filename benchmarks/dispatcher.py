@@ -0,0 +1,106 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Partitioned Dispatcher
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Dispatch serialized messages from many senders to worker processes,
+    with a CPU-bound handler; report throughput for 1..N workers, check
+    that each sender's messages are handled in sending order, and show
+    back-pressure on a lagging partition.
+
+    usage:
+        python benchmarks/dispatcher.py [count] [workers]
+
+    NOTICE: message factories & JsON coder come from 'dimplugins', install it first.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import json_encode, utf8_encode
+from dimp.utils import PartitionedDispatcher
+
+
+SENDERS = ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ' % index for index in range(500)]
+
+
+def load_plugins():
+    ExtensionLoader().load()
+    PluginLoader().load()
+
+
+def handle(msg) -> tuple:
+    # about 100us of CPU work per message, like verify & decrypt
+    digest = msg.get_str(key='signature', default='').encode('utf-8')
+    for _ in range(200):
+        digest = hashlib.sha256(digest).digest()
+    return str(msg.sender), msg.get_int(key='sn', default=0), os.getpid()
+
+
+def slow_handle(msg) -> tuple:
+    time.sleep(0.01)
+    return handle(msg)
+
+
+def messages(count: int) -> list:
+    items = []
+    for index in range(count):
+        sender = SENDERS[index % len(SENDERS)]
+        info = {'sender': sender, 'receiver': 'hulk@4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj', 'time': time.time(),
+                'sn': index, 'data': 'AAAA', 'signature': 'sig%d' % index}
+        items.append((sender, utf8_encode(string=json_encode(container=info))))
+    return items
+
+
+def run(items: list, workers: int) -> float:
+    order = {}
+    with PartitionedDispatcher(handler=handle, workers=workers, initializer=load_plugins) as dispatcher:
+        begin = time.perf_counter()
+        futures = [dispatcher.dispatch(msg=data, sender=sender) for sender, data in items]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - begin
+    for sender, sn, pid in results:
+        # results come back in dispatching order; check handling order per sender by sn
+        order.setdefault(sender, []).append((sn, pid))
+    for sender, handled in order.items():
+        assert [sn for sn, _ in handled] == sorted(sn for sn, _ in handled), f'out of order: {sender}'
+        assert len(set(pid for _, pid in handled)) == 1, f'sender split across workers: {sender}'
+    return len(items) / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+    load_plugins()
+    items = messages(count)
+    counts = sorted(set([1, 2, workers // 2, workers]) - {0})
+    base = None
+    for number in counts:
+        rate = run(items=items, workers=number)
+        base = rate if base is None else base
+        print('workers=%-3d %9.0f msg/s (x%.2f), per-sender order kept' % (number, rate, rate / base))
+    # back-pressure: a slow partition fills up and refuses more
+    with PartitionedDispatcher(handler=slow_handle, workers=2, max_pending=16,
+                               initializer=load_plugins) as dispatcher:
+        sender, data = items[0]
+        futures = [dispatcher.dispatch(msg=data, sender=sender, block=False) for _ in range(32)]
+        refused = sum(1 for future in futures if future is None)
+        print('back-pressure: %d of 32 refused on full partition, lagging partitions %s' % (
+            refused, dispatcher.lagging()))
+        for future in futures:
+            if future is not None:
+                future.result()
+
+
+if __name__ == '__main__':
+    main()
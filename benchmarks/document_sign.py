@@ -0,0 +1,114 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Document Signing
+    ~~~~~~~~~~~~~~~~
+
+    Rename a large bulletin (administrators, members, assistants) and sign
+    it again, encoding the properties with the whole-map JsON encoder,
+    with the canonical encoder, and with the fragment cache in
+    BaseDocument.sign().
+
+    usage:
+        python benchmarks/document_sign.py [--members 2000] [--rounds 200]
+
+    NOTICE: codecs, keys & factories come from 'dimplugins', install it first.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import json_encode, utf8_encode
+from dimp import ID, Document, DocumentType
+from dimp import PrivateKey, AsymmetricAlgorithms
+from dimp import canonical_encode, PropertiesEncoder
+
+
+def create_bulletin(members: int) -> Document:
+    group = ID.parse(identifier='Group-1280719982@7oMeWadRw4qat2sL4mTdcQSDAqZSo7LH5G')
+    users = ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ' % index for index in range(members)]
+    doc = Document.create(doc_type=DocumentType.BULLETIN)
+    doc['did'] = str(group)
+    doc.set_property(name='name', value='DIM Group')
+    doc.set_property(name='founder', value=users[0])
+    doc.set_property(name='administrators', value=users[:members // 10])
+    doc.set_property(name='members', value=users)
+    doc.set_property(name='assistants', value=['assistant@2PpB6iscuBjA15oTjAsiswoX9qis5V3c1Dq'])
+    doc.set_property(name='avatar', value={
+        'URL': 'https://avatars.githubusercontent.com/u/1189795',
+        'filename': 'avatar.jpg',
+    })
+    return doc
+
+
+def timed(rounds: int, func) -> float:
+    begin = time.perf_counter()
+    for index in range(rounds):
+        func(index)
+    return (time.perf_counter() - begin) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Document signing benchmark')
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+    ExtensionLoader().load()
+    PluginLoader().load()
+    key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.ECC)
+    doc = create_bulletin(members=args.members)
+    doc.sign(private_key=key)
+    size = len(doc['data'])
+    print('bulletin: %d members, data %d bytes, %d rounds' % (args.members, size, args.rounds))
+    info = doc.properties
+
+    def rename(index: int):
+        info['name'] = 'DIM Group %d' % index
+
+    # 1. encode only
+    encoder = PropertiesEncoder()
+    encoder.encode(info)
+
+    def cached(index: int):
+        rename(index)
+        encoder.invalidate(name='name')
+        encoder.encode(info)
+
+    results = [
+        ('json_encode', timed(args.rounds, lambda i: (rename(i), json_encode(info)))),
+        ('canonical_encode', timed(args.rounds, lambda i: (rename(i), canonical_encode(info)))),
+        ('PropertiesEncoder', timed(args.rounds, cached)),
+    ]
+    base = results[0][1]
+    print('%-24s %12s %8s' % ('encode', 'us/op', 'speedup'))
+    for name, cost in results:
+        print('%-24s %12.1f %7.1fx' % (name, cost * 1e6, base / cost))
+    # 2. set property & sign
+    sign_data = timed(args.rounds, lambda i: key.sign(data=utf8_encode(string=json_encode(info))))
+
+    def resign(index: int):
+        doc.set_property(name='name', value='DIM Group %d' % index)
+        doc.sign(private_key=key)
+
+    results = [
+        ('json_encode + sign', sign_data),
+        ('set_property + sign', timed(args.rounds, resign)),
+    ]
+    base = results[0][1]
+    print('%-24s %12s %8s' % ('sign', 'us/op', 'speedup'))
+    for name, cost in results:
+        print('%-24s %12.1f %7.1fx' % (name, cost * 1e6, base / cost))
+    assert doc['data'] == canonical_encode(doc.properties), 'data error'
+    assert doc.verify(public_key=key.public_key), 'signature error'
+
+
+if __name__ == '__main__':
+    main()
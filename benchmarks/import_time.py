@@ -0,0 +1,83 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Import Time
+    ~~~~~~~~~~~
+
+    Measure the cold start cost of importing 'dimp' in fresh interpreters,
+    from the bare package to the full star import.
+
+    usage:
+        python benchmarks/import_time.py [--runs N] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+path = os.path.abspath(os.path.dirname(__file__))
+root = os.path.dirname(path)
+
+CASES = [
+    ('import dimp', 'import dimp'),
+    ('from dimp import ID', 'from dimp import ID'),
+    ('from dimp import ReliableMessage', 'from dimp import ReliableMessage'),
+    ('from dimp import TextContent', 'from dimp import TextContent'),
+    ('register_factories()', 'import dimp; dimp.register_factories()'),
+    ('from dimp import *', 'from dimp import *'),
+]
+
+SCRIPT = '''
+import sys, time
+sys.path.insert(0, %r)
+start = time.perf_counter()
+%s
+elapsed = time.perf_counter() - start
+count = len([name for name in sys.modules if name == 'dimp' or name.startswith('dimp.')])
+print(elapsed, count)
+'''
+
+
+def measure(statement: str, runs: int):
+    times = []
+    count = 0
+    for _ in range(runs):
+        try:
+            output = subprocess.check_output([sys.executable, '-c', SCRIPT % (root, statement)],
+                                             stderr=subprocess.DEVNULL)
+        except subprocess.CalledProcessError:
+            return None
+        elapsed, count = output.split()
+        times.append(float(elapsed))
+    return {
+        'median_ms': round(statistics.median(times) * 1000, 2),
+        'min_ms': round(min(times) * 1000, 2),
+        'modules': int(count),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DIMP import time')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    results = {}
+    for name, statement in CASES:
+        results[name] = measure(statement, runs=args.runs)
+        if not args.json:
+            item = results[name]
+            if item is None:
+                print('%-36s failed' % name)
+                continue
+            print('%-36s median %8.2f ms, min %8.2f ms, %3d dimp modules' % (name, item['median_ms'],
+                                                                              item['min_ms'], item['modules']))
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
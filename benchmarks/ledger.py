@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Transfer Ledger
+    ~~~~~~~~~~~~~~~
+
+    Bulk ingest transfer contents (with duplicates & out of order times),
+    then query balances and statements, and check that every currency
+    sums to zero over all accounts.
+
+    usage:
+        python benchmarks/ledger.py [count]    # default: 1,000,000 transfers
+
+    NOTICE: codecs, keys & factories come from 'dimplugins', install it first.
+"""
+
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import TransferMoneyContent
+from dimp.utils import TransferLedger
+
+
+USERS = ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUg%d' % (index, index % 10) for index in range(10000)]
+CURRENCIES = ['USDT', 'DIM', 'RMB']
+BATCH = 100000
+
+
+def batch(start: int, count: int, now: float) -> list:
+    contents = []
+    for index in range(start, start + count):
+        remitter, remittee = random.sample(USERS, 2)
+        content = TransferMoneyContent(content={
+            'type': '65',
+            'sn': index,
+            # mostly in order, some late arrivals
+            'time': now + index - (random.random() * 600 if random.random() < 0.05 else 0),
+            'currency': random.choice(CURRENCIES),
+            'amount': round(random.uniform(0.01, 500), 2),
+            'remitter': remitter,
+            'remittee': remittee,
+        })
+        contents.append(content)
+    # 1% duplicates, delivered again
+    contents.extend(random.sample(contents, count // 100))
+    return contents
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(1189795)
+    ExtensionLoader().load()
+    PluginLoader().load()
+    now = time.time() - count
+    ledger = TransferLedger()
+    elapsed = 0.0
+    ingested = 0
+    for start in range(0, count, BATCH):
+        contents = batch(start=start, count=min(BATCH, count - start), now=now)
+        begin = time.perf_counter()
+        for content in contents:
+            ledger.ingest(content=content, sender=content['remitter'])
+        elapsed += time.perf_counter() - begin
+        ingested += len(contents)
+    print('ingest     %9.0f contents/s (%d contents, %.2fs)' % (ingested / elapsed, ingested, elapsed))
+    print('metrics    %s' % ledger.metrics)
+    # balances at time
+    queries = 10000
+    begin = time.perf_counter()
+    for _ in range(queries):
+        ledger.balance(random.choice(USERS), random.choice(CURRENCIES), at=now + random.random() * count)
+    elapsed = time.perf_counter() - begin
+    print('balance@t  %9.0f queries/s' % (queries / elapsed))
+    begin = time.perf_counter()
+    entries = 0
+    for _ in range(queries):
+        start = now + random.random() * count
+        entries += len(ledger.statement(random.choice(USERS), random.choice(CURRENCIES),
+                                        start=start, end=start + count / 100))
+    elapsed = time.perf_counter() - begin
+    print('statement  %9.0f queries/s (%.1f entries per statement)' % (queries / elapsed, entries / queries))
+    # conservation
+    begin = time.perf_counter()
+    for currency in CURRENCIES:
+        total = sum((ledger.balance(user, currency) for user in USERS), Decimal(0))
+        assert total == 0, f'{currency} not balanced: {total}'
+    elapsed = time.perf_counter() - begin
+    print('balance    %9.0f queries/s, all currencies sum to zero' % (len(USERS) * len(CURRENCIES) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
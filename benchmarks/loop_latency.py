@@ -0,0 +1,109 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Event Loop Latency
+    ~~~~~~~~~~~~~~~~~~
+
+    Pack messages (encrypt + sign) while a ticker measures how late
+    the event loop wakes up, with blocking transforms vs async pipeline.
+
+    usage:
+        python benchmarks/loop_latency.py [count] [workers]
+
+    NOTICE: crypto keys come from 'dimplugins', install it first.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import ID, Envelope, InstantMessage, TextContent
+from dimp import SymmetricKey, PrivateKey
+from dimp import SymmetricAlgorithms, AsymmetricAlgorithms
+from dimp import SecureMessage
+from dimp.utils import AsyncMessageTransformer
+from dimp.utils.transform import encrypt_message, sign_message
+
+
+class Ticker:
+
+    def __init__(self, interval: float = 0.001):
+        super().__init__()
+        self.interval = interval
+        self.delays = []
+        self.running = True
+
+    async def run(self):
+        while self.running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.delays.append(time.perf_counter() - start - self.interval)
+
+    def report(self) -> str:
+        delays = sorted(self.delays)
+        if len(delays) == 0:
+            return 'no ticks'
+        p99 = delays[int(len(delays) * 0.99) - 1]
+        return 'ticks=%d, p99=%.2fms, max=%.2fms' % (len(delays), p99 * 1000, delays[-1] * 1000)
+
+
+def prepare(count: int):
+    sender = ID.parse(identifier='moky@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ')
+    receiver = ID.parse(identifier='hulk@4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj')
+    sign_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.ECC)
+    msg_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.RSA)
+    keys = {str(receiver): msg_key.public_key}
+    messages = []
+    for index in range(count):
+        head = Envelope.create(sender=sender, receiver=receiver)
+        body = TextContent.create(text='Hello %d' % index)
+        messages.append(InstantMessage.create(head=head, body=body))
+    password = SymmetricKey.generate(algorithm=SymmetricAlgorithms.AES)
+    return messages, password, keys, sign_key
+
+
+async def blocking(messages, password, keys, sign_key):
+    for msg in messages:
+        info = encrypt_message(msg, password, keys)
+        sign_message(SecureMessage.parse(msg=info), sign_key)
+
+
+async def pipelined(transformer: AsyncMessageTransformer, messages, password, keys, sign_key):
+    secure = await transformer.encrypt_messages((msg, password, keys) for msg in messages)
+    await transformer.sign_messages((msg, sign_key) for msg in secure)
+
+
+async def measure(title: str, coro):
+    ticker = Ticker()
+    task = asyncio.create_task(ticker.run())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    ticker.running = False
+    await task
+    print('%-10s elapsed=%.3fs, %s' % (title, elapsed, ticker.report()))
+
+
+async def main(count: int, workers: int):
+    messages, password, keys, sign_key = prepare(count=count)
+    await measure('blocking', blocking(messages, password, keys, sign_key))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    transformer = AsyncMessageTransformer(executor=executor, concurrency=workers * 2)
+    await measure('async', pipelined(transformer, messages, password, keys, sign_key))
+
+
+if __name__ == '__main__':
+    ExtensionLoader().load()
+    PluginLoader().load()
+    args = sys.argv[1:]
+    asyncio.run(main(count=int(args[0]) if len(args) > 0 else 1000,
+                     workers=int(args[1]) if len(args) > 1 else 4))
@@ -0,0 +1,113 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Offline Message Log
+    ~~~~~~~~~~~~~~~~~~~
+
+    Append serialized messages for offline receivers with different sync
+    batches, redeliver them (raw views vs. decode & encode again), then
+    acknowledge most of them and compact.
+
+    usage:
+        python benchmarks/message_log.py [count]
+
+    NOTICE: JsON coder comes from 'dimplugins', install it first.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import json_encode, json_decode, utf8_encode, utf8_decode, base64_encode
+from dimp.utils import MessageLog
+
+
+RECEIVERS = ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUg%d' % (index, index % 10) for index in range(1000)]
+
+
+def message(receiver: str) -> bytes:
+    info = {
+        'sender': 'moky@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ', 'receiver': receiver, 'time': time.time(),
+        'data': base64_encode(data=os.urandom(random.randint(64, 1024))),
+        'key': base64_encode(data=os.urandom(256)), 'signature': base64_encode(data=os.urandom(72)),
+    }
+    return utf8_encode(string=json_encode(container=info))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ExtensionLoader().load()
+    PluginLoader().load()
+    random.seed(1189795)
+    items = [(receiver, message(receiver)) for receiver in random.choices(RECEIVERS, k=count)]
+    size = sum(len(data) for _, data in items)
+    print('%d messages, %.1f MB' % (count, size / 1024 / 1024))
+    directory = tempfile.mkdtemp(prefix='dimp-msglog-')
+    try:
+        for sync_every in [1, 64, 1024]:
+            shutil.rmtree(directory, ignore_errors=True)
+            log = MessageLog(directory=directory, sync_every=sync_every, sync_interval=3600)
+            runs = items if sync_every > 1 else items[:count // 20]
+            begin = time.perf_counter()
+            for receiver, data in runs:
+                log.append(receiver=receiver, data=data)
+            log.sync()
+            elapsed = time.perf_counter() - begin
+            print('append sync_every=%-5d %9.0f msg/s' % (sync_every, len(runs) / elapsed))
+            log.close()
+        # reopen: rebuild index by scanning
+        begin = time.perf_counter()
+        log = MessageLog(directory=directory)
+        print('recover                  %9.3f s, %s' % (time.perf_counter() - begin, log.metrics))
+        # redelivery
+        begin = time.perf_counter()
+        total = 0
+        for receiver in RECEIVERS:
+            for _, data in log.pending(receiver=receiver):
+                total += len(data)
+                data.release()
+        elapsed = time.perf_counter() - begin
+        print('redeliver raw views      %9.0f msg/s' % (count / elapsed))
+        begin = time.perf_counter()
+        for receiver in RECEIVERS:
+            for _, data in log.pending(receiver=receiver):
+                info = json_decode(string=utf8_decode(data=bytes(data)))
+                total += len(utf8_encode(string=json_encode(container=info)))
+                data.release()
+        elapsed = time.perf_counter() - begin
+        print('redeliver decode+encode  %9.0f msg/s' % (count / elapsed))
+        # acknowledge 90%, then compact
+        begin = time.perf_counter()
+        acked = 0
+        for receiver in RECEIVERS:
+            for position, data in log.pending(receiver=receiver):
+                data.release()
+                if random.random() < 0.9:
+                    log.ack(receiver=receiver, position=position)
+                    acked += 1
+        log.sync()
+        elapsed = time.perf_counter() - begin
+        print('ack                      %9.0f msg/s' % (acked / elapsed))
+        before = log.metrics
+        begin = time.perf_counter()
+        removed = log.compact()
+        elapsed = time.perf_counter() - begin
+        after = log.metrics
+        print('compact                  %9.3f s, %d segments removed, %.0f MB -> %.0f MB, %d live' % (
+            elapsed, removed, before['bytes'] / 1024 / 1024, after['bytes'] / 1024 / 1024, after['live']))
+        log.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,427 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Micro Benchmarks
+    ~~~~~~~~~~~~~~~~
+
+    Measure construction, parse-from-dict, lazy field access, to_dict and
+    JSON round-trip for every class in 'dimp.protocol' & 'dimp.dkd', and
+    the format classes (TED, data URI, PNF) at several payload sizes.
+
+    usage:
+        python benchmarks/micro.py [options]
+
+        --mode plain|crypto   'plain' (default) uses the plain symmetric key and
+                              never signs or verifies, so only the framework
+                              overhead is measured; 'crypto' adds AES/RSA/ECC
+        --filter TEXT         run cases whose names contain TEXT only
+        --quick               shorter rounds, skip the largest payloads
+        --json                print machine-readable results to stdout
+        --save PATH           save results as a baseline file
+        --baseline PATH       compare with a baseline file, exit 1 on regression
+        --threshold RATIO     slowdown ratio treated as regression (default: 0.2)
+
+    baseline:
+        'benchmarks/micro_baseline.json' holds the reference results ('plain' mode,
+        Python & platform recorded inside), check a change against it with:
+
+            python benchmarks/micro.py --baseline benchmarks/micro_baseline.json
+
+        timings depend on the machine, so on another machine save a local baseline
+        from the unchanged tree first (--save), then compare with that one;
+        refresh the committed file with '--save benchmarks/micro_baseline.json'
+        when an accepted change moves the numbers.
+
+    NOTICE: codecs, keys & factories come from 'dimplugins', install it first.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Optional, Callable, List, Dict
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import json_encode, json_decode
+from dimp import URI, ID, EntityType, Meta, Document, MetaType, DocumentType
+from dimp import SymmetricKey, PrivateKey, SymmetricAlgorithms, AsymmetricAlgorithms
+from dimp import TransportableData, TransportableFile
+from dimp import Base64Data, PlainData, EmbedData, DataURI, PortableNetworkFile
+from dimp import Content, Envelope
+from dimp import InstantMessage, SecureMessage, ReliableMessage
+from dimp import TextContent, PageContent, NameCard
+from dimp import FileContent, MoneyContent, TransferContent
+from dimp import ForwardContent, CombineContent, ArrayContent
+from dimp import QuoteContent, ReceiptCommand
+from dimp import MetaCommand, DocumentCommand
+from dimp import shared_meta_memo
+from dimp import BaseCommand, BaseHistoryCommand, GroupCommand
+from dimp import InviteGroupCommand, ExpelGroupCommand, JoinGroupCommand
+from dimp import QuitGroupCommand, ResetGroupCommand
+from dimp import ContentType
+from dimp.utils.transform import encrypt_message, sign_message, verify_message, decrypt_message
+
+
+SIZES = [16, 1024, 64 * 1024, 1024 * 1024]
+
+
+def random_bytes(size: int) -> bytes:
+    return bytes(random.getrandbits(8) for _ in range(size))
+
+
+def random_base64(size: int) -> str:
+    return Base64Data.create(binary=random_bytes(size)).serialize()
+
+
+class Suite:
+
+    def __init__(self, min_time: float = 0.1, rounds: int = 5, pattern: Optional[str] = None):
+        super().__init__()
+        self.min_time = min_time
+        self.rounds = rounds
+        self.pattern = pattern
+        self.cases: Dict[str, Callable] = {}
+
+    def add(self, name: str, func: Callable):
+        assert name not in self.cases, f'duplicated case: {name}'
+        if self.pattern is None or self.pattern in name:
+            self.cases[name] = func
+
+    def measure(self, func: Callable) -> float:
+        """ seconds per call, best of rounds """
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time / self.rounds:
+                break
+            number *= 2 if elapsed == 0 else max(2, int(self.min_time / self.rounds / elapsed) + 1)
+        best = elapsed
+        for _ in range(self.rounds - 1):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            best = min(best, time.perf_counter() - start)
+        return best / number
+
+    def run(self, verbose: bool = True) -> Dict[str, Dict]:
+        results = {}
+        for name, func in self.cases.items():
+            seconds = self.measure(func)
+            results[name] = {
+                'ns_per_op': round(seconds * 1e9, 1),
+                'ops_per_sec': round(1.0 / seconds, 1) if seconds > 0 else 0,
+            }
+            if verbose:
+                print('%-52s %14.1f ns %14.1f op/s' % (name, seconds * 1e9, 1.0 / seconds), file=sys.stderr)
+        return results
+
+
+#
+#   Cases
+#
+
+def add_object_cases(suite: Suite, name: str, create: Callable, parse: Callable, access: Callable):
+    """ create, parse, parse+access, to_dict & JSON round-trip """
+    obj = create()
+    info = obj.to_dict()
+    text = json_encode(container=info)
+    suite.add('%s.create' % name, create)
+    suite.add('%s.parse' % name, lambda: parse(dict(info)))
+    suite.add('%s.access' % name, lambda: access(parse(dict(info))))
+    suite.add('%s.to_dict' % name, lambda: create().to_dict())
+    suite.add('%s.json' % name, lambda: parse(json_decode(string=json_encode(container=parse(json_decode(
+        string=text)).to_dict()))))
+
+
+def add_content_cases(suite: Suite, name: str, create: Callable, access: Callable):
+    add_object_cases(suite, name, create=create, parse=lambda info: Content.parse(content=info), access=access)
+
+
+def access_all(*names: str) -> Callable:
+    def access(obj):
+        for key in names:
+            getattr(obj, key)
+    return access
+
+
+def prepare(mode: str):
+    sender = ID.parse(identifier='moky@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ')
+    receiver = ID.parse(identifier='hulk@4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj')
+    group = ID.parse(identifier='Group-1280719982@7oMeWadRw4qat2sL4mTdcQSDAqZSo7LH5G')
+    # keys are generated once here, the plain cases never use them for crypto
+    id_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.ECC)
+    msg_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.RSA)
+    meta = Meta.generate(version=MetaType.MKM, private_key=id_key, seed='moky')
+    visa = Document.create(doc_type=DocumentType.VISA)
+    visa['did'] = str(sender)
+    visa.set_property(name='name', value='Albert Moky')
+    visa.set_property(name='key', value=msg_key.public_key.to_dict())
+    visa.set_property(name='avatar', value='https://avatars.githubusercontent.com/u/1189795')
+    bulletin = Document.create(doc_type=DocumentType.BULLETIN)
+    bulletin['did'] = str(group)
+    bulletin.set_property(name='name', value='DIM Group')
+    bulletin.set_property(name='founder', value=str(sender))
+    if mode == 'crypto':
+        visa.sign(private_key=id_key)
+        bulletin.sign(private_key=id_key)
+    else:
+        # fake signatures, documents are never verified in plain mode
+        for doc in [visa, bulletin]:
+            info = doc.copy_dict()
+            info['data'] = json_encode(container=doc.properties)
+            info['signature'] = random_base64(size=64)
+            if doc is visa:
+                visa = Document.parse(document=info)
+            else:
+                bulletin = Document.parse(document=info)
+    return {
+        'sender': sender, 'receiver': receiver, 'group': group,
+        'id_key': id_key, 'msg_key': msg_key,
+        'meta': meta, 'visa': visa, 'bulletin': bulletin,
+    }
+
+
+def protocol_cases(suite: Suite, env: Dict):
+    sender = env['sender']
+    receiver = env['receiver']
+    group = env['group']
+    meta = env['meta']
+    visa = env['visa']
+    head = Envelope.create(sender=sender, receiver=receiver)
+    text = TextContent.create(text='Hello world!')
+    rmsg = ReliableMessage.parse(msg={
+        'sender': str(sender), 'receiver': str(receiver), 'time': time.time(),
+        'data': random_base64(size=64), 'key': random_base64(size=256), 'signature': random_base64(size=64),
+    })
+    imsg = InstantMessage.create(head=head, body=text)
+    icon = PortableNetworkFile.parse(URI('https://avatars.githubusercontent.com/u/1189795'))
+    image = Base64Data.create(binary=random_bytes(1024))
+    # contents
+    add_content_cases(suite, 'BaseTextContent', lambda: TextContent.create(text='Hello world!'),
+                      access=access_all('type', 'sn', 'time', 'text'))
+    add_content_cases(suite, 'WebPageContent',
+                      lambda: PageContent.create(url=URI('https://github.com/dimchat'), html=None,
+                                                 title='DIM', desc='Decentralized Instant Messaging', icon=icon),
+                      access=access_all('url', 'title', 'desc', 'icon'))
+    add_content_cases(suite, 'NameCardContent', lambda: NameCard.create(identifier=sender, name='Moky', avatar=icon),
+                      access=access_all('identifier', 'name', 'avatar'))
+    add_content_cases(suite, 'BaseFileContent', lambda: FileContent.file(data=image, filename='a.bin'),
+                      access=access_all('data', 'filename', 'url', 'password'))
+    add_content_cases(suite, 'ImageFileContent', lambda: FileContent.image(data=image, filename='a.jpeg'),
+                      access=access_all('data', 'filename', 'thumbnail'))
+    add_content_cases(suite, 'AudioFileContent', lambda: FileContent.audio(data=image, filename='a.mp4'),
+                      access=access_all('data', 'filename', 'text'))
+    add_content_cases(suite, 'VideoFileContent', lambda: FileContent.video(data=image, filename='a.mp4'),
+                      access=access_all('data', 'filename', 'snapshot'))
+    add_content_cases(suite, 'BaseMoneyContent', lambda: MoneyContent.create(currency='USD', amount=100),
+                      access=access_all('currency', 'amount'))
+    add_content_cases(suite, 'TransferMoneyContent', lambda: TransferContent.transfer(currency='USD', amount=100),
+                      access=access_all('currency', 'amount', 'remitter', 'remittee'))
+    add_content_cases(suite, 'SecretContent', lambda: ForwardContent.create(messages=[rmsg]),
+                      access=lambda content: content.secrets[0].signature)
+    add_content_cases(suite, 'CombineForwardContent', lambda: CombineContent.create(title='Chat', messages=[imsg]),
+                      access=lambda content: content.messages[0].content)
+    add_content_cases(suite, 'ListContent', lambda: ArrayContent.create(contents=[text]),
+                      access=lambda content: content.contents[0].text)
+    add_content_cases(suite, 'BaseQuoteContent', lambda: QuoteContent.create(text='Hi', envelope=head, content=text),
+                      access=access_all('text', 'original_envelope', 'original_sn'))
+    # commands
+    add_content_cases(suite, 'BaseCommand', lambda: BaseCommand(cmd='handshake'),
+                      access=access_all('type', 'sn', 'cmd'))
+    add_content_cases(suite, 'BaseReceiptCommand',
+                      lambda: ReceiptCommand.create(text='Received', envelope=head, content=text),
+                      access=access_all('text', 'original_envelope', 'original_sn', 'original_signature'))
+    add_content_cases(suite, 'BaseMetaCommand', lambda: MetaCommand.response(identifier=sender, meta=meta),
+                      access=access_all('identifier', 'meta'))
+    add_content_cases(suite, 'BaseDocumentCommand',
+                      lambda: DocumentCommand.response(documents=[visa], meta=meta, identifier=sender),
+                      access=access_all('identifier', 'meta', 'documents'))
+    add_content_cases(suite, 'BaseHistoryCommand',
+                      lambda: BaseHistoryCommand(msg_type=ContentType.HISTORY, cmd='register'),
+                      access=access_all('cmd', 'time'))
+    add_content_cases(suite, 'BaseGroupCommand',
+                      lambda: GroupCommand.create(cmd='found', group=group, members=[sender, receiver]),
+                      access=access_all('group', 'members'))
+    add_content_cases(suite, 'InviteGroupCommand', lambda: InviteGroupCommand(group=group, members=[receiver]),
+                      access=access_all('group', 'members'))
+    add_content_cases(suite, 'ExpelGroupCommand', lambda: ExpelGroupCommand(group=group, members=[receiver]),
+                      access=access_all('group', 'members'))
+    add_content_cases(suite, 'JoinGroupCommand', lambda: JoinGroupCommand(group=group),
+                      access=access_all('group'))
+    add_content_cases(suite, 'QuitGroupCommand', lambda: QuitGroupCommand(group=group),
+                      access=access_all('group'))
+    add_content_cases(suite, 'ResetGroupCommand', lambda: ResetGroupCommand(group=group, members=[sender, receiver]),
+                      access=access_all('group', 'members'))
+    # documents
+    add_object_cases(suite, 'BaseVisa', create=lambda: Document.parse(document=visa.copy_dict()),
+                     parse=lambda info: Document.parse(document=info),
+                     access=access_all('name', 'public_key', 'avatar'))
+    bulletin = env['bulletin']
+    add_object_cases(suite, 'BaseBulletin', create=lambda: Document.parse(document=bulletin.copy_dict()),
+                     parse=lambda info: Document.parse(document=info),
+                     access=access_all('name', 'founder'))
+
+
+def message_cases(suite: Suite, env: Dict, mode: str):
+    sender = env['sender']
+    receiver = env['receiver']
+    if mode == 'crypto':
+        password = SymmetricKey.generate(algorithm=SymmetricAlgorithms.AES)
+        keys = {str(receiver): env['msg_key'].public_key}
+    else:
+        password = SymmetricKey.generate(algorithm=SymmetricAlgorithms.PLAIN)
+        keys = None
+    head = Envelope.create(sender=sender, receiver=receiver)
+    imsg = InstantMessage.create(head=head, body=TextContent.create(text='Hello world!'))
+    info = encrypt_message(imsg, password=password, keys=keys)
+    if mode != 'crypto':
+        smsg = SecureMessage.parse(msg=info)
+        rmsg = ReliableMessage.parse(msg=dict(info, signature=random_base64(size=64)))
+    else:
+        smsg = SecureMessage.parse(msg=info)
+        rmsg = ReliableMessage.parse(msg=sign_message(smsg, key=env['id_key']))
+    add_object_cases(suite, 'MessageEnvelope', create=lambda: Envelope.create(sender=sender, receiver=receiver),
+                     parse=lambda msg: Envelope.parse(envelope=msg),
+                     access=access_all('sender', 'receiver', 'time', 'group', 'type'))
+    add_object_cases(suite, 'PlainMessage',
+                     create=lambda: InstantMessage.create(head=Envelope.create(sender=sender, receiver=receiver),
+                                                          body=TextContent.create(text='Hello world!')),
+                     parse=lambda msg: InstantMessage.parse(msg=msg),
+                     access=access_all('sender', 'receiver', 'time', 'content'))
+    smsg_info = smsg.copy_dict()
+    add_object_cases(suite, 'EncryptedMessage', create=lambda: SecureMessage.parse(msg=dict(smsg_info)),
+                     parse=lambda msg: SecureMessage.parse(msg=msg),
+                     access=access_all('sender', 'receiver', 'data', 'encrypted_keys'))
+    rmsg_info = rmsg.copy_dict()
+    add_object_cases(suite, 'NetworkMessage', create=lambda: ReliableMessage.parse(msg=dict(rmsg_info)),
+                     parse=lambda msg: ReliableMessage.parse(msg=msg),
+                     access=access_all('sender', 'receiver', 'data', 'signature'))
+    # transforms, with the plain key in plain mode
+    suite.add('transform.encrypt', lambda: encrypt_message(imsg, password=password, keys=keys))
+    suite.add('transform.decrypt', lambda: decrypt_message(SecureMessage.parse(msg=dict(smsg_info)),
+                                                           receiver=str(receiver), keys=[env['msg_key']],
+                                                           password=password))
+    if mode != 'crypto':
+        return
+    id_key = env['id_key']
+    verify_keys = [id_key.public_key]
+    meta = env['meta']
+    visa = env['visa']
+    suite.add('transform.sign', lambda: sign_message(smsg, key=id_key))
+    suite.add('transform.verify', lambda: verify_message(ReliableMessage.parse(msg=dict(rmsg_info)),
+                                                         keys=verify_keys))
+    suite.add('BaseVisa.verify', lambda: Document.parse(document=visa.copy_dict()).verify(
+        public_key=meta.public_key))
+    suite.add('BaseMeta.is_valid', lambda: Meta.parse(meta=meta.copy_dict()).is_valid)
+    suite.add('BaseMeta.is_valid (uncached)', lambda: (shared_meta_memo.clear(),
+                                                       Meta.parse(meta=meta.copy_dict()).is_valid))
+    owner = ID.generate(meta=meta, network=EntityType.USER)
+    meta_cmd = MetaCommand.response(identifier=owner, meta=meta).copy_dict()
+    suite.add('MetaCommand.valid_meta', lambda: Content.parse(content=dict(meta_cmd)).valid_meta)
+
+
+def format_cases(suite: Suite, sizes: List[int]):
+    for size in sizes:
+        data = random_bytes(size)
+        base64 = Base64Data.create(binary=data).serialize()
+        text = 'x' * size
+        uri = EmbedData.create_with_bytes(binary=data, mime_type='image/jpeg', filename='a.jpeg').serialize()
+        pnf = {'data': base64, 'filename': 'a.bin'}
+        pnf_text = json_encode(container=pnf)
+        tag = '%d' % size
+        suite.add('Base64Data.encode[%s]' % tag, lambda d=data: Base64Data.create(binary=d).serialize())
+        suite.add('Base64Data.decode[%s]' % tag, lambda s=base64: Base64Data.create(string=s).to_bytes())
+        suite.add('PlainData.encode[%s]' % tag, lambda b=text.encode('utf-8'): PlainData.create(
+            binary=b).serialize())
+        suite.add('PlainData.decode[%s]' % tag, lambda s=text: PlainData.create(string=s).to_bytes())
+        suite.add('EmbedData.encode[%s]' % tag, lambda d=data: EmbedData.create_with_bytes(
+            binary=d, mime_type='image/jpeg', filename='a.jpeg').serialize())
+        suite.add('EmbedData.decode[%s]' % tag, lambda s=uri: TransportableData.parse(s).to_bytes())
+        suite.add('DataURI.parse[%s]' % tag, lambda s=uri: DataURI.parse(s).content)
+        suite.add('DataURI.to_str[%s]' % tag, lambda s=uri: DataURI.parse(s).to_str())
+        suite.add('PortableNetworkFile.create[%s]' % tag, lambda d=data: PortableNetworkFile(
+            None, data=Base64Data.create(binary=d), filename='a.bin').to_dict())
+        suite.add('PortableNetworkFile.parse[%s]' % tag, lambda info=pnf: TransportableFile.parse(
+            dict(info)).data.to_bytes())
+        suite.add('PortableNetworkFile.json[%s]' % tag, lambda s=pnf_text: json_encode(
+            container=TransportableFile.parse(json_decode(string=s)).to_dict()))
+
+
+#
+#   Baseline
+#
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    regressions = []
+    for name, item in results.items():
+        base = baseline.get(name)
+        if base is None or base.get('ns_per_op', 0) <= 0:
+            continue
+        ratio = item['ns_per_op'] / base['ns_per_op'] - 1
+        if ratio > threshold:
+            regressions.append('%-52s %+7.1f%% (%.1f -> %.1f ns)' % (name, ratio * 100,
+                                                                    base['ns_per_op'], item['ns_per_op']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DIMP micro benchmarks')
+    parser.add_argument('--mode', choices=['plain', 'crypto'], default='plain')
+    parser.add_argument('--filter', default=None)
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--save', default=None)
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+    ExtensionLoader().load()
+    PluginLoader().load()
+    random.seed(1189795)
+    if args.quick:
+        suite = Suite(min_time=0.02, rounds=3, pattern=args.filter)
+        sizes = SIZES[:-1]
+    else:
+        suite = Suite(min_time=0.1, rounds=5, pattern=args.filter)
+        sizes = SIZES
+    env = prepare(mode=args.mode)
+    protocol_cases(suite, env=env)
+    message_cases(suite, env=env, mode=args.mode)
+    format_cases(suite, sizes=sizes)
+    report = {
+        'mode': args.mode,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': int(time.time()),
+        'results': suite.run(verbose=not args.json),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    if args.save is not None:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        if baseline.get('mode') != args.mode:
+            print('baseline mode mismatched: %s' % baseline.get('mode'), file=sys.stderr)
+            sys.exit(2)
+        regressions = compare(report['results'], baseline.get('results', {}), threshold=args.threshold)
+        for line in regressions:
+            print('REGRESSION: %s' % line, file=sys.stderr)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Preset Dictionary
+    ~~~~~~~~~~~~~~~~~
+
+    Train a zlib preset dictionary from serialized messages, then compare
+    message sizes (JsON, zlib, zlib with dictionary) for each content type
+    on messages not used in training.
+
+    usage:
+        python benchmarks/preset_dictionary.py [--count N] [--size BYTES]
+                                               [--samples FILE] [--save FILE]
+
+        --samples: serialized messages, one JsON per line (default: generated)
+        --save:    write trained dictionary data to FILE
+
+    NOTICE: JsON & base64 coders come from 'dimplugins', install it first.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import json_encode, json_decode, utf8_encode, utf8_decode, base64_encode
+from dimp import ContentType
+from dimp.utils import PresetDictionary, DictionaryCompressor, train_dictionary
+
+
+ADDRESSES = ['4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ', '4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj',
+             '4LrJHfGgDD6Ui3GzFXM1bEBE8U8LJRN2Uz', '4MfTXb3cvfB4yCXyBNvWCgHFQhCx4RcJ6Z']
+NAMES = ['moky', 'hulk', 'dim', 'alice', 'bob', 'carol', 'dave', 'eve', 'frank', 'grace']
+
+
+def b64(size: int) -> str:
+    return base64_encode(data=bytes(random.getrandbits(8) for _ in range(size)))
+
+
+def user() -> str:
+    # a few busy users talk a lot
+    index = min(int(random.paretovariate(1.2)) - 1, 99)
+    return '%s%d@%s' % (NAMES[index % len(NAMES)], index, ADDRESSES[index % len(ADDRESSES)])
+
+
+def envelope(msg_type: str) -> dict:
+    return {'sender': user(), 'receiver': user(), 'time': round(time.time() + random.random() * 3600, 3),
+            'type': msg_type}
+
+
+def text() -> dict:
+    return dict(envelope(ContentType.TEXT), data=b64(random.choice([16, 32, 48, 64, 128])),
+                key=b64(256), signature=b64(72))
+
+
+def receipt() -> dict:
+    return dict(envelope(ContentType.COMMAND), data=b64(160), signature=b64(72))
+
+
+def file() -> dict:
+    # attachment uploaded, content carries URL & decrypt key only
+    return dict(envelope(ContentType.IMAGE), data=b64(random.choice([256, 320])), key=b64(256),
+                signature=b64(72))
+
+
+def group() -> dict:
+    info = dict(envelope(ContentType.TEXT), data=b64(random.choice([32, 64, 128])), signature=b64(72))
+    info['group'] = 'Group-1280719982@7oMeWadRw4qat2sL4mTdcQSDAqZSo7LH5G'
+    info['keys'] = {user(): b64(128) for _ in range(5)}
+    info['keys']['digest'] = b64(8)
+    return info
+
+
+def document() -> dict:
+    sender = user()
+    properties = {'did': sender, 'name': sender.split('@')[0], 'created_time': time.time(),
+                  'avatar': 'https://avatars.githubusercontent.com/u/%d' % random.getrandbits(24),
+                  'key': {'algorithm': 'RSA', 'data': b64(162)}}
+    info = dict(envelope(ContentType.COMMAND), data=b64(160), signature=b64(72))
+    info['visa'] = {'did': sender, 'type': 'visa', 'data': json_encode(container=properties),
+                    'signature': b64(72)}
+    return info
+
+
+MIX = [
+    (text, 55),
+    (receipt, 20),
+    (file, 8),
+    (group, 10),
+    (document, 7),
+]
+
+
+def generate(count: int) -> list:
+    builds = [build for build, weight in MIX for _ in range(weight)]
+    return [utf8_encode(string=json_encode(container=random.choice(builds)())) for _ in range(count)]
+
+
+def load(samples: str) -> list:
+    with open(samples, 'r') as file_in:
+        return [utf8_encode(string=line.strip()) for line in file_in if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DIMP preset dictionary trainer')
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=16 * 1024)
+    parser.add_argument('--samples', default=None)
+    parser.add_argument('--save', default=None)
+    args = parser.parse_args()
+    ExtensionLoader().load()
+    PluginLoader().load()
+    random.seed(1189795)
+    messages = generate(args.count) if args.samples is None else load(args.samples)
+    random.shuffle(messages)
+    half = len(messages) // 2
+    training, testing = messages[:half], messages[half:]
+    # 1. train
+    start = time.perf_counter()
+    data = train_dictionary(training, size=args.size)
+    assert data is not None, 'no fragment repeated in samples'
+    print('trained %d bytes dictionary from %d samples in %.2fs' % (len(data), len(training),
+                                                                     time.perf_counter() - start))
+    if args.save is not None:
+        with open(args.save, 'wb') as file_out:
+            file_out.write(data)
+        print('saved to %s' % args.save)
+    # 2. negotiate
+    local = DictionaryCompressor(dictionaries=[PresetDictionary(version=1, data=data)])
+    remote = DictionaryCompressor(dictionaries=[PresetDictionary(version=1, data=data)])
+    version = local.select(offers=remote.offers)
+    assert version == 1, 'dictionary negotiation failed'
+    # 3. compare
+    plain = {}
+    start = time.perf_counter()
+    frames = []
+    for msg in testing:
+        msg_type = json_decode(string=utf8_decode(data=msg)).get('type')
+        frames.append(local.compress(msg, version=version, content_type=msg_type))
+    compressing = time.perf_counter() - start
+    start = time.perf_counter()
+    for msg, frame in zip(testing, frames):
+        assert remote.decompress(frame) == msg, 'round trip failed'
+    decompressing = time.perf_counter() - start
+    for msg in testing:
+        msg_type = json_decode(string=utf8_decode(data=msg)).get('type')
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        size = len(compressor.compress(msg) + compressor.flush())
+        total, number = plain.get(msg_type, (0, 0))
+        plain[msg_type] = (total + size, number + 1)
+    print('compress %.0f msg/s, decompress %.0f msg/s' % (len(testing) / compressing,
+                                                          len(testing) / decompressing))
+    print()
+    print('%-6s %6s %8s %14s %14s' % ('type', 'count', 'json', 'zlib', 'dictionary'))
+    metrics = local.metrics
+    ratios = local.ratios
+    all_json = all_zlib = all_dict = 0
+    for msg_type, item in sorted(metrics.items()):
+        number = item['count']
+        size, _ = plain[msg_type]
+        all_json += item['bytes_in']
+        all_zlib += size
+        all_dict += item['bytes_out']
+        print('%-6s %6d %8.1f %8.1f(%3.0f%%) %8.1f(%3.0f%%)' % (msg_type, number, item['bytes_in'] / number,
+                                                               size / number, size / item['bytes_in'] * 100,
+                                                               item['bytes_out'] / number,
+                                                               ratios[msg_type] * 100))
+    print('%-6s %6d %8d %8d(%3.0f%%) %8d(%3.0f%%)' % ('total', len(testing), all_json,
+                                                     all_zlib, all_zlib / all_json * 100,
+                                                     all_dict, all_dict / all_json * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Replay Filter
+    ~~~~~~~~~~~~~
+
+    Feed a stream of network messages (with copies arriving through other
+    routes) over simulated hours into the replay filter and into a set of
+    signatures, then compare throughput, memory and false positives.
+
+    usage:
+        python benchmarks/replay.py [count]
+"""
+
+import os
+import random
+import sys
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimp import NetworkMessage
+from dimp.utils import ReplayFilter
+
+
+SENDERS = ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUg%d' % (index, index % 10) for index in range(1000)]
+RATE = 200  # messages per second
+
+
+def stream(count: int, start: float) -> list:
+    messages = []
+    for index in range(count):
+        when = start + index / RATE
+        msg = NetworkMessage(msg={
+            'sender': random.choice(SENDERS),
+            'receiver': 'hulk@4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj',
+            'time': when,
+            'data': 'xxx',
+            'signature': '%064x' % random.getrandbits(256),
+        })
+        messages.append((when + random.random(), msg, False))
+        if random.random() < 0.1:
+            # a copy through another route, a few seconds later
+            messages.append((when + 1 + random.random() * 30, msg, True))
+    messages.sort(key=lambda item: item[0])
+    return messages
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(1189795)
+    start = time.time()
+    messages = stream(count=count, start=start)
+    print('%d messages (%d copies) over %.1f hours' % (len(messages), len(messages) - count, count / RATE / 3600))
+    # 1. set of signatures
+    seen = set()
+    begin = time.perf_counter()
+    for _, msg, _ in messages:
+        signature = msg.get('signature')
+        if signature not in seen:
+            seen.add(signature)
+    elapsed = time.perf_counter() - begin
+    size = sys.getsizeof(seen) + sum(sys.getsizeof(signature) for signature in seen)
+    print('set     %9.0f msg/s, %7.1f MB, growing forever' % (len(messages) / elapsed, size / 1024 / 1024))
+    # 2. replay filter
+    replay = ReplayFilter(window=3600, slices=6, error_rate=1e-6, max_bytes=8 * 1024 * 1024)
+    false_positives = missed = 0
+    begin = time.perf_counter()
+    for arrival, msg, copy in messages:
+        accepted = replay.check(msg=msg, now=arrival)
+        if copy and accepted:
+            missed += 1
+        elif not copy and not accepted:
+            false_positives += 1
+    elapsed = time.perf_counter() - begin
+    metrics = replay.metrics
+    print('filter  %9.0f msg/s, %7.1f MB, %d per slice' % (len(messages) / elapsed, metrics['bytes'] / 1024 / 1024,
+                                                           replay.capacity))
+    print('        false positives %d (%.2e), copies missed %d, estimated rate %.2e' % (
+        false_positives, false_positives / count, missed, metrics['error_rate']))
+    # 3. batch
+    replay = ReplayFilter(window=3600, slices=6, error_rate=1e-6, max_bytes=8 * 1024 * 1024)
+    batch = 256
+    begin = time.perf_counter()
+    for index in range(0, len(messages), batch):
+        items = messages[index:index + batch]
+        replay.check_messages(messages=[msg for _, msg, _ in items], now=items[-1][0])
+    elapsed = time.perf_counter() - begin
+    print('batch   %9.0f msg/s' % (len(messages) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Receiver Routing
+    ~~~~~~~~~~~~~~~~
+
+    Simulate station nodes locally: route many receivers over the ring,
+    measure lookup throughput (single, batch, cached), load balance, and
+    how many receivers move when a node joins or leaves.
+
+    usage:
+        python benchmarks/routing.py [receivers] [nodes]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimp.utils import RoutingTable
+
+
+def receivers(count: int) -> list:
+    return ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUg%d' % (index, index % 10) for index in range(count)]
+
+
+def assignment(table: RoutingTable, ids: list) -> dict:
+    return dict(zip(ids, table.lookup_batch(identifiers=ids)))
+
+
+def moved(before: dict, after: dict) -> float:
+    return sum(1 for key, node in before.items() if after[key] != node) / len(before)
+
+
+def best(run, rounds: int = 3) -> float:
+    elapsed = []
+    for _ in range(rounds):
+        begin = time.perf_counter()
+        run()
+        elapsed.append(time.perf_counter() - begin)
+    return min(elapsed)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    ids = receivers(count)
+    nodes = ['station%d' % index for index in range(total)]
+    for vnodes in [40, 160]:
+        table = RoutingTable(nodes=nodes, vnodes=vnodes, cache_size=0)
+        single = count / best(lambda: [table.lookup(identifier=identifier) for identifier in ids])
+        batch = count / best(lambda: table.lookup_batch(identifiers=ids))
+        before = assignment(table=table, ids=ids)
+        loads = [0] * total
+        for node in before.values():
+            loads[nodes.index(node)] += 1
+        spread = statistics.pstdev(loads) / (count / total) * 100
+        # join
+        table.add_node(node='station%d' % total)
+        joined = moved(before, assignment(table=table, ids=ids))
+        # leave
+        table.remove_node(node='station%d' % total)
+        table.remove_node(node=nodes[0])
+        left = moved(before, assignment(table=table, ids=ids))
+        print('vnodes=%-4d lookup %8.0f/s, batch %8.0f/s, load stdev %4.1f%%, '
+              'join moved %4.1f%% (ideal %4.1f%%), leave moved %4.1f%% (ideal %4.1f%%)' % (
+                  vnodes, single, batch, spread, joined * 100, 100 / (total + 1), left * 100, 100 / total))
+    # cached lookups, receivers repeat in real traffic
+    table = RoutingTable(nodes=nodes)
+    hot = ids[:10000] * 20
+    table.lookup_batch(identifiers=hot)
+    print('cached     lookup %8.0f/s' % (len(hot) / best(lambda: table.lookup_batch(identifiers=hot))))
+    # replicas: owner stays first, replicas are distinct
+    replicas = [table.lookup_replicas(identifier=identifier, count=3) for identifier in ids[:1000]]
+    assert all(len(set(item)) == 3 and item[0] == table.lookup(identifier) for item, identifier in
+               zip(replicas, ids[:1000])), 'replica sets error'
+    # terminals of one user go to the same node
+    assert table.lookup(ids[0] + '/pc') == table.lookup(ids[0] + '/mobile') == table.lookup(ids[0])
+    print('replicas   ok')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Wire Codecs
+    ~~~~~~~~~~~
+
+    Compare JsON with the binary (MessagePack) wire codec on a traffic mix:
+    size per kind of message, encode/decode throughput, and check that
+    every message decodes to its JsON form.
+
+    usage:
+        python benchmarks/wire_codec.py [count]
+
+    NOTICE: JsON & base64 coders come from 'dimplugins', install it first.
+"""
+
+import os
+import random
+import sys
+import time
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import json_encode, base64_encode
+from dimp.utils import JSONWireCodec, PackWireCodec
+from dimp.utils import wire
+
+
+SENDER = 'moky@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUgQ'
+RECEIVER = 'hulk@4YeVEN3aUnvC1DNUufCq1bs9zoBSJTzVEj'
+GROUP = 'Group-1280719982@7oMeWadRw4qat2sL4mTdcQSDAqZSo7LH5G'
+
+
+def b64(size: int) -> str:
+    return base64_encode(data=bytes(random.getrandbits(8) for _ in range(size)))
+
+
+def member(index: int) -> str:
+    return 'user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUg%d' % (index, index % 10)
+
+
+def envelope(receiver: str = RECEIVER) -> dict:
+    return {'sender': SENDER, 'receiver': receiver, 'time': time.time() + random.random()}
+
+
+def text_message() -> dict:
+    # AES ciphertext of a short text, RSA-2048 encrypted key, ECDSA signature
+    return dict(envelope(), data=b64(random.randint(48, 256)), key=b64(256), signature=b64(72))
+
+
+def receipt_message() -> dict:
+    # reused key, no 'key' field
+    return dict(envelope(), data=b64(160), signature=b64(72))
+
+
+def group_message() -> dict:
+    members = 20
+    info = dict(envelope(receiver=GROUP), data=b64(random.randint(48, 512)), signature=b64(72))
+    info['keys'] = {member(index): b64(256) for index in range(members)}
+    info['keys']['digest'] = b64(8)
+    return info
+
+
+def file_message() -> dict:
+    return dict(envelope(), data=b64(4096), key=b64(256), signature=b64(72))
+
+
+def visa() -> dict:
+    properties = {
+        'did': SENDER, 'name': 'Albert Moky', 'created_time': time.time(),
+        'avatar': 'https://avatars.githubusercontent.com/u/1189795',
+        'key': {'algorithm': 'RSA', 'data': b64(294)},
+    }
+    return {'did': SENDER, 'type': 'visa', 'data': json_encode(container=properties), 'signature': b64(72)}
+
+
+def first_contact_message() -> dict:
+    meta = {'type': 'MKM', 'key': {'algorithm': 'ECC', 'data': b64(65)}, 'seed': 'moky', 'fingerprint': b64(72)}
+    return dict(text_message(), meta=meta, visa=visa())
+
+
+def broadcast_message() -> dict:
+    # plaintext JsON content in 'data'
+    body = json_encode(container={'type': 'command', 'cmd': 'login', 'sn': random.getrandbits(32)})
+    return dict(envelope(receiver='stations@everywhere'), data=body, signature=b64(72))
+
+
+MIX = [
+    ('text', text_message, 55),
+    ('receipt', receipt_message, 15),
+    ('group', group_message, 10),
+    ('file', file_message, 5),
+    ('first-contact', first_contact_message, 5),
+    ('broadcast', broadcast_message, 5),
+    ('document', visa, 5),
+]
+
+
+def traffic(count: int):
+    kinds = [(name, build) for name, build, weight in MIX for _ in range(weight)]
+    for _ in range(count):
+        name, build = random.choice(kinds)
+        yield name, build()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    ExtensionLoader().load()
+    PluginLoader().load()
+    random.seed(1189795)
+    items = list(traffic(count))
+    codecs = [JSONWireCodec(), PackWireCodec()]
+    print('msgpack backend: %s' % ('pure python' if wire.msgpack is None else 'C extension'))
+    sizes = {codec.name: {} for codec in codecs}
+    for codec in codecs:
+        # size & lossless check
+        table = sizes[codec.name]
+        for name, info in items:
+            data = codec.encode(info=info)
+            assert codec.decode(data=data) == info, f'{codec.name} round trip failed: {name}'
+            total, number = table.get(name, (0, 0))
+            table[name] = (total + len(data), number + 1)
+        # throughput
+        messages = [info for _, info in items]
+        start = time.perf_counter()
+        packed = [codec.encode(info=info) for info in messages]
+        encoding = time.perf_counter() - start
+        start = time.perf_counter()
+        for data in packed:
+            codec.decode(data=data)
+        decoding = time.perf_counter() - start
+        print('%-8s encode %8.0f msg/s, decode %8.0f msg/s' % (codec.name, count / encoding, count / decoding))
+    print()
+    print('%-14s %6s %10s %10s %8s' % ('kind', 'count', 'json', 'msgpack', 'saved'))
+    all_json = all_pack = 0
+    for name, _, _ in MIX:
+        json_total, number = sizes['json'].get(name, (0, 0))
+        pack_total, _ = sizes['msgpack'].get(name, (0, 0))
+        if number == 0:
+            continue
+        all_json += json_total
+        all_pack += pack_total
+        print('%-14s %6d %10.1f %10.1f %7.1f%%' % (name, number, json_total / number, pack_total / number,
+                                                    (1 - pack_total / json_total) * 100))
+    print('%-14s %6d %10d %10d %7.1f%%' % ('total bytes', count, all_json, all_pack,
+                                           (1 - all_pack / all_json) * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -28,18 +28,40 @@
 # SOFTWARE.
 # ==============================================================================
 
-from .format import *
-from .crypto import *
-from .protocol import *
-from .mkm import *
-from .dkd import *
-from .ext import *
+from .loader import lazy_exports
+
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
+
+    ('.format', '*'),
+    ('.crypto', '*'),
+    ('.protocol', '*'),
+    ('.mkm', '*'),
+    ('.dkd', '*'),
+    ('.ext', '*'),
+
+])
 
 
 name = "DIMP"
 
 __author__ = 'Albert Moky'
 
+
+def register_factories():
+    """
+    Register default helpers & factories in this package (idempotent)
+
+    Modules are loaded when their names are first accessed, so the factories
+    they used to register on import may not exist yet; call this at start-up
+    to make sure the defaults are ready, helpers set by plugins are kept.
+    """
+    from .format.pnf_wrapper import register_wrapper_factory
+    from .format import file, file_wrapper
+    from .protocol import base, quote
+    register_wrapper_factory()
+
+
 __all__ = [
 
     'Singleton',
@@ -226,6 +248,9 @@ __all__ = [
     'BaseMeta',
     'BaseDocument', 'BaseVisa', 'BaseBulletin',
 
+    'MetaMatchMemo', 'shared_meta_memo', 'meta_matches',
+    'canonical_encode', 'PropertiesEncoder',
+
     #
     #   Content Implementations
     #
@@ -31,7 +31,14 @@
 from mkm.digest import *
 from mkm.crypto import *
 
-from .algorithms import AsymmetricAlgorithms, SymmetricAlgorithms
+from ..loader import lazy_exports
+
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
+
+    ('.algorithms', 'AsymmetricAlgorithms', 'SymmetricAlgorithms'),
+
+])
 
 
 __all__ = [
@@ -30,30 +30,37 @@
 
 from dkd.protocol import *
 
-from ..protocol import *
-
-from ..protocol.base import BaseContent, BaseCommand
-# from ..protocol.base import CommandHelper, GeneralCommandHelper
-# from ..protocol.base import CommandExtension, CmdExtension
-
-from ..protocol.contents import BaseTextContent, WebPageContent, NameCardContent
-from ..protocol.assets import BaseMoneyContent, TransferMoneyContent
-from ..protocol.files import BaseFileContent, ImageFileContent, AudioFileContent, VideoFileContent
-from ..protocol.forward import SecretContent, CombineForwardContent, ListContent
-from ..protocol.quote import BaseQuoteContent
-# from ..protocol.quote import QuoteHelper, QuotePurifier, QuoteExtension
-
-from ..protocol.commands import BaseMetaCommand, BaseDocumentCommand
-from ..protocol.receipt import BaseReceiptCommand
-from ..protocol.groups import BaseHistoryCommand, BaseGroupCommand
-from ..protocol.groups import InviteGroupCommand, ExpelGroupCommand
-from ..protocol.groups import JoinGroupCommand, QuitGroupCommand, ResetGroupCommand
-
-from .envelope import MessageEnvelope
-from .base import BaseMessage
-from .instant import PlainMessage
-from .secure import EncryptedMessage
-from .reliable import NetworkMessage
+from ..loader import lazy_exports
+
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
+
+    ('..protocol', '*'),
+
+    ('..protocol.base', 'BaseContent', 'BaseCommand'),
+    # ('..protocol.base', 'CommandHelper', 'GeneralCommandHelper'),
+    # ('..protocol.base', 'CommandExtension', 'CmdExtension'),
+
+    ('..protocol.contents', 'BaseTextContent', 'WebPageContent', 'NameCardContent'),
+    ('..protocol.assets', 'BaseMoneyContent', 'TransferMoneyContent'),
+    ('..protocol.files', 'BaseFileContent', 'ImageFileContent', 'AudioFileContent', 'VideoFileContent'),
+    ('..protocol.forward', 'SecretContent', 'CombineForwardContent', 'ListContent'),
+    ('..protocol.quote', 'BaseQuoteContent'),
+    # ('..protocol.quote', 'QuoteHelper', 'QuotePurifier', 'QuoteExtension'),
+
+    ('..protocol.commands', 'BaseMetaCommand', 'BaseDocumentCommand'),
+    ('..protocol.receipt', 'BaseReceiptCommand'),
+    ('..protocol.groups', 'BaseHistoryCommand', 'BaseGroupCommand'),
+    ('..protocol.groups', 'InviteGroupCommand', 'ExpelGroupCommand'),
+    ('..protocol.groups', 'JoinGroupCommand', 'QuitGroupCommand', 'ResetGroupCommand'),
+
+    ('.envelope', 'MessageEnvelope'),
+    ('.base', 'BaseMessage'),
+    ('.instant', 'PlainMessage'),
+    ('.secure', 'EncryptedMessage'),
+    ('.reliable', 'NetworkMessage'),
+
+])
 
 
 __all__ = [
@@ -57,6 +57,8 @@ from mkm.types import Dictionary
 from mkm.protocol import ID
 from dkd.protocol import Envelope, Message
 
+from ..stats import lazy_stats
+
 
 class BaseMessage(Dictionary, Message):
 
@@ -78,6 +80,8 @@ class BaseMessage(Dictionary, Message):
         if env is None:
             # let envelope share the same dictionary with message
             env = Envelope.parse(envelope=super().to_dict())
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'envelope')
             self.__envelope = env
         return env
 
@@ -35,6 +35,8 @@ from mkm.types import Dictionary
 from mkm.protocol import ID, ANYONE
 from dkd.protocol import Envelope
 
+from ..stats import lazy_stats
+
 
 """
     Envelope for message
@@ -83,6 +85,8 @@ class MessageEnvelope(Dictionary, Envelope):
         if did is None:
             did = self.get('sender')
             did = ID.parse(identifier=did)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'sender')
             assert did is not None, 'message sender error: %s' % super().to_dict()
             self.__sender = did
         return did
@@ -93,6 +97,8 @@ class MessageEnvelope(Dictionary, Envelope):
         if did is None:
             did = self.get('receiver')
             did = ID.parse(identifier=did)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'receiver')
             if did is None:
                 did = ANYONE
             self.__receiver = did
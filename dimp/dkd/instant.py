@@ -36,6 +36,8 @@ from dkd.protocol import Content
 from dkd.protocol import Envelope
 from dkd.protocol import InstantMessage
 
+from ..stats import lazy_stats
+
 from .base import BaseMessage
 
 
@@ -93,6 +95,8 @@ class PlainMessage(BaseMessage, InstantMessage):
         if body is None:
             info = self.get('content')
             body = Content.parse(content=info)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'content')
             assert body is not None, 'message content error: %s' % self.to_dict()
             self.__content = body
         return body
@@ -33,6 +33,8 @@ from typing import Optional, Dict
 from mkm.format import TransportableData
 from dkd.protocol import ReliableMessage
 
+from ..stats import lazy_stats
+
 from .secure import EncryptedMessage
 
 
@@ -74,6 +76,8 @@ class NetworkMessage(EncryptedMessage, ReliableMessage):
             base64 = self.get('signature')
             assert base64 is not None, f'message signature cannot be empty: {self}'
             ted = TransportableData.parse(base64)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'signature', size=len(base64) if isinstance(base64, str) else 0)
             assert ted is not None, f'failed to decode message signature: {base64}'
             self.__signature = ted
         assert ted is not None, 'message signature error: %s' % self.get('signature')
@@ -34,6 +34,7 @@ from mkm.format import TransportableData
 from dkd.protocol import SecureMessage
 
 from ..format import PlainData
+from ..stats import lazy_stats
 
 from .base import BaseMessage
 
@@ -84,6 +85,8 @@ class EncryptedMessage(BaseMessage, SecureMessage):
                 ted = PlainData.create(string=text)  # JsON
             else:
                 assert False, f'content data error: {text}'
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'data', size=len(text) if isinstance(text, str) else 0)
             self.__data = ted
         assert ted is not None, 'message data error: %s' % self.get('data')
         return ted
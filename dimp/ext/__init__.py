@@ -31,15 +31,23 @@
 from mkm.ext import *
 from dkd.ext import *
 
-from ..format.file import TransportableFileHelper
-from ..format.file import TransportableFileExtension
-from ..format.file_wrapper import TransportableFileWrapperExtension
+from ..loader import lazy_exports
 
-from ..protocol.base import CommandHelper, GeneralCommandHelper
-from ..protocol.base import CommandExtension, CmdExtension
 
-from ..protocol.quote import QuoteHelper, QuotePurifier
-from ..protocol.quote import QuoteExtension
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
+
+    ('..format.file', 'TransportableFileHelper'),
+    ('..format.file', 'TransportableFileExtension'),
+    ('..format.file_wrapper', 'TransportableFileWrapperExtension'),
+
+    ('..protocol.base', 'CommandHelper', 'GeneralCommandHelper'),
+    ('..protocol.base', 'CommandExtension', 'CmdExtension'),
+
+    ('..protocol.quote', 'QuoteHelper', 'QuotePurifier'),
+    ('..protocol.quote', 'QuoteExtension'),
+
+])
+
 
 __all__ = [
 
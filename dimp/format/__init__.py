@@ -26,20 +26,27 @@
 from mkm.types import *
 from mkm.format import *
 
-from .duri import Header, DataURI
+from ..loader import lazy_exports
 
-from .base import EncodeAlgorithms
-from .base import BaseString, BaseData
 
-from .data import Base64Data, PlainData
-from .embed import EmbedData
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
 
-from .file import TransportableFile, TransportableFileFactory
-# from .file import TransportableFileHelper, TransportableFileExtension
-from .file_wrapper import TransportableFileWrapper, TransportableFileWrapperFactory
-# from .file_wrapper import TransportableFileWrapperExtension
-from .pnf import PortableNetworkFile
-from .pnf_wrapper import PortableNetworkFileWrapper
+    ('.duri', 'Header', 'DataURI'),
+
+    ('.base', 'EncodeAlgorithms'),
+    ('.base', 'BaseString', 'BaseData'),
+
+    ('.data', 'Base64Data', 'PlainData'),
+    ('.embed', 'EmbedData'),
+
+    ('.file', 'TransportableFile', 'TransportableFileFactory'),
+    # ('.file', 'TransportableFileHelper', 'TransportableFileExtension'),
+    ('.file_wrapper', 'TransportableFileWrapper', 'TransportableFileWrapperFactory'),
+    # ('.file_wrapper', 'TransportableFileWrapperExtension'),
+    ('.pnf', 'PortableNetworkFile'),
+    ('.pnf_wrapper', 'PortableNetworkFileWrapper'),
+
+])
 
 
 __all__ = [
@@ -28,6 +28,8 @@ from typing import Optional
 from mkm.format import base64_encode, base64_decode
 from mkm.format import utf8_encode, utf8_decode
 
+from ..stats import lazy_stats
+
 from .base import EncodeAlgorithms
 from .base import BaseData
 
@@ -46,6 +48,8 @@ class Base64Data(BaseData):
             base64 = self._string
             assert base64 is not None, f'Base64Data error: {self}'
             data = base64_decode(string=base64)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'binary', size=len(data))
             self._binary = data
         return data
 
@@ -84,6 +88,8 @@ class PlainData(BaseData):
             txt = self._string
             assert txt is not None, f'PlainData error: {self}'
             data = utf8_encode(string=txt)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'binary', size=len(data))
             self._binary = data
         return data
 
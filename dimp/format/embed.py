@@ -27,6 +27,8 @@ from typing import Optional, Dict
 
 from mkm.format import base64_encode
 
+from ..stats import lazy_stats
+
 from .base import EncodeAlgorithms
 from .base import BaseData
 from .duri import DataURI
@@ -64,6 +66,8 @@ class EmbedData(BaseData):
             uri = self.data_uri
             if uri is not None:
                 data = uri.content
+                if lazy_stats.enabled:
+                    lazy_stats.record(self, 'binary', size=len(data))
                 self._binary = data
         return data
 
@@ -284,7 +284,9 @@ class TransportableFileExtension:
         )
 
 
-shared_format_extensions.pnf_helper: Optional[TransportableFileHelper] = None
+# NOTICE: this module may be loaded lazily, do not reset the helper set by plugins
+if not hasattr(shared_format_extensions, 'pnf_helper'):
+    shared_format_extensions.pnf_helper: Optional[TransportableFileHelper] = None
 
 
 def format_extensions() -> TransportableFileExtension:
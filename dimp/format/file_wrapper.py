@@ -172,7 +172,9 @@ class TransportableFileWrapperExtension:
         )
 
 
-shared_format_extensions.pnf_wrapper_factory: Optional[TransportableFileWrapperFactory] = None
+# NOTICE: this module may be loaded lazily, do not reset the factory set by plugins
+if not hasattr(shared_format_extensions, 'pnf_wrapper_factory'):
+    shared_format_extensions.pnf_wrapper_factory: Optional[TransportableFileWrapperFactory] = None
 
 
 def format_extensions() -> TransportableFileWrapperExtension:
@@ -181,7 +183,12 @@ def format_extensions() -> TransportableFileWrapperExtension:
 
 def wrapper_factory() -> TransportableFileWrapperFactory:
     ext = format_extensions()
-    return ext.pnf_wrapper_factory
+    factory = ext.pnf_wrapper_factory
+    if factory is None:
+        # default factory, registered on first use
+        from .pnf_wrapper import register_wrapper_factory
+        factory = register_wrapper_factory()
+    return factory
     # return shared_format_extensions.pnf_wrapper_factory
 
 
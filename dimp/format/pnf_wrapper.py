@@ -29,9 +29,11 @@ from mkm.types import URI, Mapper, Converter
 from mkm.crypto import SymmetricKey, DecryptKey
 from mkm.format import TransportableData
 
+from ..stats import lazy_stats
+
 from .file_wrapper import TransportableFileWrapper
 from .file_wrapper import TransportableFileWrapperFactory
-from .file_wrapper import set_wrapper_factory
+from .file_wrapper import format_extensions, set_wrapper_factory
 
 
 class PortableNetworkFileWrapper(TransportableFileWrapper):
@@ -119,6 +121,8 @@ class PortableNetworkFileWrapper(TransportableFileWrapper):
         if ted is None:
             base64 = self.__dictionary.get('data')
             ted = TransportableData.parse(base64)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'data')
             self.__attachment = ted
         return ted
 
@@ -219,4 +223,11 @@ class _PNFWrapperFactory(TransportableFileWrapperFactory):
         return wrapper
 
 
-set_wrapper_factory(factory=_PNFWrapperFactory())
+def register_wrapper_factory() -> TransportableFileWrapperFactory:
+    """ Register default PNF wrapper factory, if not set yet (idempotent) """
+    ext = format_extensions()
+    factory = ext.pnf_wrapper_factory
+    if factory is None:
+        factory = _PNFWrapperFactory()
+        set_wrapper_factory(factory=factory)
+    return factory
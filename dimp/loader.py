@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Lazy Exports
+    ~~~~~~~~~~~~
+
+    Package attributes are imported from their modules when first accessed
+    (PEP 562), so 'import dimp' does not load every module up front:
+
+        __getattr__, __dir__ = lazy_exports(__name__, globals(), [
+            ('.version', 'MetaType', 'DocumentType'),
+            ('..protocol', '*'),  # all names in 'dimp.protocol.__all__'
+        ])
+"""
+
+from importlib import import_module
+from typing import Any, Callable, Tuple, List, Dict
+
+
+def lazy_exports(package: str, namespace: Dict[str, Any],
+                 imports: List[Tuple[str, ...]]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build module level '__getattr__' & '__dir__' for a package
+
+    :param package:   package name, for relative modules
+    :param namespace: globals() of the package, to cache loaded names
+    :param imports:   [(module, name, ...)], name '*' for all names in 'module.__all__'
+    :return: (__getattr__, __dir__)
+    """
+    table: Dict[str, str] = {}  # name => module
+    stars: List[str] = []
+    for module, *names in imports:
+        for name in names:
+            if name == '*':
+                stars.append(module)
+            else:
+                table.setdefault(name, module)
+
+    def load(name: str) -> Any:
+        if name.startswith('__'):
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        module = table.get(name)
+        if module is not None:
+            value = getattr(import_module(module, package), name)
+        else:
+            value = _search(name)
+        # cache it, '__getattr__' will not be called for this name again
+        namespace[name] = value
+        return value
+
+    def _search(name: str) -> Any:
+        for module in stars:
+            mod = import_module(module, package)
+            if name in getattr(mod, '__all__', ()):
+                return getattr(mod, name)
+        # sub-module not imported yet
+        try:
+            return import_module('.%s' % name, package)
+        except ModuleNotFoundError as error:
+            if error.name != '%s.%s' % (package, name):
+                raise
+        raise AttributeError(f'module {package!r} has no attribute {name!r}')
+
+    def names() -> List[str]:
+        return sorted(set(namespace) | set(table) | set(namespace.get('__all__', ())))
+
+    return load, names
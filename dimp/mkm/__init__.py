@@ -31,13 +31,23 @@
 from mkm.protocol import *
 from mkm.protocol.broadcast import BroadcastAddress, Identifier
 
-from ..protocol import MetaType
-from ..protocol import DocumentType
-from ..protocol import Visa, Bulletin
+from ..loader import lazy_exports
 
-from .meta import BaseMeta
-from .document import BaseDocument
-from .docs import BaseVisa, BaseBulletin
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
+
+    ('..protocol', 'MetaType'),
+    ('..protocol', 'DocumentType'),
+    ('..protocol', 'Visa', 'Bulletin'),
+
+    ('.meta', 'BaseMeta'),
+    ('.document', 'BaseDocument'),
+    ('.docs', 'BaseVisa', 'BaseBulletin'),
+    ('.memo', 'MetaMatchMemo', 'shared_meta_memo', 'meta_matches'),
+    ('.canonical', 'canonical_encode', 'PropertiesEncoder'),
+    ('.verifier', 'SignatureVerifier', 'shared_signature_verifier'),
+
+])
 
 
 __all__ = [
@@ -79,4 +89,8 @@ __all__ = [
     'BaseMeta',
     'BaseDocument', 'BaseVisa', 'BaseBulletin',
 
+    'MetaMatchMemo', 'shared_meta_memo', 'meta_matches',
+    'canonical_encode', 'PropertiesEncoder',
+    'SignatureVerifier', 'shared_signature_verifier',
+
 ]
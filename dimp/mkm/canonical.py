@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Canonical Properties
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Document properties are signed as a JsON string, and signing again
+    after changing one property used to re-encode the whole map. Encode
+    them canonically instead:
+
+        keys      : sorted, compact separators (',', ':')
+        strings   : non-ASCII escaped, same as the default JsON coder
+        numbers   : Python's shortest round-trip repr
+
+    so the output is a concatenation of per-property fragments
+
+        '{' + '"name":value' + ',' + ... + '}'
+
+    Each fragment is cached with the value object it was encoded from,
+    and re-encoded when the property holds another object, or when it is
+    invalidated by name ('BaseDocument.set_property()' does).
+
+    NOTICE: a dict/list property changed in place keeps the same object,
+            so change it through 'set_property()', or its stale fragment
+            will be signed.
+"""
+
+import json
+from typing import Optional, Any, Dict, Tuple
+
+
+_encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+
+def canonical_encode(value: Any) -> str:
+    """ Encode value to canonical JsON string """
+    return _encoder.encode(value)
+
+
+class PropertiesEncoder:
+    """
+        Canonical encoder caching fragments per top-level property
+
+        A cached fragment is reused while the property still holds the
+        same value object and has not been invalidated.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__fragments: Dict[str, Tuple[Any, str]] = {}  # name => (value, '"name":value')
+        self.__hits = 0
+        self.__misses = 0
+
+    def invalidate(self, name: Optional[str] = None):
+        """ Drop cached fragment of the property (all if name is None) """
+        if name is None:
+            self.__fragments.clear()
+        else:
+            self.__fragments.pop(name, None)
+
+    def encode(self, properties: Dict[str, Any]) -> str:
+        """ Encode properties, same as canonical_encode(properties) """
+        fragments = self.__fragments
+        parts = []
+        kept = 0  # fragments of current properties
+        for name in sorted(properties):
+            value = properties[name]
+            cached = fragments.get(name)
+            if cached is not None and cached[0] is value:
+                self.__hits += 1
+                kept += 1
+                parts.append(cached[1])
+                continue
+            assert isinstance(name, str), f'property name error: {name}'
+            text = _encoder.encode(name) + ':' + _encoder.encode(value)
+            fragments[name] = (value, text)
+            kept += 1
+            self.__misses += 1
+            parts.append(text)
+        if len(fragments) > kept:
+            # properties removed
+            for name in [key for key in fragments if key not in properties]:
+                fragments.pop(name)
+        return '{' + ','.join(parts) + '}'
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'fragments': len(self.__fragments),
+            'hits': self.__hits,
+            'misses': self.__misses,
+        }
@@ -38,6 +38,7 @@ from mkm.protocol import ID
 from ..format import TransportableFile
 from ..protocol import DocumentType
 from ..protocol import Visa, Bulletin
+from ..stats import lazy_stats
 
 from .document import BaseDocument
 
@@ -81,6 +82,8 @@ class BaseVisa(BaseDocument, Visa):
             info = self.get_property(name='key')
             # assert info is not None, 'visa key not found: %s' % self.to_dict()
             pub = PublicKey.parse(key=info)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'public_key')
             if isinstance(pub, EncryptKey):
                 visa_key = pub
                 self.__key = visa_key
@@ -109,6 +112,8 @@ class BaseVisa(BaseDocument, Visa):
                 # FIXME: handle it in PNF parser?
                 return None
             img = TransportableFile.parse(url)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'avatar')
             self.__avatar = img
         return img
 
@@ -34,10 +34,14 @@ from mkm.types import DateTime
 from mkm.types import Dictionary, Converter
 from mkm.crypto import VerifyKey, SignKey
 from mkm.format import TransportableData
-from mkm.format import json_encode, json_decode, utf8_encode
+from mkm.format import json_decode, utf8_encode
 from mkm.protocol import Document
 
 from ..format import Base64Data
+from ..stats import lazy_stats
+
+from .canonical import PropertiesEncoder
+from .verifier import shared_signature_verifier
 
 
 """
@@ -98,6 +102,7 @@ class BaseDocument(Dictionary, Document):
         self.__sig = signature  # LocalUser(identifier).sign(data)
         self.__properties = properties
         self.__status = status  # 1 for valid, -1 for invalid
+        self.__encoder: Optional[PropertiesEncoder] = None
 
     @property  # private
     def data(self) -> Optional[str]:
@@ -157,7 +162,7 @@ class BaseDocument(Dictionary, Document):
         elif signature is None or len(signature) == 0:
             # signature error
             self.__status = -1
-        elif public_key.verify(data=utf8_encode(string=data), signature=signature):
+        elif shared_signature_verifier.verify(key=public_key, data=utf8_encode(string=data), signature=signature):
             # signature matched
             self.__status = 1
         else:
@@ -184,12 +189,15 @@ class BaseDocument(Dictionary, Document):
         #     return signature
         # 1. update sign time
         self.set_property(name='time', value=DateTime.current_timestamp())
-        # 2. encode & sign
+        # 2. encode (canonical JsON, reusing fragments of unchanged properties) & sign
         info = self.properties
         if info is None:
             # assert False, 'document invalid: %s' % self.to_dict()
             return None
-        data = json_encode(info)
+        encoder = self.__encoder
+        if encoder is None:
+            encoder = self.__encoder = PropertiesEncoder()
+        data = encoder.encode(info)
         assert len(data) > 0, f'should not happen: {info}'
         signature = private_key.sign(data=utf8_encode(string=data))
         assert len(signature) > 0, f'should not happen: {info}'
@@ -222,6 +230,8 @@ class BaseDocument(Dictionary, Document):
             else:
                 # get properties from data
                 info = json_decode(string=data)
+                if lazy_stats.enabled:
+                    lazy_stats.record(self, 'properties', size=len(data))
                 assert isinstance(info, Dict), f'document data error: {data}'
             self.__properties = info
         return info
@@ -234,7 +244,12 @@ class BaseDocument(Dictionary, Document):
 
     # Override
     def set_property(self, name: str, value: Optional[Any]):
-        """ Update property with key and value """
+        """
+        Update property with key and value
+
+        NOTICE: call it after changing a dict/list property in place too,
+                the encoded fragment of the property is kept for signing
+        """
         # 1. reset status
         assert self.__status >= 0, f'status error: {self}'
         self.__status = 0
@@ -246,6 +261,9 @@ class BaseDocument(Dictionary, Document):
             info.pop(name, None)
         else:
             info[name] = value
+        encoder = self.__encoder
+        if encoder is not None:
+            encoder.invalidate(name=name)
         # 3. clear data signature after properties changed
         self.pop('data', None)
         self.pop('signature', None)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Meta Match Memo
+    ~~~~~~~~~~~~~~~
+
+    Checking a meta received for an ID costs a signature verification
+    (meta.is_valid) and an address generation; the same (ID, meta) pair
+    comes again and again (meta commands, document responses, ...),
+    so remember the outcomes process-wide:
+
+        key   : ('', sha256(meta info))
+        value : meta is valid (fingerprint verified)
+
+        key   : (ID, sha256(meta info))
+        value : meta is valid and generates the ID's address
+
+    The digest covers the whole meta info, so a changed meta never hits
+    a cached outcome.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Tuple, Dict
+
+from mkm.protocol import Address, ID, Meta
+
+
+def meta_digest(meta: Meta) -> str:
+    """ Stable digest of meta info """
+    text = json.dumps(meta.to_dict(), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def check_meta(identifier: ID, meta: Meta) -> bool:
+    """ Meta is valid and generates the ID's address (not cached) """
+    if not meta.is_valid:
+        return False
+    old = identifier.address
+    gen = Address.generate(meta=meta, network=old.network)
+    return old == gen
+
+
+class MetaMatchMemo:
+    """ Bounded LRU of (ID, meta digest) => match outcome """
+
+    def __init__(self, capacity: int = 4096):
+        super().__init__()
+        self.__capacity = capacity
+        self.__lock = threading.Lock()
+        self.__outcomes: Dict[Tuple[str, str], bool] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__outcomes)
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        with self.__lock:
+            return {
+                'size': len(self.__outcomes),
+                'hits': self.__hits,
+                'misses': self.__misses,
+            }
+
+    def clear(self):
+        with self.__lock:
+            self.__outcomes.clear()
+
+    def _get(self, key: Tuple[str, str]):
+        outcomes = self.__outcomes
+        with self.__lock:
+            outcome = outcomes.get(key)
+            if outcome is None:
+                self.__misses += 1
+            else:
+                outcomes.move_to_end(key)
+                self.__hits += 1
+            return outcome
+
+    def _set(self, key: Tuple[str, str], outcome: bool):
+        outcomes = self.__outcomes
+        with self.__lock:
+            outcomes[key] = outcome
+            outcomes.move_to_end(key)
+            while len(outcomes) > self.__capacity:
+                outcomes.popitem(last=False)
+
+    def is_valid(self, meta: Meta, checker: Callable[[], bool]) -> bool:
+        """
+        Check meta fingerprint, with cached outcome
+
+        :param meta:    meta received
+        :param checker: verify meta when not cached
+        :return: True on meta valid
+        """
+        key = ('', meta_digest(meta=meta))
+        outcome = self._get(key=key)
+        if outcome is None:
+            # verify outside the lock
+            outcome = checker()
+            self._set(key=key, outcome=outcome)
+        return outcome
+
+    def matches(self, identifier: ID, meta: Meta) -> bool:
+        """
+        Check meta for ID, with cached outcome
+
+        :param identifier: entity ID
+        :param meta:       meta received
+        :return: True on meta valid and matches the ID
+        """
+        key = (str(identifier), meta_digest(meta=meta))
+        outcome = self._get(key=key)
+        if outcome is None:
+            # verify outside the lock
+            outcome = check_meta(identifier=identifier, meta=meta)
+            self._set(key=key, outcome=outcome)
+        return outcome
+
+
+# process-wide memo
+shared_meta_memo = MetaMatchMemo()
+
+
+def meta_matches(identifier: ID, meta: Meta) -> bool:
+    """ Check meta for ID with the process-wide memo """
+    return shared_meta_memo.matches(identifier=identifier, meta=meta)
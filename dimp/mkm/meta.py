@@ -29,7 +29,7 @@
 # ==============================================================================
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import Optional, Callable, Any, Dict
 
 from mkm.types import Dictionary
 from mkm.format import TransportableData
@@ -39,6 +39,11 @@ from mkm.protocol import Meta
 from mkm.ext import GeneralAccountHelper
 from mkm.ext import GeneralAccountExtension, shared_account_extensions
 
+from ..stats import lazy_stats
+
+from .memo import shared_meta_memo
+from .verifier import shared_signature_verifier
+
 
 """
     User/Group Meta data
@@ -121,6 +126,8 @@ class BaseMeta(Dictionary, Meta, ABC):
         if self.__key is None:
             info = self.get('key')
             self.__key = PublicKey.parse(key=info)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'public_key')
             assert self.__key is not None, f'meta key error: {info}'
         return self.__key
 
@@ -158,8 +165,8 @@ class BaseMeta(Dictionary, Meta, ABC):
     @property
     def is_valid(self) -> bool:
         if self.__status == 0:
-            # meta from network, try to verify
-            if self._check_valid():
+            # meta from network, try to verify (outcome memoized process-wide)
+            if shared_meta_memo.is_valid(meta=self, checker=self._check_valid):
                 # correct
                 self.__status = 1
             else:
@@ -169,36 +176,45 @@ class BaseMeta(Dictionary, Meta, ABC):
 
     # private
     def _check_valid(self) -> bool:
-        key = self.public_key
-        if key is None:
-            return False
-        elif self.has_seed:
-            # check 'seed' & 'fingerprint'
-            pass
-        elif 'seed' in self.to_dict() or 'fingerprint' in self.to_dict():
-            # this meta has no seed, so
-            # it should not contains 'seed' or 'fingerprint'
-            return False
-        else:
-            # this meta has no seed, so it's always valid
-            # when the public key exists
-            return True
-        seed = self.seed
-        fingerprint = self.fingerprint
-        # check meta seed & signature
-        if fingerprint is None or fingerprint.is_empty:
-            # meta error
-            return False
-        elif seed is None or len(seed) == 0:
-            # meta error
-            return False
-        # verify fingerprint
-        data = utf8_encode(string=seed)
-        signature = fingerprint.to_bytes()
-        if signature is None or len(signature) == 0:
-            # TED error
-            return False
-        return key.verify(data=data, signature=signature)
+        return check_meta_fingerprint(meta=self)
+
+
+def check_meta_fingerprint(meta: Meta, verify: Callable[[VerifyKey, bytes, bytes], Any] = None) -> Any:
+    """
+    Check meta seed & fingerprint with meta key
+
+    :param meta:   meta info
+    :param verify: function(key, data, signature) doing the signature verification,
+                   'shared_signature_verifier.verify' as default
+    :return: False/True when decided without verification, else the result of 'verify'
+    """
+    key = meta.public_key
+    if key is None:
+        return False
+    seed = meta.seed
+    if seed is None:
+        # this meta has no seed, so
+        # it should not contains 'seed' or 'fingerprint'
+        info = meta.to_dict()
+        # otherwise it's always valid when the public key exists
+        return 'seed' not in info and 'fingerprint' not in info
+    fingerprint = meta.fingerprint
+    # check meta seed & signature
+    if fingerprint is None or fingerprint.is_empty:
+        # meta error
+        return False
+    elif len(seed) == 0:
+        # meta error
+        return False
+    # verify fingerprint
+    data = utf8_encode(string=seed)
+    signature = fingerprint.to_bytes()
+    if signature is None or len(signature) == 0:
+        # TED error
+        return False
+    if verify is None:
+        verify = shared_signature_verifier.verify
+    return verify(key, data, signature)
 
 
 def account_extensions() -> GeneralAccountExtension:
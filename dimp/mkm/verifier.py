@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Signature Verifier
+    ~~~~~~~~~~~~~~~~~~
+
+    Meta (fingerprint), documents and messages verify their signatures
+    through the shared verifier, so a station can hand the work to a
+    crypto worker pool:
+
+        pool = CryptoWorkerPool(initializer=load_plugins)
+        pool.install()  # shared_signature_verifier.pool = pool
+
+    The caller waits for the result, so this helps when several threads
+    (e.g. the executor of AsyncMessageTransformer) verify at the same time.
+"""
+
+from typing import Optional
+
+from mkm.crypto import VerifyKey
+
+
+class SignatureVerifier:
+
+    def __init__(self):
+        super().__init__()
+        # object with 'verify(key, data, signature) -> Future', e.g. CryptoWorkerPool;
+        # None to verify in the calling thread
+        self.pool: Optional = None
+
+    def verify(self, key: VerifyKey, data: bytes, signature: bytes) -> bool:
+        pool = self.pool
+        if pool is None:
+            return key.verify(data=data, signature=signature)
+        return pool.verify(key=key, data=data, signature=signature).result()
+
+
+shared_signature_verifier = SignatureVerifier()
@@ -38,44 +38,51 @@
 from mkm.protocol import *
 from dkd.protocol import *
 
-from .version import MetaType
-from .version import DocumentType
-from .docs import Visa, Bulletin
+from ..loader import lazy_exports
 
-from .types import ContentType
 
-from .base import Command, CommandFactory
-# from .base import BaseContent, BaseCommand
-# from .base import CommandHelper, GeneralCommandHelper
-# from .base import CommandExtension, CmdExtension
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
 
-from .contents import TextContent, PageContent, NameCard
-# from .contents import BaseTextContent, WebPageContent, NameCardContent
+    ('.version', 'MetaType'),
+    ('.version', 'DocumentType'),
+    ('.docs', 'Visa', 'Bulletin'),
 
-from .assets import MoneyContent, TransferContent
-# from .assets import BaseMoneyContent, TransferMoneyContent
+    ('.types', 'ContentType'),
 
-from .files import FileContent, ImageContent, AudioContent, VideoContent
-# from .files import BaseFileContent, ImageFileContent, AudioFileContent, VideoFileContent
+    ('.base', 'Command', 'CommandFactory'),
+    # ('.base', 'BaseContent', 'BaseCommand'),
+    # ('.base', 'CommandHelper', 'GeneralCommandHelper'),
+    # ('.base', 'CommandExtension', 'CmdExtension'),
 
-from .forward import ForwardContent, CombineContent, ArrayContent
-# from .forward import SecretContent, CombineForwardContent, ListContent
+    ('.contents', 'TextContent', 'PageContent', 'NameCard'),
+    # ('.contents', 'BaseTextContent', 'WebPageContent', 'NameCardContent'),
 
-from .quote import QuoteContent
-# from .quote import BaseQuoteContent
-# from .quote import QuoteHelper, QuotePurifier
-# from .quote import QuoteExtension
+    ('.assets', 'MoneyContent', 'TransferContent'),
+    # ('.assets', 'BaseMoneyContent', 'TransferMoneyContent'),
 
-from .commands import MetaCommand, DocumentCommand
-# from .commands import BaseMetaCommand, BaseDocumentCommand
+    ('.files', 'FileContent', 'ImageContent', 'AudioContent', 'VideoContent'),
+    # ('.files', 'BaseFileContent', 'ImageFileContent', 'AudioFileContent', 'VideoFileContent'),
 
-from .receipt import ReceiptCommand
-# from .receipt import BaseReceiptCommand
+    ('.forward', 'ForwardContent', 'CombineContent', 'ArrayContent'),
+    # ('.forward', 'SecretContent', 'CombineForwardContent', 'ListContent'),
 
-from .groups import HistoryCommand, GroupCommand
-from .groups import InviteCommand, ExpelCommand, JoinCommand, QuitCommand, ResetCommand
-# from .groups import BaseHistoryCommand, BaseGroupCommand
-# from .groups import InviteGroupCommand, ExpelGroupCommand, JoinGroupCommand, QuitGroupCommand, ResetGroupCommand
+    ('.quote', 'QuoteContent'),
+    # ('.quote', 'BaseQuoteContent'),
+    # ('.quote', 'QuoteHelper', 'QuotePurifier'),
+    # ('.quote', 'QuoteExtension'),
+
+    ('.commands', 'MetaCommand', 'DocumentCommand'),
+    # ('.commands', 'BaseMetaCommand', 'BaseDocumentCommand'),
+
+    ('.receipt', 'ReceiptCommand'),
+    # ('.receipt', 'BaseReceiptCommand'),
+
+    ('.groups', 'HistoryCommand', 'GroupCommand'),
+    ('.groups', 'InviteCommand', 'ExpelCommand', 'JoinCommand', 'QuitCommand', 'ResetCommand'),
+    # ('.groups', 'BaseHistoryCommand', 'BaseGroupCommand'),
+    # ('.groups', 'InviteGroupCommand', 'ExpelGroupCommand', 'JoinGroupCommand', 'QuitGroupCommand', 'ResetGroupCommand'),
+
+])
 
 
 __all__ = [
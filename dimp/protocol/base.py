@@ -273,8 +273,12 @@ class CmdExtension:
         )
 
 
-shared_message_extensions.command_helper: Optional[CommandHelper] = None
-shared_message_extensions.cmd_helper: Optional[GeneralCommandHelper] = None
+# NOTICE: this module may be loaded lazily, after the helpers were set by plugins,
+#         so only declare the slots here, do not reset them.
+if not hasattr(shared_message_extensions, 'command_helper'):
+    shared_message_extensions.command_helper: Optional[CommandHelper] = None
+if not hasattr(shared_message_extensions, 'cmd_helper'):
+    shared_message_extensions.cmd_helper: Optional[GeneralCommandHelper] = None
 
 
 def message_extensions() -> Union[CommandExtension, CmdExtension, GeneralMessageExtension]:
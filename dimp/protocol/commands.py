@@ -34,6 +34,9 @@ from typing import Optional, List, Dict
 from mkm.types import DateTime
 from mkm.protocol import ID, Meta, Document
 
+from ..stats import lazy_stats
+from ..mkm.memo import meta_matches
+
 from .base import Command
 from .base import BaseCommand
 
@@ -219,8 +222,21 @@ class BaseMetaCommand(BaseCommand, MetaCommand):
     def meta(self) -> Optional[Meta]:
         if self.__meta is None:
             self.__meta = Meta.parse(meta=self.get('meta'))
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'meta')
         return self.__meta
 
+    @property
+    def valid_meta(self) -> Optional[Meta]:
+        """ Get meta when it's valid and matches the ID (outcome memoized process-wide) """
+        meta = self.meta
+        if meta is None:
+            return None
+        identifier = self.identifier
+        if identifier is None or not meta_matches(identifier=identifier, meta=meta):
+            return None
+        return meta
+
 
 class BaseDocumentCommand(BaseMetaCommand, DocumentCommand):
 
@@ -257,6 +273,8 @@ class BaseDocumentCommand(BaseMetaCommand, DocumentCommand):
             docs = self.get('documents')
             if docs is not None:
                 self.__docs = Document.convert(array=docs)
+                if lazy_stats.enabled:
+                    lazy_stats.record(self, 'documents')
         return self.__docs
 
     @property  # Override
@@ -36,6 +36,7 @@ from mkm.protocol import ID
 from dkd.protocol import Content
 
 from ..format import TransportableFile
+from ..stats import lazy_stats
 
 from .types import ContentType
 from .base import BaseContent
@@ -308,7 +309,8 @@ class WebPageContent(BaseContent, PageContent):
         if html is not None:
             self.html = html
         # title, icon, description
-        self.title = title
+        if title is not None:
+            self.title = title
         if desc is not None:
             self.desc = desc
         if icon is not None:
@@ -345,6 +347,8 @@ class WebPageContent(BaseContent, PageContent):
         if img is None:
             base64 = self.get('icon')
             img = TransportableFile.parse(base64)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'icon')
             self.__icon = img
         return img
 
@@ -451,5 +455,7 @@ class NameCardContent(BaseContent, NameCard):
         if img is None:
             url = self.get('avatar')
             img = TransportableFile.parse(url)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'avatar')
             self.__avatar = img
         return img
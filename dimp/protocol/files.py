@@ -39,6 +39,7 @@ from dkd.protocol import Content
 from ..format import TransportableFile
 from ..format import TransportableFileWrapper
 from ..format import PortableNetworkFile
+from ..stats import lazy_stats
 
 from .types import ContentType
 from .base import BaseContent
@@ -422,6 +423,8 @@ class ImageFileContent(BaseFileContent, ImageContent):
         if img is None:
             base64 = self.get('thumbnail')
             img = TransportableFile.parse(base64)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'thumbnail')
             self.__thumbnail = img
         return img
 
@@ -485,6 +488,8 @@ class VideoFileContent(BaseFileContent, VideoContent):
         if img is None:
             base64 = self.get('snapshot')
             img = TransportableFile.parse(base64)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'snapshot')
             self.__snapshot = img
         return img
 
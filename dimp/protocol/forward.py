@@ -29,13 +29,15 @@
 # ==============================================================================
 
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Optional, Iterator, List, Dict
 
+from mkm.format import json_encode
 from dkd.protocol import Content
 from dkd.protocol import InstantMessage, ReliableMessage
 
 from .types import ContentType
 from .base import BaseContent
+from .lazy import LazySequence
 
 
 class ForwardContent(Content, ABC):
@@ -78,7 +80,11 @@ class CombineContent(Content, ABC):
             "sn"   : 67890,
 
             "title"    : "...",  // chat title
-            "messages" : [...]   // chat history
+            "messages" : [...],  // chat history
+
+            "page"     : 0,      // page index (only for paginated history)
+            "pages"    : 3,      // total pages
+            "series"   : 12345   // SN of the first page, shared by all pages
         }
     """
 
@@ -98,6 +104,29 @@ class CombineContent(Content, ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.messages getter'
         )
 
+    def iterator(self) -> Iterator[InstantMessage]:
+        """ Iterate chat history, decoding messages one by one """
+        return iter(self.messages)
+
+    #
+    #   Pagination
+    #
+
+    @property
+    def page(self) -> int:
+        """ Get page index (starting from 0) """
+        return self.get_int(key='page', default=0)
+
+    @property
+    def pages(self) -> int:
+        """ Get total pages (1 for history not paginated) """
+        return self.get_int(key='pages', default=1)
+
+    @property
+    def series(self) -> Optional[int]:
+        """ Get SN of the first page """
+        return self.get_int(key='series')
+
     #
     #   Factory methods
     #
@@ -105,6 +134,47 @@ class CombineContent(Content, ABC):
     def create(cls, title: str, messages: List[InstantMessage]):
         return CombineForwardContent(title=title, messages=messages)
 
+    @classmethod
+    def paginate(cls, title: str, messages: List[InstantMessage],
+                 max_bytes: int = 64 * 1024, max_count: int = 0):  # -> List[CombineContent]:
+        """
+        Split chat history into size-bounded pages
+
+        :param title:     chat title
+        :param messages:  chat history
+        :param max_bytes: max length of serialized messages in one page
+        :param max_count: max messages in one page (0 means unlimited)
+        :return: pages with shared title
+        """
+        chunks = []
+        array = []
+        size = 0
+        for msg in messages:
+            info = msg.to_dict()
+            length = len(json_encode(container=info))
+            if len(array) > 0 and (size + length > max_bytes or 0 < max_count <= len(array)):
+                chunks.append(array)
+                array = []
+                size = 0
+            array.append(info)
+            size += length
+        if len(array) > 0 or len(chunks) == 0:
+            chunks.append(array)
+        # build pages
+        count = len(chunks)
+        pages = []
+        series = None
+        for index in range(count):
+            content = CombineForwardContent(title=title, history=chunks[index])
+            if count > 1:
+                if series is None:
+                    series = content.sn
+                content['page'] = index
+                content['pages'] = count
+                content['series'] = series
+            pages.append(content)
+        return pages
+
 
 class ArrayContent(Content, ABC):
     """
@@ -175,16 +245,13 @@ class SecretContent(BaseContent, ForwardContent):
             info = self.get('secrets')
             if isinstance(info, List):
                 # get from 'secrets'
-                messages = ReliableMessage.convert(array=info)
+                messages = LazySequence(array=info, parse=_parse_reliable_message)
             else:
                 assert info is None, f'secret messages error: {info}'
                 # get from 'forward'
                 forward = self.get('forward')
-                msg = ReliableMessage.parse(msg=forward)
-                if msg is None:
-                    messages = []
-                else:
-                    messages = [msg]
+                array = [] if forward is None else [forward]
+                messages = LazySequence(array=array, parse=_parse_reliable_message)
             self.__secrets = messages
         return messages
 
@@ -192,17 +259,22 @@ class SecretContent(BaseContent, ForwardContent):
 class CombineForwardContent(BaseContent, CombineContent):
 
     def __init__(self, content: Dict = None,
-                 title: str = None, messages: List[InstantMessage] = None):
+                 title: str = None, messages: List[InstantMessage] = None,
+                 history: List[Dict] = None):
         if content is None:
             # 1. new content with message(s)
-            assert not (title is None or messages is None), f'params error: {title}, {messages}'
+            assert title is not None and (messages is None) != (history is None), \
+                f'params error: {title}, {messages}, {history}'
             msg_type = ContentType.COMBINE_FORWARD
             super().__init__(None, msg_type)
             self['title'] = title
-            self['messages'] = InstantMessage.revert(messages=messages)
+            if history is None:
+                history = InstantMessage.revert(messages=messages)
+            self['messages'] = history
         else:
             # 2. content info from network
-            assert title is None and messages is None, f'params error: {title}, {messages}'
+            assert title is None and messages is None and history is None, \
+                f'params error: {title}, {messages}, {history}'
             super().__init__(content)
         # lazy
         self.__history = messages
@@ -217,7 +289,7 @@ class CombineForwardContent(BaseContent, CombineContent):
         if array is None:
             info = self.get('messages')
             if isinstance(info, List):
-                array = InstantMessage.convert(array=info)
+                array = LazySequence(array=info, parse=_parse_instant_message)
             else:
                 assert info is None, f'combined messages error: {info}'
                 array = []
@@ -248,8 +320,20 @@ class ListContent(BaseContent, ArrayContent):
         if array is None:
             info = self.get('contents')
             if isinstance(info, List):
-                array = Content.convert(array=info)
+                array = LazySequence(array=info, parse=_parse_content)
             else:
                 array = []
             self.__list = array
         return array
+
+
+def _parse_reliable_message(info) -> Optional[ReliableMessage]:
+    return ReliableMessage.parse(msg=info)
+
+
+def _parse_instant_message(info) -> Optional[InstantMessage]:
+    return InstantMessage.parse(msg=info)
+
+
+def _parse_content(info) -> Optional[Content]:
+    return Content.parse(content=info)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+from collections.abc import Sequence
+from typing import Optional, Callable, Iterator, Union, Any, List, Dict
+
+from ..stats import lazy_stats
+
+
+class LazySequence(Sequence):
+    """
+        Read-only Lazy Sequence
+        ~~~~~~~~~~~~~~~~~~~~~~~
+
+        Wraps a raw JSON list, and converts the item only when it's accessed;
+        the length comes from the raw list, so 'len(seq)' and 'seq[-1]'
+        convert nothing / one item.
+
+        Slicing returns a view sharing the same raw list & converted items.
+
+        NOTICE: an item that cannot be parsed is None, both by index and when
+                iterating, so positions always match the raw list.
+    """
+
+    def __init__(self, array: List, parse: Callable[[Any], Optional[Any]],
+                 indices: range = None, cache: Dict[int, Any] = None):
+        super().__init__()
+        if indices is None:
+            indices = range(len(array))
+        if cache is None:
+            cache = {}
+        self.__array = array
+        self.__parse = parse
+        self.__indices = indices
+        self.__cache = cache  # raw index => converted item (None for invalid)
+
+    # private
+    def _get(self, pos: int) -> Optional[Any]:
+        cache = self.__cache
+        if pos in cache:
+            return cache[pos]
+        item = self.__parse(self.__array[pos])
+        if lazy_stats.enabled:
+            lazy_stats.record(self, self.__parse.__name__.lstrip('_'))
+        cache[pos] = item
+        return item
+
+    def __len__(self) -> int:
+        return len(self.__indices)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return LazySequence(array=self.__array, parse=self.__parse,
+                                indices=self.__indices[index], cache=self.__cache)
+        return self._get(pos=self.__indices[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        for pos in self.__indices:
+            yield self._get(pos=pos)
+
+    def __contains__(self, value: Any) -> bool:
+        for item in self:
+            if item is value or item == value:
+                return True
+        return False
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (LazySequence, list)):
+            return list(self) == list(other)
+        return False
+
+    def __add__(self, other: Any) -> List:
+        return list(self) + list(other)
+
+    def __radd__(self, other: Any) -> List:
+        return list(other) + list(self)
+
+    def copy(self) -> List:
+        return list(self)
+
+    def __repr__(self) -> str:
+        clazz = self.__class__.__name__
+        return f'<{clazz} count={len(self)} converted={len(self.__cache)} />'
+
+    __hash__ = None
+
+    @property
+    def raw(self) -> List:
+        """ Raw items in this sequence (without converting) """
+        array = self.__array
+        return [array[pos] for pos in self.__indices]
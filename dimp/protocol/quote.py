@@ -35,6 +35,8 @@ from mkm.types import Converter
 from dkd.protocol import Content, Envelope
 from dkd.ext import shared_message_extensions
 
+from ..stats import lazy_stats
+
 from .types import ContentType
 from .base import BaseContent
 
@@ -141,6 +143,8 @@ class BaseQuoteContent(BaseContent, QuoteContent):
         if env is None:
             # origin: { sender: "...", receiver: "...", time: 0 }
             env = Envelope.parse(envelope=self.origin)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'original_envelope')
             self.__env = env
         return env
 
@@ -223,7 +227,9 @@ class QuoteExtension:
         )
 
 
-shared_message_extensions.quote_helper: QuoteHelper = QuotePurifier()
+# NOTICE: this module may be loaded lazily, do not reset the helper set by plugins
+if not hasattr(shared_message_extensions, 'quote_helper'):
+    shared_message_extensions.quote_helper: QuoteHelper = QuotePurifier()
 
 
 def message_extensions() -> QuoteExtension:
@@ -41,6 +41,8 @@ from typing import Optional, Dict
 from mkm.types import Converter
 from dkd.protocol import Envelope, Content
 
+from ..stats import lazy_stats
+
 from .base import BaseCommand
 from .commands import Command
 from .quote import quote_helper
@@ -178,6 +180,8 @@ class BaseReceiptCommand(BaseCommand, ReceiptCommand):
         if self.__env is None:
             # origin: { sender: "...", receiver: "...", time: 0 }
             self.__env = Envelope.parse(envelope=self.origin)
+            if lazy_stats.enabled:
+                lazy_stats.record(self, 'original_envelope')
         return self.__env
 
     @property  # Override
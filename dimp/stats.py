@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Lazy Stats
+    ~~~~~~~~~~
+
+    Counters for lazy fields materialized from the inner dictionaries
+    (envelope, content, TED, ID, key, document properties, ...).
+
+    Disabled by default, the lazy getters only test the 'enabled' flag
+    before calling 'record()', so it costs almost nothing when off:
+
+        if lazy_stats.enabled:
+            lazy_stats.record(self, 'signature', size=len(data))
+
+    usage:
+        lazy_stats.enable()
+        ...
+        print(render_prometheus(lazy_stats.snapshot()))
+"""
+
+import threading
+from typing import Any, List, Dict
+
+
+class LazyStats:
+    """ Materialization counters, per class & field """
+
+    def __init__(self):
+        super().__init__()
+        # public flag, checked by the lazy getters before recording
+        self.enabled = False
+        self.__lock = threading.Lock()
+        self.__counters: Dict[str, Dict[str, List[int]]] = {}  # class => field => [count, bytes]
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, obj: Any, field: str, size: int = 0):
+        """
+        Count a lazy field materialized
+
+        :param obj:   owner of the lazy field
+        :param field: field name
+        :param size:  bytes decoded
+        """
+        clazz = obj if isinstance(obj, str) else type(obj).__name__
+        with self.__lock:
+            fields = self.__counters.get(clazz)
+            if fields is None:
+                fields = {}
+                self.__counters[clazz] = fields
+            counter = fields.get(field)
+            if counter is None:
+                fields[field] = [1, size]
+            else:
+                counter[0] += 1
+                counter[1] += size
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Copy of counters
+
+        :return: {class: {field: {'count': N, 'bytes': N}}}
+        """
+        with self.__lock:
+            return {
+                clazz: {
+                    field: {'count': counter[0], 'bytes': counter[1]} for field, counter in fields.items()
+                } for clazz, fields in self.__counters.items()
+            }
+
+    def reset(self):
+        with self.__lock:
+            self.__counters.clear()
+
+
+# shared counters
+lazy_stats = LazyStats()
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(snapshot: Dict[str, Dict[str, Dict[str, int]]], prefix: str = 'dimp_lazy') -> str:
+    """ Render snapshot in Prometheus text exposition format """
+    metrics = [
+        ('%s_materializations_total' % prefix, 'count', 'Lazy fields materialized.'),
+        ('%s_decoded_bytes_total' % prefix, 'bytes', 'Bytes decoded by lazy fields.'),
+    ]
+    lines = []
+    for name, key, desc in metrics:
+        lines.append('# HELP %s %s' % (name, desc))
+        lines.append('# TYPE %s counter' % name)
+        for clazz in sorted(snapshot):
+            fields = snapshot[clazz]
+            for field in sorted(fields):
+                lines.append('%s{class="%s",field="%s"} %d' % (name, _label(clazz), _label(field),
+                                                               fields[field][key]))
+    lines.append('')
+    return '\n'.join(lines)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    DIMP - Utilities
+    ~~~~~~~~~~~~~~~~
+
+    Data structures for message delivery & processing
+"""
+
+from ..loader import lazy_exports
+
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), [
+
+    ('..stats', 'LazyStats', 'lazy_stats', 'render_prometheus'),
+
+    ('.wheel', 'TimingWheel'),
+    ('.pending', 'PendingMessage', 'PendingDeliveryIndex'),
+    ('.unwrap', 'ForwardUnwrapper', 'SecretIterator'),
+    ('.coalescer', 'ContentCoalescer'),
+    ('.blobs', 'BlobStore', 'LocalBlobStore', 'AttachmentOffloader'),
+    ('.chunks', 'ChunkTransport', 'HTTPChunkTransport', 'ChunkManifest', 'ChunkedTransfer'),
+    ('.compress', 'ContentCompressor'),
+    ('.transform', 'AsyncMessageTransformer'),
+    ('.crypto_pool', 'CryptoWorkerPool', 'PooledSignKey', 'PooledVerifyKey'),
+    ('.wire', 'WireCodec', 'JSONWireCodec', 'PackWireCodec', 'WireNegotiator'),
+    ('.dictzip', 'PresetDictionary', 'DictionaryCompressor', 'train_dictionary'),
+    ('.ledger', 'LedgerEntry', 'TransferLedger'),
+    ('.jitter', 'ReorderBuffer'),
+    ('.replay', 'BloomFilter', 'ReplayFilter'),
+    ('.msglog', 'MessageLog'),
+    ('.offline', 'OfflineQueue', 'frame_messages', 'unframe_messages'),
+    ('.routing', 'RoutingTable'),
+    ('.dispatcher', 'PartitionedDispatcher'),
+
+])
+
+
+__all__ = [
+
+    'LazyStats', 'lazy_stats', 'render_prometheus',
+
+    'TimingWheel',
+
+    'PendingMessage', 'PendingDeliveryIndex',
+
+    'ForwardUnwrapper', 'SecretIterator',
+
+    'ContentCoalescer',
+
+    'BlobStore', 'LocalBlobStore', 'AttachmentOffloader',
+    'ChunkTransport', 'HTTPChunkTransport', 'ChunkManifest', 'ChunkedTransfer',
+
+    'ContentCompressor',
+    'AsyncMessageTransformer',
+    'CryptoWorkerPool', 'PooledSignKey', 'PooledVerifyKey',
+
+    'WireCodec', 'JSONWireCodec', 'PackWireCodec', 'WireNegotiator',
+    'PresetDictionary', 'DictionaryCompressor', 'train_dictionary',
+
+    'LedgerEntry', 'TransferLedger',
+
+    'ReorderBuffer',
+    'BloomFilter', 'ReplayFilter',
+    'MessageLog',
+    'OfflineQueue', 'frame_messages', 'unframe_messages',
+    'RoutingTable',
+    'PartitionedDispatcher',
+
+]
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Attachment Offloading
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Move big inline file data out of the message:
+        1. encrypt the attachment with the content's password;
+        2. upload the encrypted data to a blob store;
+        3. replace 'data' with 'URL' in the file content.
+    Receivers fetch & decrypt the attachment when they need it.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+from urllib.parse import urlparse, unquote
+from urllib.request import pathname2url
+
+from mkm.types import URI
+from mkm.crypto import SymmetricKey, DecryptKey
+from mkm.digest import sha256
+from mkm.format import hex_encode
+
+from ..crypto import SymmetricAlgorithms
+from ..protocol import FileContent
+
+
+class BlobStore(ABC):
+    """ Storage for encrypted attachments """
+
+    @abstractmethod
+    def upload(self, data: bytes, filename: Optional[str]) -> URI:
+        """
+        Save encrypted file data
+
+        :param data:     encrypted file data
+        :param filename: original filename
+        :return: download URL
+        """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.upload()'
+        )
+
+    @abstractmethod
+    def download(self, url: URI) -> Optional[bytes]:
+        """
+        Load encrypted file data
+
+        :param url: download URL
+        :return: encrypted file data, None on not found
+        """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.download()'
+        )
+
+
+def blob_name(data: bytes, filename: Optional[str]) -> str:
+    """ Content addressed name: hex(sha256(data)) + ext """
+    name = hex_encode(data=sha256(data=data))
+    if filename is not None:
+        _, ext = os.path.splitext(filename)
+        if 0 < len(ext) <= 8:
+            name += ext
+    return name
+
+
+class LocalBlobStore(BlobStore):
+    """ Blob store in a local directory, with 'file://' URLs """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.__directory = os.path.abspath(directory)
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    # Override
+    def upload(self, data: bytes, filename: Optional[str]) -> URI:
+        os.makedirs(self.__directory, exist_ok=True)
+        path = os.path.join(self.__directory, blob_name(data=data, filename=filename))
+        if not os.path.exists(path):
+            tmp = '%s.%d.tmp' % (path, os.getpid())
+            with open(tmp, 'wb') as file:
+                file.write(data)
+            os.replace(tmp, path)
+        return 'file://' + pathname2url(path)
+
+    # Override
+    def download(self, url: URI) -> Optional[bytes]:
+        info = urlparse(url)
+        if info.scheme != 'file':
+            return None
+        path = os.path.abspath(unquote(info.path))
+        if os.path.dirname(path) != self.__directory or not os.path.isfile(path):
+            # not my blob
+            return None
+        with open(path, 'rb') as file:
+            return file.read()
+
+
+class AttachmentOffloader:
+    """
+        Attachment Offloader
+        ~~~~~~~~~~~~~~~~~~~~
+
+        Sender:   call 'offload(content)' before packing the message;
+        Receiver: call 'fetch(content)' when the attachment is needed.
+    """
+
+    def __init__(self, store: BlobStore, threshold: int = 4096,
+                 algorithm: str = SymmetricAlgorithms.AES):
+        """
+        Create offloader
+
+        :param store:     blob store
+        :param threshold: min size of file data to be offloaded
+        :param algorithm: algorithm of the password generated for file without one
+        """
+        super().__init__()
+        self.__store = store
+        self.__threshold = threshold
+        self.__algorithm = algorithm
+
+    @property
+    def store(self) -> BlobStore:
+        return self.__store
+
+    def offload(self, content: FileContent) -> bool:
+        """
+        Upload big inline file data, and replace it with URL
+
+        :param content: file content
+        :return: True on offloaded
+        """
+        ted = content.data
+        if ted is None:
+            # no inline data
+            return False
+        data = ted.to_bytes()
+        if data is None or len(data) < self.__threshold:
+            # small file, keep it inline
+            return False
+        # 1. encrypt with the content's password
+        password = content.password
+        if password is None:
+            password = SymmetricKey.generate(algorithm=self.__algorithm)
+            assert password is not None, f'failed to generate key: {self.__algorithm}'
+        else:
+            # the password may be shared by other attachments,
+            # use a copy without IV, so each attachment gets its own IV
+            password = attachment_key(password=password)
+        params = password.to_dict()
+        encrypted = password.encrypt(data, extra=params)
+        # 2. upload to blob store
+        url = self.__store.upload(data=encrypted, filename=content.filename)
+        if url is None:
+            return False
+        # 3. replace 'data' with 'URL'
+        content.data = None
+        content.url = url
+        content.password = password
+        return True
+
+    def fetch(self, content: FileContent) -> Optional[bytes]:
+        """
+        Get file data, download & decrypt it if it's not inline
+
+        :param content: file content
+        :return: file data, None on failed
+        """
+        ted = content.data
+        if ted is not None:
+            return ted.to_bytes()
+        url = content.url
+        if url is None:
+            return None
+        encrypted = self.__store.download(url=url)
+        if encrypted is None:
+            return None
+        password = content.password
+        if password is None:
+            # file not encrypted
+            return encrypted
+        return decrypt_blob(data=encrypted, password=password)
+
+
+def attachment_key(password: SymmetricKey) -> SymmetricKey:
+    """ Copy of the password for one attachment, without IV """
+    info = password.copy_dict()
+    info.pop('IV', None)
+    info.pop('iv', None)
+    key = SymmetricKey.parse(key=info)
+    assert key is not None, f'password error: {password}'
+    return key
+
+
+def decrypt_blob(data: bytes, password: DecryptKey) -> Optional[bytes]:
+    params = password.to_dict()
+    return password.decrypt(data, params=params)
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Worker Channel
+    ~~~~~~~~~~~~~~
+
+    Pipe to a worker process, shared by the crypto pool & the dispatcher:
+
+        1. items are buffered and sent in batches by a sender thread;
+        2. results are received by a receiver thread to complete the futures;
+        3. start all processes before any channel, so no worker is forked
+           while the threads of other channels are running.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Callable, Any, Tuple, List, Dict
+
+
+def start_worker(context, target: Callable, args: tuple, name: str) -> Tuple[Any, Any]:
+    """
+    Start worker process with the child end of a new pipe as first argument
+
+    :param context: multiprocessing context
+    :param target:  worker main function
+    :param args:    arguments after the connection
+    :param name:    process name
+    :return: (parent connection, process)
+    """
+    parent, child = context.Pipe()
+    process = context.Process(target=target, args=(child,) + args, name=name, daemon=True)
+    process.start()
+    child.close()
+    return parent, process
+
+
+class WorkerChannel:
+    """
+        Batching Channel to Worker
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        Items are tuples with the item id first; the worker sends back
+        lists of (id, ok, value) for them; items without future get no result.
+    """
+
+    def __init__(self, conn, process, batch_size: int, batch_delay: float,
+                 on_sent: Optional[Callable[[List[tuple]], None]] = None,
+                 on_done: Optional[Callable[[float], None]] = None, name: str = 'worker'):
+        """
+        Create channel, call 'start()' after all worker processes started
+
+        :param conn:        parent connection from 'start_worker()'
+        :param process:     worker process from 'start_worker()'
+        :param batch_size:  max items in one IPC send
+        :param batch_delay: seconds to wait for filling a batch
+        :param on_sent:     callback with each batch sent
+        :param on_done:     callback with seconds from submitting to result
+        :param name:        worker name for errors
+        """
+        super().__init__()
+        self.conn = conn
+        self.process = process
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.__on_sent = on_sent
+        self.__on_done = on_done
+        self.__name = name
+        self.lock = threading.Condition()
+        self.buffer: List[tuple] = []
+        self.futures: Dict[Any, tuple] = {}  # item id => (future, start time)
+        self.running = True
+        self.sender = threading.Thread(target=self._send_loop, daemon=True)
+        self.receiver = threading.Thread(target=self._recv_loop, daemon=True)
+
+    def start(self):
+        self.sender.start()
+        self.receiver.start()
+
+    @property
+    def depth(self) -> int:
+        """ Items waiting for results """
+        with self.lock:
+            return len(self.futures)
+
+    def submit(self, item: tuple, future: Optional[Future] = None):
+        """ Buffer item for sending, the future completes with its result """
+        with self.lock:
+            if future is not None:
+                self.futures[item[0]] = (future, time.perf_counter())
+            self.buffer.append(item)
+            if len(self.buffer) == 1 or len(self.buffer) >= self.batch_size:
+                self.lock.notify()
+
+    def _send_loop(self):
+        batch_size = self.batch_size
+        while True:
+            with self.lock:
+                while self.running and len(self.buffer) == 0:
+                    self.lock.wait()
+                if not self.running and len(self.buffer) == 0:
+                    break
+                # wait a moment for more items to fill the batch
+                deadline = time.perf_counter() + self.batch_delay
+                while len(self.buffer) < batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0 or not self.running:
+                        break
+                    self.lock.wait(timeout=remaining)
+                batch = self.buffer[:batch_size]
+                del self.buffer[:batch_size]
+            try:
+                self.conn.send(batch)
+            except (OSError, ValueError) as error:
+                for item in batch:
+                    self._done(item_id=item[0], ok=False, value=error)
+                continue
+            if self.__on_sent is not None:
+                self.__on_sent(batch)
+
+    def _recv_loop(self):
+        while True:
+            try:
+                results = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            for item_id, ok, value in results:
+                self._done(item_id=item_id, ok=ok, value=value if ok else RuntimeError(value))
+        # worker gone
+        with self.lock:
+            pending = list(self.futures.keys())
+        for item_id in pending:
+            self._done(item_id=item_id, ok=False, value=RuntimeError('%s stopped' % self.__name))
+
+    def _done(self, item_id: Any, ok: bool, value: Any):
+        with self.lock:
+            pair = self.futures.pop(item_id, None)
+        if pair is None:
+            return
+        future, start = pair
+        if self.__on_done is not None:
+            self.__on_done(time.perf_counter() - start)
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def stop(self, timeout: float):
+        with self.lock:
+            self.running = False
+            self.lock.notify_all()
+        if self.sender.is_alive():
+            self.sender.join(timeout=timeout)
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
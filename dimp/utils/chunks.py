@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Chunked File Transfer
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Split big attachments into fixed-size chunks with their own digests,
+    upload/download them in parallel, and resume from verified chunks.
+
+    manifest format: {
+        "filename"   : "video.mp4",
+        "size"       : 12345678,
+        "chunk_size" : 1048576,
+        "digest"     : "{HEX}",         // sha256(file data)
+        "chunks"     : [
+            {"digest": "{HEX}", "URL": "http://..."},  // 'URL' exists after uploaded
+            ...
+        ]
+    }
+
+    The manifest is uploaded after all chunks, and the file content carries
+    its URL marked with '#chunks' in the PNF:
+
+        content : {
+            type     : i2s(0x16),
+            URL      : "http://.../{digest}.manifest#chunks",
+            filename : "video.mp4",
+            key      : {...}  // password of the (encrypted) file data
+        }
+"""
+
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Set, List, Dict
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+from mkm.types import URI
+from mkm.types import Dictionary
+from mkm.digest import sha256
+from mkm.format import hex_encode
+from mkm.format import json_encode, json_decode
+from mkm.format import utf8_encode, utf8_decode
+
+from ..protocol import FileContent
+
+
+def hex_digest(data: bytes) -> str:
+    return hex_encode(data=sha256(data=data))
+
+
+class ChunkTransport(ABC):
+    """ Remote storage for chunks """
+
+    @abstractmethod
+    def put(self, name: str, data: bytes) -> Optional[URI]:
+        """ Upload data with name, return URL """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.put()'
+        )
+
+    @abstractmethod
+    def get(self, url: URI) -> Optional[bytes]:
+        """ Download data from URL """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.get()'
+        )
+
+
+class HTTPChunkTransport(ChunkTransport):
+    """ Upload with 'PUT {base_url}/{name}', download with 'GET {url}' """
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        super().__init__()
+        if not base_url.endswith('/'):
+            base_url += '/'
+        self.__base_url = base_url
+        self.__timeout = timeout
+
+    # Override
+    def put(self, name: str, data: bytes) -> Optional[URI]:
+        url = self.__base_url + name
+        request = Request(url=url, data=data, method='PUT', headers={
+            'Content-Type': 'application/octet-stream',
+        })
+        with urlopen(request, timeout=self.__timeout) as response:
+            if 200 <= response.status < 300:
+                return url
+
+    # Override
+    def get(self, url: URI) -> Optional[bytes]:
+        try:
+            with urlopen(url, timeout=self.__timeout) as response:
+                return response.read()
+        except HTTPError as error:
+            if error.code == 404:
+                return None
+            raise
+
+
+class ChunkManifest(Dictionary):
+    """ Manifest of chunks """
+
+    # fragment marking the manifest URL in PNF
+    URL_FRAGMENT = '#chunks'
+
+    @classmethod
+    def is_manifest_url(cls, url: Optional[URI]) -> bool:
+        """ Check whether the PNF URL refers to a chunks manifest """
+        return url is not None and url.endswith(cls.URL_FRAGMENT)
+
+    @property
+    def filename(self) -> Optional[str]:
+        return self.get_str(key='filename')
+
+    @property
+    def size(self) -> int:
+        return self.get_int(key='size', default=0)
+
+    @property
+    def chunk_size(self) -> int:
+        return self.get_int(key='chunk_size', default=0)
+
+    @property
+    def digest(self) -> Optional[str]:
+        return self.get_str(key='digest')
+
+    @property
+    def chunks(self) -> List[Dict]:
+        return self.get('chunks')
+
+    @property
+    def completed(self) -> bool:
+        """ All chunks uploaded """
+        for item in self.chunks:
+            if item.get('URL') is None:
+                return False
+        return True
+
+    #
+    #   Factories
+    #
+
+    @classmethod
+    def create(cls, data: bytes, chunk_size: int, filename: Optional[str] = None):
+        assert chunk_size > 0, f'chunk size error: {chunk_size}'
+        chunks = []
+        for start in range(0, len(data), chunk_size):
+            chunks.append({
+                'digest': hex_digest(data=data[start:start + chunk_size]),
+            })
+        info = {
+            'size': len(data),
+            'chunk_size': chunk_size,
+            'digest': hex_digest(data=data),
+            'chunks': chunks,
+        }
+        if filename is not None:
+            info['filename'] = filename
+        return ChunkManifest(dictionary=info)
+
+    @classmethod
+    def parse(cls, manifest):  # -> Optional[ChunkManifest]:
+        if manifest is None:
+            return None
+        elif isinstance(manifest, ChunkManifest):
+            return manifest
+        elif isinstance(manifest, bytes):
+            manifest = utf8_decode(data=manifest)
+        if isinstance(manifest, str):
+            manifest = json_decode(string=manifest)
+        if isinstance(manifest, Dict) and isinstance(manifest.get('chunks'), List):
+            return ChunkManifest(dictionary=manifest)
+
+
+class ChunkedTransfer:
+    """
+        Parallel & Resumable Transfer
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        Upload:   chunks without 'URL' in the manifest will be uploaded,
+                  so call it again with the same manifest to resume.
+        Download: chunks verified & written into the '.part' file are logged
+                  in '.part.done', so call it again with the same path to
+                  resume from them; the whole file digest is checked at last.
+    """
+
+    def __init__(self, transport: ChunkTransport, chunk_size: int = 1024 * 1024, max_workers: int = 4):
+        super().__init__()
+        self.__transport = transport
+        self.__chunk_size = chunk_size
+        self.__max_workers = max_workers
+
+    @property
+    def transport(self) -> ChunkTransport:
+        return self.__transport
+
+    #
+    #   Upload
+    #
+
+    def upload(self, data: bytes, filename: Optional[str] = None,
+               manifest: Optional[ChunkManifest] = None) -> ChunkManifest:
+        """
+        Upload file data in chunks
+
+        :param data:     file data (encrypted)
+        :param filename: file name
+        :param manifest: manifest of the previous (interrupted) uploading
+        :return: manifest, check 'manifest.completed' for result
+        """
+        if manifest is None or manifest.digest != hex_digest(data=data):
+            manifest = ChunkManifest.create(data=data, chunk_size=self.__chunk_size, filename=filename)
+        chunk_size = manifest.chunk_size
+        transport = self.__transport
+        todo = [index for index, item in enumerate(manifest.chunks) if item.get('URL') is None]
+
+        def upload_chunk(index: int) -> Optional[URI]:
+            start = index * chunk_size
+            return transport.put(name=manifest.chunks[index]['digest'], data=data[start:start + chunk_size])
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            futures = {executor.submit(upload_chunk, index): index for index in todo}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    url = future.result()
+                except Exception:
+                    # failed to upload, leave it for resuming
+                    continue
+                if url is not None:
+                    manifest.chunks[index]['URL'] = url
+        return manifest
+
+    def publish(self, manifest: ChunkManifest) -> Optional[URI]:
+        """ Upload the manifest, return its URL (with '#chunks') for the file content """
+        assert manifest.completed, f'chunks not uploaded: {manifest}'
+        data = utf8_encode(string=json_encode(container=manifest.to_dict()))
+        url = self.__transport.put(name='%s.manifest' % manifest.digest, data=data)
+        if url is not None:
+            return url + ChunkManifest.URL_FRAGMENT
+
+    def upload_content(self, content: FileContent, data: bytes,
+                       manifest: Optional[ChunkManifest] = None) -> ChunkManifest:
+        """
+        Upload file data of the content in chunks, then replace 'data' with
+        the manifest URL in its PNF
+
+        :param content:  file content
+        :param data:     file data (encrypted with the content's password)
+        :param manifest: manifest of the previous (interrupted) uploading
+        :return: manifest, check 'manifest.completed' for result
+        """
+        manifest = self.upload(data=data, filename=content.filename, manifest=manifest)
+        if manifest.completed:
+            url = self.publish(manifest=manifest)
+            if url is not None:
+                content.data = None
+                content.url = url
+        return manifest
+
+    #
+    #   Download
+    #
+
+    def fetch_manifest(self, url: URI) -> Optional[ChunkManifest]:
+        if ChunkManifest.is_manifest_url(url=url):
+            url = url[:-len(ChunkManifest.URL_FRAGMENT)]
+        data = self.__transport.get(url=url)
+        return ChunkManifest.parse(manifest=data)
+
+    def download_content(self, content: FileContent, path: str) -> bool:
+        """
+        Download file data of the content with chunks manifest in its PNF
+
+        :param content: file content
+        :param path:    local file path (data still encrypted with the content's password)
+        :return: False on not chunked, or not all chunks downloaded & verified
+        """
+        url = content.url
+        if not ChunkManifest.is_manifest_url(url=url):
+            return False
+        manifest = self.fetch_manifest(url=url)
+        if manifest is None:
+            return False
+        return self.download(manifest=manifest, path=path)
+
+    def download(self, manifest: ChunkManifest, path: str) -> bool:
+        """
+        Download chunks into file
+
+        :param manifest: chunks manifest
+        :param path:     local file path
+        :return: True on all chunks downloaded & verified
+        """
+        chunk_size = manifest.chunk_size
+        chunks = manifest.chunks
+        part = path + '.part'
+        # 1. chunks verified before
+        done = _load_verified(path=part + '.done', digest=manifest.digest)
+        if done is None or not os.path.exists(part):
+            done = set()
+            mode = 'w+b'
+        else:
+            mode = 'r+b'
+        todo = [index for index in range(len(chunks)) if index not in done]
+        lock = threading.Lock()
+        with open(part, mode) as file, open(part + '.done', 'a' if mode == 'r+b' else 'w') as log:
+            if mode == 'w+b':
+                log.write('%s\n' % manifest.digest)
+                log.flush()
+            file.truncate(manifest.size)
+            # 2. download the rest in parallel
+            transport = self.__transport
+
+            def download_chunk(index: int) -> bool:
+                info = chunks[index]
+                url = info.get('URL')
+                if url is None:
+                    return False
+                block = transport.get(url=url)
+                if block is None or hex_digest(data=block) != info['digest']:
+                    return False
+                with lock:
+                    file.seek(index * chunk_size)
+                    file.write(block)
+                    file.flush()
+                    # record it after the data, for resuming
+                    log.write('%d\n' % index)
+                    log.flush()
+                return True
+
+            success = True
+            with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+                futures = {executor.submit(download_chunk, index): index for index in todo}
+                for future in as_completed(futures):
+                    try:
+                        ok = future.result()
+                    except Exception:
+                        # failed to download, leave it for resuming
+                        ok = False
+                    success = success and ok
+            if not success:
+                # keep the '.part' file for resuming
+                return False
+            # 3. verify the whole file
+            file.seek(0)
+            digest = _file_digest(file=file)
+        if digest != manifest.digest:
+            # chunks are fine but the file is not, start over next time
+            os.remove(part)
+            os.remove(part + '.done')
+            return False
+        os.replace(part, path)
+        os.remove(part + '.done')
+        return True
+
+
+def _load_verified(path: str, digest: Optional[str]) -> Optional[Set[int]]:
+    """ Indexes of chunks written into the '.part' file for the manifest """
+    try:
+        with open(path, 'r') as log:
+            lines = log.read().split('\n')
+    except OSError:
+        return None
+    if len(lines) == 0 or lines[0] != digest:
+        return None
+    done = set()
+    # the last line may be cut off
+    for line in lines[1:-1]:
+        if line.isdigit():
+            done.add(int(line))
+    return done
+
+
+def _file_digest(file) -> str:
+    hasher = hashlib.sha256()
+    while True:
+        block = file.read(1024 * 1024)
+        if not block:
+            break
+        hasher.update(block)
+    return hex_encode(data=hasher.digest())
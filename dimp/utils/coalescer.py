@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Content Coalescer
+    ~~~~~~~~~~~~~~~~~
+
+    Buffer small outgoing contents for the same receiver,
+    and pack them into one ArrayContent to save encryptions & signatures.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Optional, Set, Tuple, List, Dict
+
+from mkm.format import json_encode
+from mkm.protocol import ID
+from dkd.protocol import Content
+
+from ..protocol import ContentType
+from ..protocol import ArrayContent
+
+
+class _Bundle:
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+        self.contents: List[Content] = []
+        self.size = 0
+
+
+class ContentCoalescer:
+    """
+        Latency-bounded Coalescer
+        ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        Contents for the same (sender, receiver, group) are buffered until:
+            1. the first one has waited for 'max_delay' seconds; or
+            2. the total size reaches 'max_bytes'; or
+            3. the count reaches 'max_count'.
+        Then they are emitted as one ArrayContent (or the content itself if alone).
+
+        Contents in 'bypass' types are emitted immediately,
+        after flushing the contents buffered before it to keep the order.
+    """
+
+    DEFAULT_BYPASS = {
+        ContentType.COMMAND,
+        ContentType.HISTORY,
+        ContentType.FORWARD,
+        ContentType.ARRAY,
+    }
+
+    def __init__(self, max_delay: float = 0.05, max_bytes: int = 4096, max_count: int = 32,
+                 bypass: Optional[Set[str]] = None):
+        """
+        Create coalescer
+
+        :param max_delay: seconds to hold the first content
+        :param max_bytes: max size of serialized contents in one bundle
+        :param max_count: max contents in one bundle
+        :param bypass:    content types to be sent immediately
+        """
+        super().__init__()
+        if bypass is None:
+            bypass = self.DEFAULT_BYPASS
+        self.__max_delay = max_delay
+        self.__max_bytes = max_bytes
+        self.__max_count = max_count
+        self.__bypass = set(bypass)
+        # (sender, receiver, group) => bundle, in creation order
+        self.__bundles: Dict[Tuple[ID, ID, Optional[ID]], _Bundle] = OrderedDict()
+        # metrics
+        self.__contents_in = 0
+        self.__contents_out = 0
+        self.__messages_out = 0
+
+    #
+    #   Metrics
+    #
+
+    @property
+    def pending(self) -> int:
+        """ Count of contents buffered """
+        return sum(len(bundle.contents) for bundle in self.__bundles.values())
+
+    @property
+    def contents_in(self) -> int:
+        return self.__contents_in
+
+    @property
+    def messages_out(self) -> int:
+        return self.__messages_out
+
+    @property
+    def ratio(self) -> float:
+        """ Coalescing ratio: contents emitted / messages emitted """
+        if self.__messages_out == 0:
+            return 1.0
+        return self.__contents_out / self.__messages_out
+
+    @property
+    def metrics(self) -> Dict:
+        return {
+            'contents_in': self.__contents_in,
+            'contents_out': self.__contents_out,
+            'messages_out': self.__messages_out,
+            'pending': self.pending,
+            'ratio': self.ratio,
+        }
+
+    #
+    #   Coalescing
+    #
+
+    def push(self, sender: ID, receiver: ID, content: Content,
+             now: Optional[float] = None) -> List[Tuple[ID, ID, Content]]:
+        """
+        Add outgoing content
+
+        :param sender:   sender ID
+        :param receiver: receiver ID
+        :param content:  message content
+        :param now:      current time
+        :return: (sender, receiver, content) ready to be sent
+        """
+        if now is None:
+            now = time.time()
+        self.__contents_in += 1
+        key = (sender, receiver, content.group)
+        bundles = self.__bundles
+        outputs = []
+        if content.type in self.__bypass:
+            # latency-critical, flush the previous ones first
+            bundle = bundles.pop(key, None)
+            if bundle is not None:
+                outputs.append(self._emit(key=key, bundle=bundle))
+            outputs.append(self._emit(key=key, bundle=None, content=content))
+            return outputs
+        size = len(json_encode(container=content.to_dict()))
+        bundle = bundles.get(key)
+        if bundle is not None and bundle.size + size > self.__max_bytes:
+            # no room for this one
+            bundles.pop(key, None)
+            outputs.append(self._emit(key=key, bundle=bundle))
+            bundle = None
+        if bundle is None:
+            bundle = _Bundle(deadline=now + self.__max_delay)
+            bundles[key] = bundle
+        bundle.contents.append(content)
+        bundle.size += size
+        if bundle.size >= self.__max_bytes or len(bundle.contents) >= self.__max_count:
+            bundles.pop(key, None)
+            outputs.append(self._emit(key=key, bundle=bundle))
+        return outputs
+
+    def flush(self, now: Optional[float] = None, force: bool = False) -> List[Tuple[ID, ID, Content]]:
+        """
+        Emit bundles which have waited long enough
+
+        :param now:   current time
+        :param force: emit all bundles
+        :return: (sender, receiver, content) ready to be sent
+        """
+        if now is None:
+            now = time.time()
+        bundles = self.__bundles
+        outputs = []
+        while len(bundles) > 0:
+            key = next(iter(bundles))
+            bundle = bundles[key]
+            if not force and bundle.deadline > now:
+                # bundles are in creation order, the rest are not due yet
+                break
+            bundles.pop(key, None)
+            outputs.append(self._emit(key=key, bundle=bundle))
+        return outputs
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """ Time of the earliest bundle to be flushed """
+        for bundle in self.__bundles.values():
+            return bundle.deadline
+
+    # protected
+    def _emit(self, key: Tuple[ID, ID, Optional[ID]], bundle: Optional[_Bundle],
+              content: Optional[Content] = None) -> Tuple[ID, ID, Content]:
+        if bundle is None:
+            count = 1
+        else:
+            contents = bundle.contents
+            count = len(contents)
+            if count == 1:
+                content = contents[0]
+            else:
+                content = ArrayContent.create(contents=contents)
+                group = key[2]
+                if group is not None:
+                    content.group = group
+        self.__contents_out += count
+        self.__messages_out += 1
+        return key[0], key[1], content
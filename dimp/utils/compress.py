@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Content Compression
+    ~~~~~~~~~~~~~~~~~~~
+
+    Ciphertext cannot be compressed, so long contents (text, web page html,
+    combined chat history, ...) are compressed after serializing and before
+    encrypting, and the algorithm is flagged inside the encrypted payload,
+    where relays can neither strip nor forge it:
+
+        data = password.encrypt(payload)
+
+        payload : '{"type": ...}'             // serialized content (JsON)
+                  0x00 'z' + zlib(content)    // compressed with zlib
+                  0x00 'x' + lzma(content)    // compressed with lzma
+
+    JsON never starts with 0x00, so a receiver tells them apart by the first
+    byte. Contents shorter than the threshold, or not shrinking enough, are
+    sent as before.
+
+    NOTICE: receivers without this stage can't read compressed payloads,
+            so only compress for peers known to support it.
+"""
+
+import lzma
+import threading
+import zlib
+from typing import Optional, Tuple, Dict
+
+
+class ContentCompressor:
+    """ Compress serialized content before encryption """
+
+    ZLIB = 'zlib'
+    LZMA = 'lzma'
+
+    # payload header for the algorithm
+    HEADERS = {
+        ZLIB: b'\x00z',
+        LZMA: b'\x00x',
+    }
+
+    def __init__(self, algorithm: str = ZLIB, threshold: int = 1024, max_ratio: float = 0.9,
+                 level: Optional[int] = None):
+        """
+        Create compressor
+
+        :param algorithm: 'zlib' or 'lzma'
+        :param threshold: min size of serialized content to try compressing
+        :param max_ratio: keep compressed data only when 'compressed / original <= max_ratio'
+        :param level:     zlib level (0-9) or lzma preset (0-9), default when None
+        """
+        super().__init__()
+        assert algorithm in (self.ZLIB, self.LZMA), f'compression algorithm not supported: {algorithm}'
+        self.__algorithm = algorithm
+        self.__threshold = threshold
+        self.__max_ratio = max_ratio
+        self.__level = level
+        # metrics
+        self.__lock = threading.Lock()
+        self.__attempts = 0
+        self.__compressed = 0
+        self.__bytes_in = 0
+        self.__bytes_out = 0
+
+    @property
+    def algorithm(self) -> str:
+        return self.__algorithm
+
+    def compress(self, plaintext: bytes) -> Tuple[bytes, Optional[str]]:
+        """
+        Compress serialized content if it's worth it
+
+        :param plaintext: serialized content
+        :return: (payload, algorithm), algorithm is None when not compressed
+        """
+        size = len(plaintext)
+        if size < self.__threshold:
+            return plaintext, None
+        if self.__algorithm == self.ZLIB:
+            level = -1 if self.__level is None else self.__level
+            data = zlib.compress(plaintext, level)
+        else:
+            data = lzma.compress(plaintext, preset=self.__level)
+        data = self.HEADERS[self.__algorithm] + data
+        worth = len(data) <= size * self.__max_ratio
+        with self.__lock:
+            self.__attempts += 1
+            if worth:
+                self.__compressed += 1
+                self.__bytes_in += size
+                self.__bytes_out += len(data)
+        if worth:
+            return data, self.__algorithm
+        return plaintext, None
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        with self.__lock:
+            return {
+                'attempts': self.__attempts,
+                'compressed': self.__compressed,
+                'bytes_in': self.__bytes_in,
+                'bytes_out': self.__bytes_out,
+            }
+
+
+def decompress_content(payload: bytes, max_size: int = 16 * 1024 * 1024) -> Optional[bytes]:
+    """
+    Get serialized content from payload after decryption
+
+    :param payload:  decrypted data, compressed or not
+    :param max_size: limit of decompressed size, against compression bombs
+    :return: None on error, unknown algorithm or too large
+    """
+    if payload[:1] != b'\x00':
+        # not compressed
+        return payload
+    header = payload[:2]
+    data = payload[2:]
+    try:
+        if header == ContentCompressor.HEADERS[ContentCompressor.ZLIB]:
+            decompressor = zlib.decompressobj()
+            plaintext = decompressor.decompress(data, max_size)
+            if decompressor.unconsumed_tail or not decompressor.eof:
+                return None
+        elif header == ContentCompressor.HEADERS[ContentCompressor.LZMA]:
+            decompressor = lzma.LZMADecompressor()
+            plaintext = decompressor.decompress(data, max_length=max_size)
+            if not decompressor.eof:
+                return None
+        else:
+            # unknown algorithm
+            return None
+    except (zlib.error, lzma.LZMAError):
+        return None
+    return plaintext
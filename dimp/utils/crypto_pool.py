@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Crypto Worker Pool
+    ~~~~~~~~~~~~~~~~~~
+
+    Run sign/verify/encrypt/decrypt in worker processes to use all CPU cores.
+
+        1. jobs are routed to workers by key fingerprint (key affinity),
+           each key is registered with its worker once and parsed there,
+           then jobs carry only the key id;
+        2. small jobs are batched per IPC round-trip;
+        3. queue depth & latency are exposed as metrics.
+
+    Call 'install()' to let BaseMeta, BaseDocument and message verifying
+    hand their signature checks to the pool (see 'SignatureVerifier').
+"""
+
+import hashlib
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional, Callable, Any, Tuple, Dict
+
+from mkm.types import Dictionary
+from mkm.crypto import CryptographyKey
+from mkm.crypto import SymmetricKey, PrivateKey, PublicKey
+from mkm.crypto import SignKey, VerifyKey
+from mkm.protocol import Meta
+
+from ..mkm.meta import check_meta_fingerprint
+from ..mkm.verifier import shared_signature_verifier
+
+from .channel import WorkerChannel, start_worker
+
+
+SIGN = 'sign'
+VERIFY = 'verify'
+ENCRYPT = 'encrypt'
+DECRYPT = 'decrypt'
+
+# control items from pool to worker, no result
+_REGISTER = 'register'
+_FORGET = 'forget'
+
+
+def key_fingerprint(key: CryptographyKey) -> str:
+    """ Stable digest of key info """
+    text = json.dumps(key.to_dict(), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def key_kind(key: CryptographyKey) -> str:
+    if isinstance(key, SymmetricKey):
+        return 'symmetric'
+    elif isinstance(key, PrivateKey):
+        return 'private'
+    else:
+        return 'public'
+
+
+def _parse_key(kind: str, info: Dict) -> Optional[CryptographyKey]:
+    if kind == 'symmetric':
+        return SymmetricKey.parse(key=info)
+    elif kind == 'private':
+        return PrivateKey.parse(key=info)
+    else:
+        return PublicKey.parse(key=info)
+
+
+def _execute(key: CryptographyKey, op: str, data: bytes, extra: Any) -> Any:
+    if op == SIGN:
+        return key.sign(data)
+    elif op == VERIFY:
+        return key.verify(data, extra)
+    elif op == ENCRYPT:
+        params = {} if extra is None else extra
+        return key.encrypt(data, extra=params), params
+    elif op == DECRYPT:
+        return key.decrypt(data, params=extra)
+    raise ValueError('unknown crypto operation: %s' % op)
+
+
+def _worker_main(conn, initializer: Optional[Callable]):
+    """ Worker process: keep keys registered by the pool, run jobs with them in batches """
+    if initializer is not None:
+        initializer()
+    keys: Dict[int, Optional[CryptographyKey]] = {}  # key id => key
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        results = []
+        for job_id, op, key_id, data, extra in batch:
+            if op == _REGISTER:
+                # data: key kind, extra: key info
+                try:
+                    keys[key_id] = _parse_key(kind=data, info=extra)
+                except Exception:
+                    # jobs with this key will fail with 'key error'
+                    keys[key_id] = None
+                continue
+            elif op == _FORGET:
+                keys.pop(key_id, None)
+                continue
+            try:
+                key = keys.get(key_id)
+                if key is None:
+                    raise ValueError('key error: %d' % key_id)
+                results.append((job_id, True, _execute(key=key, op=op, data=data, extra=extra)))
+            except Exception as error:
+                results.append((job_id, False, '%s: %s' % (type(error).__name__, error)))
+        if len(results) > 0:
+            conn.send(results)
+
+
+class CryptoWorkerPool:
+    """
+        Process Pool for Crypto Jobs
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        NOTICE: keys are parsed in the worker processes,
+                so the key factories must be ready there:
+                inherited by 'fork', or loaded by the 'initializer'.
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = 32, batch_delay: float = 0.001,
+                 cache_size: int = 1024, initializer: Optional[Callable] = None, context=None):
+        """
+        Create crypto worker pool
+
+        :param workers:     number of processes (CPU count as default)
+        :param batch_size:  max jobs in one IPC round-trip
+        :param batch_delay: seconds to wait for filling a batch
+        :param cache_size:  max keys registered in the workers
+        :param initializer: function to load key factories in worker (must be picklable)
+        :param context:     multiprocessing context
+        """
+        super().__init__()
+        if workers is None or workers <= 0:
+            workers = multiprocessing.cpu_count()
+        if context is None:
+            context = multiprocessing.get_context()
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.__cache_size = cache_size
+        self.__lock = threading.Lock()
+        self.__next_id = 0
+        self.__next_key = 0
+        self.__objects = OrderedDict()  # id(key) => (key, fingerprint), LRU
+        self.__keys = OrderedDict()     # fingerprint => (key id, worker), LRU
+        # metrics
+        self.__jobs = 0
+        self.__sent = 0
+        self.__batches = 0
+        self.__latency_total = 0.0
+        self.__latency_max = 0.0
+        self.__done = 0
+        # fork all processes before starting any thread
+        processes = [start_worker(context=context, target=_worker_main, args=(initializer,),
+                                  name='crypto-worker-%d' % index) for index in range(workers)]
+        self.__workers = [WorkerChannel(conn=conn, process=process, batch_size=batch_size, batch_delay=batch_delay,
+                                        on_sent=self.__sent_batch, on_done=self.count_latency, name='crypto worker')
+                          for conn, process in processes]
+        for worker in self.__workers:
+            worker.start()
+
+    def close(self, timeout: float = 5):
+        self.uninstall()
+        for worker in self.__workers:
+            worker.stop(timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    #
+    #   Metrics
+    #
+
+    def __sent_batch(self, batch: list):
+        # control items are not jobs
+        self.count_batch(size=sum(1 for item in batch if item[0] > 0))
+
+    def count_batch(self, size: int):
+        with self.__lock:
+            self.__batches += 1
+            self.__sent += size
+
+    def count_latency(self, seconds: float):
+        with self.__lock:
+            self.__done += 1
+            self.__latency_total += seconds
+            if seconds > self.__latency_max:
+                self.__latency_max = seconds
+
+    @property
+    def queue_depth(self) -> int:
+        """ Jobs waiting for results """
+        return sum(worker.depth for worker in self.__workers)
+
+    @property
+    def metrics(self) -> Dict:
+        with self.__lock:
+            done = self.__done
+            return {
+                'workers': len(self.__workers),
+                'queue_depth': [worker.depth for worker in self.__workers],
+                'jobs': self.__jobs,
+                'batches': self.__batches,
+                'jobs_per_batch': self.__sent / self.__batches if self.__batches > 0 else 0.0,
+                'latency_avg': self.__latency_total / done if done > 0 else 0.0,
+                'latency_max': self.__latency_max,
+            }
+
+    #
+    #   Jobs
+    #
+
+    def submit(self, op: str, key: CryptographyKey, data: bytes, extra: Any = None) -> Future:
+        """
+        Submit crypto job to the worker owning this key
+
+        :param op:    'sign', 'verify', 'encrypt' or 'decrypt'
+        :param key:   crypto key
+        :param data:  data to sign/verify/encrypt/decrypt
+        :param extra: signature for 'verify', params for 'encrypt'/'decrypt'
+        :return: future of the result ('encrypt' returns (ciphertext, params))
+        """
+        if isinstance(key, _PooledKey):
+            key = key.origin
+        future = Future()
+        with self.__lock:
+            self.__next_id += 1
+            self.__jobs += 1
+            job_id = self.__next_id
+            # enqueue under the lock, so the key won't be forgotten before this job
+            key_id, worker = self.__register(key=key)
+            worker.submit(item=(job_id, op, key_id, data, extra), future=future)
+        return future
+
+    def __register(self, key: CryptographyKey) -> Tuple[int, WorkerChannel]:
+        """ Get key id & its worker, register the key with the worker first time (lock held) """
+        cache_size = self.__cache_size
+        # 1. fingerprint of the key object, calculated once
+        objects = self.__objects
+        pair = objects.get(id(key))
+        if pair is None:
+            fingerprint = key_fingerprint(key=key)
+            # keep the key object, so its id won't be reused by another key
+            objects[id(key)] = (key, fingerprint)
+            if len(objects) > cache_size:
+                objects.popitem(last=False)
+        else:
+            objects.move_to_end(id(key))
+            fingerprint = pair[1]
+        # 2. key registered in the worker
+        keys = self.__keys
+        entry = keys.get(fingerprint)
+        if entry is not None:
+            keys.move_to_end(fingerprint)
+            return entry
+        workers = self.__workers
+        worker = workers[int(fingerprint[:8], 16) % len(workers)]
+        self.__next_key += 1
+        entry = (self.__next_key, worker)
+        worker.submit(item=(0, _REGISTER, self.__next_key, key_kind(key=key), key.to_dict()))
+        keys[fingerprint] = entry
+        if len(keys) > cache_size:
+            _, (old_id, old_worker) = keys.popitem(last=False)
+            old_worker.submit(item=(0, _FORGET, old_id, None, None))
+        return entry
+
+    def sign(self, key: SignKey, data: bytes) -> Future:
+        return self.submit(op=SIGN, key=key, data=data)
+
+    def verify(self, key: VerifyKey, data: bytes, signature: bytes) -> Future:
+        return self.submit(op=VERIFY, key=key, data=data, extra=signature)
+
+    def encrypt(self, key: CryptographyKey, data: bytes, extra: Optional[Dict] = None) -> Future:
+        return self.submit(op=ENCRYPT, key=key, data=data, extra=extra)
+
+    def decrypt(self, key: CryptographyKey, data: bytes, params: Optional[Dict] = None) -> Future:
+        return self.submit(op=DECRYPT, key=key, data=data, extra=params)
+
+    #
+    #   Layers
+    #
+
+    def sign_key(self, key: SignKey) -> SignKey:
+        """ Proxy key for BaseDocument.sign(), message signing, ... """
+        return PooledSignKey(pool=self, key=key)
+
+    def verify_key(self, key: VerifyKey) -> VerifyKey:
+        """ Proxy key for BaseDocument.verify(), message verifying, ... """
+        return PooledVerifyKey(pool=self, key=key)
+
+    def check_meta(self, meta: Meta) -> Future:
+        """ Verify meta fingerprint with meta key (same check as BaseMeta.is_valid) """
+        result = check_meta_fingerprint(meta=meta, verify=self.verify)
+        if isinstance(result, Future):
+            return result
+        # decided without verification
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def install(self):
+        """ Hand signature verifications of BaseMeta, BaseDocument & messages to this pool """
+        shared_signature_verifier.pool = self
+
+    def uninstall(self):
+        if shared_signature_verifier.pool is self:
+            shared_signature_verifier.pool = None
+
+
+class _PooledKey(Dictionary):
+
+    def __init__(self, pool: CryptoWorkerPool, key: CryptographyKey):
+        super().__init__(dictionary=key.to_dict())
+        self.__pool = pool
+        self.__key = key
+
+    @property
+    def pool(self) -> CryptoWorkerPool:
+        return self.__pool
+
+    @property
+    def origin(self) -> CryptographyKey:
+        return self.__key
+
+    @property  # Override
+    def algorithm(self) -> str:
+        return self.__key.algorithm
+
+    @property  # Override
+    def data(self):
+        return self.__key.data
+
+
+class PooledSignKey(_PooledKey, SignKey):
+    """ Sign key running in the worker pool """
+
+    # Override
+    def sign(self, data: bytes) -> bytes:
+        return self.pool.sign(key=self.origin, data=data).result()
+
+
+class PooledVerifyKey(_PooledKey, VerifyKey):
+    """ Verify key running in the worker pool """
+
+    # Override
+    def verify(self, data: bytes, signature: bytes) -> bool:
+        return self.pool.verify(key=self.origin, data=data, signature=signature).result()
+
+    # Override
+    def match_sign_key(self, key: SignKey) -> bool:
+        return self.origin.match_sign_key(key)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Preset Dictionary Compression
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Most reliable messages are small and full of the same field names and
+    ID addresses, which a generic compressor cannot learn from one message.
+    A zlib preset dictionary trained from sample messages fills the window
+    before each message, so those repeats cost a back-reference only.
+
+    Frame:
+        +---------+---------------------------------------+
+        | version | payload                               |
+        +---------+---------------------------------------+
+        version 0     : payload stored as is
+        version 1~255 : raw deflate with the preset dictionary of this version
+
+    A published dictionary must never change; train a new one with a new
+    version, and keep the old ones for decoding until all peers upgraded.
+    Peers exchange the versions they have (offers), and both sides use the
+    highest common one.
+"""
+
+import re
+import threading
+import zlib
+from typing import Optional, Iterable, List, Dict, Set
+
+
+# deflate window, longer dictionary is useless
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+STORED = 0
+
+
+class PresetDictionary:
+    """ Versioned zlib dictionary """
+
+    def __init__(self, version: int, data: bytes):
+        super().__init__()
+        assert 0 < version < 256, f'dictionary version error: {version}'
+        assert 0 < len(data) <= MAX_DICTIONARY_SIZE, f'dictionary size error: {len(data)}'
+        self.__version = version
+        self.__data = data
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    @property
+    def data(self) -> bytes:
+        return self.__data
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+
+class DictionaryCompressor:
+    """ Compress small messages with preset dictionaries """
+
+    def __init__(self, dictionaries: List[PresetDictionary], level: int = 9):
+        super().__init__()
+        self.__dictionaries: Dict[int, PresetDictionary] = {}
+        for item in dictionaries:
+            assert item.version not in self.__dictionaries, f'duplicated dictionary version: {item.version}'
+            self.__dictionaries[item.version] = item
+        self.__level = level
+        # metrics: content type => [count, bytes in, bytes out]
+        self.__lock = threading.Lock()
+        self.__metrics: Dict[str, List[int]] = {}
+
+    @property
+    def offers(self) -> List[int]:
+        """ dictionary versions to send to the remote peer, newest first """
+        return sorted(self.__dictionaries.keys(), reverse=True)
+
+    def get_dictionary(self, version: int) -> Optional[PresetDictionary]:
+        return self.__dictionaries.get(version)
+
+    def select(self, offers: Optional[List[int]]) -> int:
+        """
+        Choose the newest dictionary version also offered by the remote peer
+
+        :param offers: dictionary versions from remote peer, None for old clients
+        :return: 0 (stored) when no common one
+        """
+        if offers is not None:
+            for version in self.offers:
+                if version in offers:
+                    return version
+        return STORED
+
+    def _compressor(self, version: int):
+        # NOTICE: copying a primed compressor costs more than loading the dictionary again
+        dictionary = self.__dictionaries[version]
+        return zlib.compressobj(self.__level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, dictionary.data)
+
+    def compress(self, data: bytes, version: int, content_type: Optional[str] = None) -> bytes:
+        """
+        Compress one serialized message
+
+        :param data:         serialized message
+        :param version:      dictionary version selected for the connection
+        :param content_type: message type for metrics
+        :return: frame
+        """
+        frame = None
+        if version != STORED:
+            assert version in self.__dictionaries, f'dictionary not found: {version}'
+            compressor = self._compressor(version=version)
+            payload = compressor.compress(data) + compressor.flush()
+            if len(payload) < len(data):
+                frame = bytes([version]) + payload
+        if frame is None:
+            # not compressible, store it
+            frame = bytes([STORED]) + data
+        self._record(content_type=content_type, size=len(data), packed=len(frame))
+        return frame
+
+    def decompress(self, frame: bytes, max_size: int = 16 * 1024 * 1024) -> Optional[bytes]:
+        """
+        Decompress one frame
+
+        :param frame:    version + payload
+        :param max_size: limit of decompressed size, against compression bombs
+        :return: None on unknown version or error
+        """
+        if len(frame) == 0:
+            return None
+        version = frame[0]
+        if version == STORED:
+            return frame[1:]
+        dictionary = self.__dictionaries.get(version)
+        if dictionary is None:
+            # dictionary version not negotiated
+            return None
+        try:
+            decompressor = zlib.decompressobj(-15, zdict=dictionary.data)
+            data = decompressor.decompress(frame[1:], max_size)
+            if decompressor.unconsumed_tail or not decompressor.eof:
+                return None
+        except zlib.error:
+            return None
+        return data
+
+    def _record(self, content_type: Optional[str], size: int, packed: int):
+        key = '' if content_type is None else content_type
+        with self.__lock:
+            item = self.__metrics.get(key)
+            if item is None:
+                self.__metrics[key] = [1, size, packed]
+            else:
+                item[0] += 1
+                item[1] += size
+                item[2] += packed
+
+    @property
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """ content type => {count, bytes_in, bytes_out} """
+        with self.__lock:
+            return {key: {'count': item[0], 'bytes_in': item[1], 'bytes_out': item[2]}
+                    for key, item in self.__metrics.items()}
+
+    @property
+    def ratios(self) -> Dict[str, float]:
+        """ content type => compressed / original """
+        with self.__lock:
+            return {key: item[2] / item[1] for key, item in self.__metrics.items() if item[1] > 0}
+
+
+"""
+    Trainer
+    ~~~~~~~
+
+    Collect JsON fragments (field names with their punctuation, short
+    values and ID addresses) repeated in many samples, and fill the
+    dictionary with the most valuable ones, best at the end where deflate
+    distances are shortest.
+"""
+
+
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+
+# longer strings are ciphertext or signatures, never repeated
+_MAX_FRAGMENT = 96
+
+
+def _fragments(sample: bytes) -> Set[bytes]:
+    fragments = set()
+    for match in _STRING.finditer(sample):
+        start, end = match.span()
+        if end - start > _MAX_FRAGMENT:
+            continue
+        # string with the punctuation around it, e.g.: ',"time":' or ':"moky@4DnqXWdTV8..."}'
+        fragments.add(sample[max(0, start - 1):end + 1])
+        # ID address, shared by many names
+        at = sample.find(b'@', start, end)
+        if at > 0:
+            fragments.add(sample[at:end + 1])
+    return fragments
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = 16 * 1024, min_count: int = 2) -> Optional[bytes]:
+    """
+    Build dictionary data from serialized messages
+
+    :param samples:   serialized messages (JsON)
+    :param size:      max dictionary size
+    :param min_count: ignore fragments found in fewer samples
+    :return: dictionary data, None when no fragment repeated enough
+    """
+    assert 0 < size <= MAX_DICTIONARY_SIZE, f'dictionary size error: {size}'
+    counts: Dict[bytes, int] = {}
+    for sample in samples:
+        for fragment in _fragments(sample):
+            counts[fragment] = counts.get(fragment, 0) + 1
+    # a back-reference costs about 3 bytes
+    candidates = [(count * (len(fragment) - 3), fragment) for fragment, count in counts.items()
+                  if count >= min_count and len(fragment) > 3]
+    candidates.sort(reverse=True)
+    chosen = []
+    covered: Set[bytes] = set()  # fragments inside the chosen ones
+    total = 0
+    for score, fragment in candidates:
+        if fragment in covered:
+            # already covered by a longer one
+            continue
+        length = len(fragment)
+        if total + length > size:
+            continue
+        chosen.append(fragment)
+        total += length
+        # mark the candidates inside it (fragments are short, see '_MAX_FRAGMENT')
+        for start in range(length - 3):
+            for end in range(start + 4, length + 1):
+                part = fragment[start:end]
+                if part in counts:
+                    covered.add(part)
+    if len(chosen) == 0:
+        return None
+    # most valuable at the end
+    chosen.reverse()
+    return b''.join(chosen)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Partitioned Dispatcher
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Process incoming reliable messages in worker processes to use all CPU
+    cores, keeping the order of messages from each sender
+    (e.g.: 'reset' before 'invite' of a group):
+
+        1. messages are partitioned by sender, each partition is one worker
+           process fed through one pipe, so they are handled in sending order;
+        2. serialized messages are passed in batches, parsed in the worker;
+        3. each partition takes a bounded number of pending messages,
+           dispatching to a full partition blocks (or fails) the caller.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future
+from typing import Optional, Union, Callable, Any, List, Dict
+
+from mkm.format import json_encode, json_decode, utf8_encode, utf8_decode
+from mkm.protocol import ID
+from dkd.protocol import ReliableMessage
+
+from .channel import WorkerChannel, start_worker
+from .routing import RoutingTable, ring_hash
+
+
+def _partition_main(conn, handler: Callable, initializer: Optional[Callable]):
+    """ Worker process: receive batches of serialized messages, handle them in order """
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        results = []
+        for seq, data in batch:
+            try:
+                msg = ReliableMessage.parse(msg=json_decode(string=utf8_decode(data=data)))
+                if msg is None:
+                    raise ValueError('message error: %s' % data[:64])
+                results.append((seq, True, handler(msg)))
+            except Exception as error:
+                results.append((seq, False, '%s: %s' % (type(error).__name__, error)))
+        conn.send(results)
+
+
+class _Partition:
+
+    def __init__(self, dispatcher, conn, process, max_pending: int):
+        super().__init__()
+        self.dispatcher = dispatcher
+        self.slots = threading.Semaphore(max_pending)
+        self.lock = threading.Lock()
+        self.handled = 0
+        self.channel = WorkerChannel(conn=conn, process=process, on_done=self._done, name='dispatch worker',
+                                     batch_size=dispatcher.batch_size, batch_delay=dispatcher.batch_delay)
+
+    @property
+    def depth(self) -> int:
+        return self.channel.depth
+
+    def submit(self, seq: int, data: bytes, future: Future):
+        self.channel.submit(item=(seq, data), future=future)
+
+    def _done(self, seconds: float):
+        with self.lock:
+            self.handled += 1
+        self.slots.release()
+        self.dispatcher.count_latency(seconds=seconds)
+
+
+class PartitionedDispatcher:
+    """
+        Sender-Partitioned Message Dispatcher
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        NOTICE: messages are parsed and handled in the worker processes,
+                so the handler must be picklable, and the message factories
+                must be ready there: inherited by 'fork', or loaded by the
+                'initializer'.
+    """
+
+    def __init__(self, handler: Callable[[ReliableMessage], Any], workers: int = None, max_pending: int = 1024,
+                 batch_size: int = 64, batch_delay: float = 0.001,
+                 initializer: Optional[Callable] = None, context=None):
+        """
+        Create dispatcher
+
+        :param handler:     function to process one message in worker, returns picklable result
+        :param workers:     number of partitions (CPU count as default)
+        :param max_pending: max messages dispatched but not handled in one partition
+        :param batch_size:  max messages in one IPC send
+        :param batch_delay: seconds to wait for filling a batch
+        :param initializer: function to load factories in worker (must be picklable)
+        :param context:     multiprocessing context
+        """
+        super().__init__()
+        if workers is None or workers <= 0:
+            workers = multiprocessing.cpu_count()
+        if context is None:
+            context = multiprocessing.get_context()
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.__max_pending = max_pending
+        self.__lock = threading.Lock()
+        self.__seq = 0
+        # metrics
+        self.__dispatched = 0
+        self.__rejected = 0
+        self.__latency_total = 0.0
+        self.__latency_max = 0.0
+        self.__done = 0
+        # fork all processes before starting any thread
+        processes = [start_worker(context=context, target=_partition_main, args=(handler, initializer),
+                                  name='dispatch-worker-%d' % index) for index in range(workers)]
+        self.__partitions = [_Partition(dispatcher=self, conn=conn, process=process, max_pending=max_pending)
+                             for conn, process in processes]
+        for partition in self.__partitions:
+            partition.channel.start()
+
+    def close(self, timeout: float = 5):
+        for partition in self.__partitions:
+            partition.channel.stop(timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    #
+    #   Metrics
+    #
+
+    def count_latency(self, seconds: float):
+        with self.__lock:
+            self.__done += 1
+            self.__latency_total += seconds
+            if seconds > self.__latency_max:
+                self.__latency_max = seconds
+
+    @property
+    def queue_depth(self) -> List[int]:
+        """ Messages waiting in each partition """
+        return [partition.depth for partition in self.__partitions]
+
+    def lagging(self, ratio: float = 0.8) -> List[int]:
+        """ Partitions filled beyond the ratio of 'max_pending' """
+        limit = self.__max_pending * ratio
+        return [index for index, depth in enumerate(self.queue_depth) if depth >= limit]
+
+    @property
+    def metrics(self) -> Dict:
+        with self.__lock:
+            done = self.__done
+            return {
+                'workers': len(self.__partitions),
+                'queue_depth': self.queue_depth,
+                'handled': [partition.handled for partition in self.__partitions],
+                'dispatched': self.__dispatched,
+                'rejected': self.__rejected,
+                'latency_avg': self.__latency_total / done if done > 0 else 0.0,
+                'latency_max': self.__latency_max,
+            }
+
+    #
+    #   Dispatching
+    #
+
+    def partition(self, sender: Union[ID, str]) -> int:
+        """ Index of the partition for the sender """
+        key = RoutingTable.route_key(identifier=sender)
+        return ring_hash(key) % len(self.__partitions)
+
+    def dispatch(self, msg: Union[ReliableMessage, bytes], sender: Union[ID, str, None] = None,
+                 block: bool = True, timeout: Optional[float] = None) -> Optional[Future]:
+        """
+        Send message to the partition of its sender
+
+        :param msg:     reliable message, or its serialized data (with sender)
+        :param sender:  message sender, required for serialized data
+        :param block:   wait when the partition is full
+        :param timeout: seconds to wait when the partition is full
+        :return: future of handler result, None when the partition is still full
+        """
+        if isinstance(msg, bytes):
+            data = msg
+            assert sender is not None, 'sender required for serialized message'
+        else:
+            data = utf8_encode(string=json_encode(container=msg.to_dict()))
+            if sender is None:
+                sender = msg.get('sender')
+        partition = self.__partitions[self.partition(sender=sender)]
+        if not partition.slots.acquire(blocking=block, timeout=timeout if block else None):
+            # back-pressure: partition lags behind
+            with self.__lock:
+                self.__rejected += 1
+            return None
+        with self.__lock:
+            self.__seq += 1
+            self.__dispatched += 1
+            seq = self.__seq
+        future = Future()
+        partition.submit(seq=seq, data=data, future=future)
+        return future
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Reorder Buffer
+    ~~~~~~~~~~~~~~
+
+    Messages from one sender may arrive out of order across stations;
+    instead of sorting the whole backlog when rendering, hold each incoming
+    message for a short window in its conversation, and release them
+    ordered by (envelope.time, content.sn):
+
+        buffer.push(msg)      # late or overflowed ones come back at once
+        ...
+        buffer.release()      # messages which have waited long enough
+
+    When a message is due, the earlier ones (by time) of its conversation
+    go out with it; a message older than what's already released is passed
+    through immediately, so it never blocks the conversation.
+"""
+
+import heapq
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Tuple, List, Dict
+
+from mkm.types import Converter
+from dkd.protocol import Message, InstantMessage
+
+
+class _Conversation:
+
+    def __init__(self, key: str):
+        super().__init__()
+        self.key = key
+        self.heap: List[tuple] = []  # (time, sn, seq, msg)
+        self.last: Optional[Tuple[float, int]] = None  # (time, sn) of last released
+
+
+class ReorderBuffer:
+    """ Per-conversation jitter buffer for incoming messages """
+
+    def __init__(self, hold: float = 1.0, capacity: int = 256, max_messages: int = 65536,
+                 max_conversations: int = 65536):
+        """
+        Create reorder buffer
+
+        :param hold:              seconds to hold each message
+        :param capacity:          max messages held in one conversation
+        :param max_messages:      max messages held in all conversations
+        :param max_conversations: max conversations remembered
+        """
+        super().__init__()
+        assert hold >= 0 and capacity > 0 and max_messages > 0, f'buffer error: {hold}, {capacity}, {max_messages}'
+        self.__hold = hold
+        self.__capacity = capacity
+        self.__max_messages = max_messages
+        self.__max_conversations = max_conversations
+        # conversation => buffered messages & last released
+        self.__conversations: Dict[str, _Conversation] = {}
+        # conversations holding no message, least recently used first
+        self.__idle: Dict[str, _Conversation] = OrderedDict()
+        # (deadline, seq, conversation, time, sn), deadlines are in arrival order
+        self.__queue = deque()
+        self.__buffered = set()  # seq of messages still held
+        self.__seq = 0
+        # metrics
+        self.__pushed = 0
+        self.__late = 0
+        self.__forced = 0
+
+    def __len__(self) -> int:
+        return len(self.__buffered)
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'pushed': self.__pushed,
+            'buffered': len(self.__buffered),
+            'late': self.__late,
+            'forced': self.__forced,
+            'conversations': len(self.__conversations),
+        }
+
+    # protected
+    def _conversation_key(self, msg: Message) -> str:
+        """ group, or the pair of sender & receiver """
+        group = msg.get('group')
+        if group is not None:
+            return str(group)
+        sender = str(msg.get('sender'))
+        receiver = str(msg.get('receiver'))
+        return sender + '|' + receiver if sender < receiver else receiver + '|' + sender
+
+    # protected
+    def _order_key(self, msg: Message) -> Tuple[float, int]:
+        """ (envelope.time, content.sn) """
+        when = Converter.get_float(value=msg.get('time'), default=0)
+        if isinstance(msg, InstantMessage):
+            sn = msg.content.sn
+        else:
+            # content encrypted
+            sn = 0
+        return when, sn
+
+    def _get_conversation(self, key: str) -> _Conversation:
+        conversations = self.__conversations
+        conversation = conversations.get(key)
+        if conversation is None:
+            # not idle, a message is going to be held in it
+            conversation = _Conversation(key=key)
+            conversations[key] = conversation
+            self._purge()
+        elif key in self.__idle:
+            self.__idle.move_to_end(key)
+        return conversation
+
+    def _purge(self):
+        """ forget least recently used idle conversations beyond the limit """
+        conversations = self.__conversations
+        idle = self.__idle
+        excess = len(conversations) - self.__max_conversations
+        while excess > 0 and len(idle) > 0:
+            key, _ = idle.popitem(last=False)
+            conversations.pop(key, None)
+            excess -= 1
+
+    def push(self, msg: Message, now: Optional[float] = None) -> List[Message]:
+        """
+        Add incoming message
+
+        :param msg: message received
+        :param now: current time
+        :return: messages released at once (late one, or earlier ones squeezed out by limits)
+        """
+        if now is None:
+            now = time.time()
+        self.__pushed += 1
+        key = self._conversation_key(msg=msg)
+        conversation = self._get_conversation(key=key)
+        order = self._order_key(msg=msg)
+        if conversation.last is not None and order < conversation.last:
+            # too late, the following ones are already released, don't hold it again
+            self.__late += 1
+            return [msg]
+        self.__seq += 1
+        seq = self.__seq
+        heapq.heappush(conversation.heap, (order[0], order[1], seq, msg))
+        self.__idle.pop(key, None)
+        self.__queue.append((now + self.__hold, seq, key, order))
+        self.__buffered.add(seq)
+        outputs = []
+        if len(conversation.heap) > self.__capacity:
+            # conversation full, release the earliest one
+            self.__forced += 1
+            outputs.extend(self._pop(conversation=conversation, until=None))
+        while len(self.__buffered) > self.__max_messages:
+            # buffer full, release the oldest arrival with the earlier ones of its conversation
+            self.__forced += 1
+            outputs.extend(self._expire(now=None))
+        return outputs
+
+    def release(self, now: Optional[float] = None) -> List[Message]:
+        """
+        Get messages which have been held long enough, in order per conversation
+
+        :param now: current time
+        :return: released messages
+        """
+        if now is None:
+            now = time.time()
+        outputs = []
+        while True:
+            released = self._expire(now=now)
+            if released is None:
+                break
+            outputs.extend(released)
+        return outputs
+
+    def flush(self) -> List[Message]:
+        """ Release all messages """
+        outputs = []
+        for conversation in self.__conversations.values():
+            while conversation.heap:
+                outputs.extend(self._pop(conversation=conversation, until=None))
+        self.__queue.clear()
+        return outputs
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """ Time of the earliest message to be released """
+        queue = self.__queue
+        buffered = self.__buffered
+        while queue and queue[0][1] not in buffered:
+            # released with an earlier one
+            queue.popleft()
+        if queue:
+            return queue[0][0]
+
+    def _expire(self, now: Optional[float]) -> Optional[List[Message]]:
+        """ release the first due message (any when now is None) and the earlier ones in its conversation """
+        queue = self.__queue
+        buffered = self.__buffered
+        while queue:
+            deadline, seq, key, order = queue[0]
+            if seq not in buffered:
+                # released with an earlier one
+                queue.popleft()
+                continue
+            if now is not None and deadline > now:
+                return None
+            queue.popleft()
+            conversation = self.__conversations.get(key)
+            return self._pop(conversation=conversation, until=order)
+        return None
+
+    def _pop(self, conversation: _Conversation, until: Optional[Tuple[float, int]]) -> List[Message]:
+        """ release messages up to the order key, or just the first one """
+        heap = conversation.heap
+        buffered = self.__buffered
+        outputs = []
+        while heap:
+            when, sn, seq, msg = heap[0]
+            if until is None:
+                if outputs:
+                    break
+            elif (when, sn) > until:
+                break
+            heapq.heappop(heap)
+            buffered.discard(seq)
+            conversation.last = (when, sn)
+            outputs.append(msg)
+        if outputs and not heap:
+            self.__idle[conversation.key] = conversation
+        return outputs
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Transfer Ledger
+    ~~~~~~~~~~~~~~~
+
+    Balances per (ID, currency) accumulated from transfer contents as they
+    arrive, instead of rescanning the history:
+
+        ledger.ingest_message(msg)           # InstantMessage with TransferContent
+        ledger.balance(identifier, 'USDT')   # O(1)
+        ledger.balance(identifier, 'USDT', at=timestamp)       # O(log n), late arrivals too
+        ledger.statement(identifier, 'USDT', start=t1, end=t2)  # O(log n + k)
+
+    Amounts are exact decimals (parsed from the JsON text of the number),
+    each transfer is counted once by (sender, sn).
+"""
+
+import time as time_module
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Union, Iterable, Tuple, List, Dict
+
+from mkm.types import Converter
+from mkm.protocol import ID
+from dkd.protocol import Content, InstantMessage
+
+from ..protocol import ContentType
+
+
+class LedgerEntry:
+    """ One transfer in the statement of an account """
+
+    def __init__(self, transfer: Tuple, amount: Decimal, balance: Decimal):
+        super().__init__()
+        self.__transfer = transfer
+        self.__amount = amount
+        self.__balance = balance
+
+    @property
+    def sender(self) -> str:
+        return self.__transfer[0]
+
+    @property
+    def sn(self) -> int:
+        return self.__transfer[1]
+
+    @property
+    def time(self) -> float:
+        return self.__transfer[2]
+
+    @property
+    def remitter(self) -> str:
+        return self.__transfer[3]
+
+    @property
+    def remittee(self) -> str:
+        return self.__transfer[4]
+
+    @property
+    def currency(self) -> str:
+        return self.__transfer[5]
+
+    @property
+    def amount(self) -> Decimal:
+        """ signed: negative for outgoing """
+        return self.__amount
+
+    @property
+    def balance(self) -> Decimal:
+        """ account balance after this transfer """
+        return self.__balance
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} {self.remitter} -> {self.remittee}: {self.amount} {self.currency}' \
+               f' balance={self.balance} time={self.time} sn={self.sn} />'
+
+
+class _Fenwick:
+    """ Binary indexed tree of prefix sums """
+
+    def __init__(self, values: Iterable[Decimal] = ()):
+        super().__init__()
+        tree = [Decimal(0)]
+        tree.extend(values)
+        size = len(tree)
+        for index in range(1, size):
+            parent = index + (index & -index)
+            if parent < size:
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def append(self, value: Decimal):
+        tree = self.tree
+        index = len(tree)
+        # node covers (index - lowbit, index], add up its children
+        low = index - (index & -index)
+        child = index - 1
+        while child > low:
+            value += tree[child]
+            child -= child & -child
+        tree.append(value)
+
+    def add(self, position: int, delta: Decimal):
+        tree = self.tree
+        index = position + 1
+        size = len(tree)
+        while index < size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, count: int) -> Decimal:
+        """ sum of the first 'count' values """
+        tree = self.tree
+        total = Decimal(0)
+        while count > 0:
+            total += tree[count]
+            count -= count & -count
+        return total
+
+
+class _Block:
+    """ A run of transfers ordered by time """
+
+    def __init__(self, times: List[float], amounts: List[Decimal], transfers: List[Tuple]):
+        super().__init__()
+        self.times = times
+        self.amounts = amounts
+        self.transfers = transfers
+        self.sums = _Fenwick(amounts)
+
+    def insert(self, when: float, amount: Decimal, transfer: Tuple):
+        times = self.times
+        pos = bisect_right(times, when)
+        if pos == len(times):
+            times.append(when)
+            self.amounts.append(amount)
+            self.transfers.append(transfer)
+            self.sums.append(amount)
+        else:
+            # late arrival, O(block size)
+            times.insert(pos, when)
+            self.amounts.insert(pos, amount)
+            self.transfers.insert(pos, transfer)
+            self.sums = _Fenwick(self.amounts)
+
+    def split(self):
+        half = len(self.times) >> 1
+        tail = _Block(times=self.times[half:], amounts=self.amounts[half:], transfers=self.transfers[half:])
+        self.times = self.times[:half]
+        self.amounts = self.amounts[:half]
+        self.transfers = self.transfers[:half]
+        self.sums = _Fenwick(self.amounts)
+        return tail
+
+
+class _Account:
+    """
+        Transfers of one (ID, currency), ordered by time
+
+        Blocks of at most 2 * BLOCK transfers; a Fenwick tree over the block
+        totals and one in each block give balances at any time in O(log n),
+        a late arrival costs O(log n + BLOCK) instead of re-sorting.
+    """
+
+    BLOCK = 256
+
+    def __init__(self):
+        super().__init__()
+        self.blocks: List[_Block] = []
+        self.starts: List[float] = []  # first time of each block
+        self.totals = _Fenwick()      # totals of blocks
+        self.balance = Decimal(0)
+        self.count = 0
+
+    def append(self, when: float, amount: Decimal, transfer: Tuple):
+        blocks = self.blocks
+        self.balance += amount
+        self.count += 1
+        if not blocks:
+            blocks.append(_Block(times=[when], amounts=[amount], transfers=[transfer]))
+            self.starts.append(when)
+            self.totals.append(amount)
+            return
+        index = max(bisect_right(self.starts, when) - 1, 0)
+        block = blocks[index]
+        block.insert(when=when, amount=amount, transfer=transfer)
+        self.starts[index] = block.times[0]
+        self.totals.add(index, amount)
+        if len(block.times) > 2 * self.BLOCK:
+            blocks.insert(index + 1, block.split())
+            self.starts.insert(index + 1, blocks[index + 1].times[0])
+            self.totals = _Fenwick(b.sums.prefix(len(b.times)) for b in blocks)
+
+    def locate(self, when: Optional[float], right: bool) -> Tuple[int, int]:
+        """ (block index, position) of the first transfer after 'when' (at/after if not right) """
+        if when is None:
+            return (len(self.blocks), 0) if right else (0, 0)
+        search = bisect_right if right else bisect_left
+        index = max(search(self.starts, when) - 1, 0)
+        return index, search(self.blocks[index].times, when)
+
+    def prefix(self, index: int, pos: int) -> Decimal:
+        """ sum of transfers before (block index, position) """
+        if index >= len(self.blocks):
+            return self.balance
+        return self.totals.prefix(index) + self.blocks[index].sums.prefix(pos)
+
+
+class TransferLedger:
+    """ Incremental balances & statements from transfer contents """
+
+    def __init__(self):
+        super().__init__()
+        self.__seen = set()   # (sender, sn)
+        self.__accounts: Dict[Tuple[str, str], _Account] = {}  # (ID, currency) => account
+        self.__currencies: Dict[str, List[str]] = {}  # ID => currencies
+        self.__duplicated = 0
+        self.__rejected = 0
+
+    @property
+    def count(self) -> int:
+        """ transfers ingested """
+        return len(self.__seen)
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'transfers': len(self.__seen),
+            'accounts': len(self.__accounts),
+            'duplicated': self.__duplicated,
+            'rejected': self.__rejected,
+        }
+
+    def ingest_message(self, msg: InstantMessage) -> bool:
+        return self.ingest(content=msg.content, sender=msg.sender, receiver=msg.receiver)
+
+    def ingest_messages(self, messages: Iterable[InstantMessage]) -> int:
+        """ :return: number of new transfers """
+        count = 0
+        for msg in messages:
+            if self.ingest_message(msg=msg):
+                count += 1
+        return count
+
+    def ingest(self, content: Content, sender: Union[ID, str, None] = None,
+               receiver: Union[ID, str, None] = None) -> bool:
+        """
+        Record one transfer
+
+        :param content:  transfer content, 'remitter' & 'remittee' default to message sender & receiver
+        :param sender:   message sender
+        :param receiver: message receiver
+        :return: False on duplicated or invalid transfer
+        """
+        if content.type != ContentType.TRANSFER:
+            # money contents of other types (claims, lucky money, ...) move no balance
+            self.__rejected += 1
+            return False
+        remitter = content.get('remitter')
+        if remitter is None:
+            remitter = sender
+        remittee = content.get('remittee')
+        if remittee is None:
+            remittee = receiver
+        currency = content.get('currency')
+        amount = _decimal(content.get('amount'))
+        if remitter is None or remittee is None or not currency or amount is None:
+            self.__rejected += 1
+            return False
+        remitter = str(remitter)
+        remittee = str(remittee)
+        sn = content.sn
+        key = (remitter if sender is None else str(sender), sn)
+        if key in self.__seen:
+            self.__duplicated += 1
+            return False
+        self.__seen.add(key)
+        when = Converter.get_float(value=content.get('time'), default=None)
+        if when is None:
+            when = time_module.time()
+        transfer = (key[0], sn, when, remitter, remittee, currency)
+        self._account(remitter, currency).append(when=when, amount=-amount, transfer=transfer)
+        self._account(remittee, currency).append(when=when, amount=amount, transfer=transfer)
+        return True
+
+    def _account(self, identifier: str, currency: str) -> _Account:
+        key = (identifier, currency)
+        account = self.__accounts.get(key)
+        if account is None:
+            account = _Account()
+            self.__accounts[key] = account
+            self.__currencies.setdefault(identifier, []).append(currency)
+        return account
+
+    #
+    #   Queries
+    #
+
+    def balance(self, identifier: Union[ID, str], currency: str, at: Optional[float] = None) -> Decimal:
+        """
+        Get account balance
+
+        :param identifier: user ID
+        :param currency:   currency
+        :param at:         timestamp, None for current balance
+        :return: received - sent
+        """
+        account = self.__accounts.get((str(identifier), currency))
+        if account is None:
+            return Decimal(0)
+        elif at is None:
+            return account.balance
+        index, pos = account.locate(when=at, right=True)
+        return account.prefix(index=index, pos=pos)
+
+    def statement(self, identifier: Union[ID, str], currency: str,
+                  start: Optional[float] = None, end: Optional[float] = None,
+                  limit: Optional[int] = None) -> List[LedgerEntry]:
+        """
+        Get transfers of the account in time range [start, end]
+
+        :return: entries ordered by time
+        """
+        account = self.__accounts.get((str(identifier), currency))
+        if account is None:
+            return []
+        index, pos = account.locate(when=start, right=False)
+        balance = account.prefix(index=index, pos=pos)
+        blocks = account.blocks
+        entries = []
+        while index < len(blocks):
+            block = blocks[index]
+            times = block.times
+            amounts = block.amounts
+            transfers = block.transfers
+            while pos < len(times):
+                if end is not None and times[pos] > end or limit is not None and len(entries) >= limit:
+                    return entries
+                amount = amounts[pos]
+                balance += amount
+                entries.append(LedgerEntry(transfer=transfers[pos], amount=amount, balance=balance))
+                pos += 1
+            index += 1
+            pos = 0
+        return entries
+
+    def sent(self, identifier: Union[ID, str], currency: str,
+             start: Optional[float] = None, end: Optional[float] = None) -> List[LedgerEntry]:
+        """ transfers from remitter """
+        entries = self.statement(identifier=identifier, currency=currency, start=start, end=end)
+        return [entry for entry in entries if entry.amount < 0]
+
+    def received(self, identifier: Union[ID, str], currency: str,
+                 start: Optional[float] = None, end: Optional[float] = None) -> List[LedgerEntry]:
+        """ transfers to remittee """
+        entries = self.statement(identifier=identifier, currency=currency, start=start, end=end)
+        return [entry for entry in entries if entry.amount > 0]
+
+    def currencies(self, identifier: Union[ID, str]) -> List[str]:
+        return list(self.__currencies.get(str(identifier), []))
+
+
+def _decimal(value) -> Optional[Decimal]:
+    # float from JsON -> shortest repr, e.g.: 0.1 -> Decimal('0.1')
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        amount = Decimal(value) if isinstance(value, (int, str)) else Decimal(repr(value))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+    if not amount.is_finite() or amount <= 0:
+        return None
+    return amount
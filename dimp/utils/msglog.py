@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Offline Message Log
+    ~~~~~~~~~~~~~~~~~~~
+
+    Reliable messages kept for offline receivers, in append-only segment
+    files mapped into memory:
+
+        directory/
+            00000000000000000001.log    // records
+            00000000000000000001.ack    // offsets of acknowledged records
+            00000000000000000002.log
+            ...
+
+    Record:
+        +--------+--------+-----------+----------+---------+
+        | length | crc32  | id length | receiver | payload |
+        |   4    |   4    |     2     |   ...    |   ...   |
+        +--------+--------+-----------+----------+---------+
+
+    Receiver index is rebuilt by scanning the segments on open; redelivery
+    reads hand out memoryviews into the mapped files, so the serialized
+    message goes back to the socket without being decoded or copied.
+
+    Acknowledged records are listed in the '.ack' file of their segment;
+    a sealed segment with no live record is removed, and one with mostly
+    acknowledged records is compacted by copying the live ones to the
+    active segment (so it may come after newer records of the receiver).
+    Delivery is at-least-once: a crash may bring back a record acknowledged
+    but not synced yet, or copied but not removed yet.
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from typing import Optional, Union, Tuple, List, Dict
+
+from mkm.format import json_encode, utf8_encode
+from mkm.protocol import ID
+from dkd.protocol import ReliableMessage
+
+
+_HEADER = struct.Struct('<IIH')
+_OFFSET = struct.Struct('<Q')
+
+# (segment id, offset)
+Position = Tuple[int, int]
+
+
+class _Segment:
+
+    def __init__(self, ident: int, path: str, size: int):
+        super().__init__()
+        self.ident = ident
+        self.path = path
+        with open(path, 'a+b') as file:
+            if os.fstat(file.fileno()).st_size < size:
+                file.truncate(size)
+            self.size = os.fstat(file.fileno()).st_size
+            self.map = mmap.mmap(file.fileno(), self.size)
+        self.end = 0     # write position
+        self.total = 0   # records
+        self.live = 0    # records not acknowledged
+        self.acked = set()
+        self.ack_file = None
+
+    @property
+    def ack_path(self) -> str:
+        return self.path[:-4] + '.ack'
+
+    def write_ack(self, offset: int):
+        if self.ack_file is None:
+            self.ack_file = open(self.ack_path, 'ab')
+        self.ack_file.write(_OFFSET.pack(offset))
+
+    def load_acks(self):
+        if os.path.exists(self.ack_path):
+            with open(self.ack_path, 'rb') as file:
+                data = file.read()
+            count = len(data) // _OFFSET.size
+            self.acked = {_OFFSET.unpack_from(data, index * _OFFSET.size)[0] for index in range(count)}
+
+    def sync(self):
+        self.map.flush()
+        if self.ack_file is not None:
+            self.ack_file.flush()
+            os.fsync(self.ack_file.fileno())
+
+    def close(self) -> bool:
+        """ :return: False when memoryviews are still exported """
+        if self.ack_file is not None:
+            self.ack_file.close()
+            self.ack_file = None
+        try:
+            self.map.close()
+        except BufferError:
+            return False
+        return True
+
+
+class MessageLog:
+    """ Durable store of serialized messages for offline receivers """
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024,
+                 sync_every: int = 256, sync_interval: float = 0.05):
+        """
+        Open message log
+
+        :param directory:     segment files
+        :param segment_size:  size of each segment file
+        :param sync_every:    sync after this many writes
+        :param sync_interval: sync when the last sync is older than this (seconds)
+        """
+        super().__init__()
+        self.__directory = directory
+        self.__segment_size = segment_size
+        self.__sync_every = sync_every
+        self.__sync_interval = sync_interval
+        self.__segments: Dict[int, _Segment] = {}
+        self.__active: Optional[_Segment] = None
+        # receiver => {position: length} in append order
+        self.__index: Dict[str, Dict[Position, int]] = {}
+        # position of records copied by compaction, old => new
+        self.__moved: Dict[Position, Position] = {}
+        self.__retired: List[_Segment] = []
+        self.__unsynced = 0
+        self.__last_sync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def _segment_path(self, ident: int) -> str:
+        return os.path.join(self.__directory, '%020d.log' % ident)
+
+    def _recover(self):
+        names = sorted(name for name in os.listdir(self.__directory) if name.endswith('.log'))
+        for name in names:
+            ident = int(name[:-4])
+            if os.path.getsize(self._segment_path(ident)) == 0:
+                # crashed before preallocated
+                os.remove(self._segment_path(ident))
+                continue
+            segment = _Segment(ident=ident, path=self._segment_path(ident), size=0)
+            segment.load_acks()
+            self._scan(segment=segment)
+            self.__segments[ident] = segment
+            self.__active = segment
+        if self.__active is None or self.__active.end >= self.__active.size:
+            self._roll(needed=0)
+
+    def _scan(self, segment: _Segment):
+        buffer = segment.map
+        offset = 0
+        while offset + _HEADER.size <= segment.size:
+            length, crc, id_len = _HEADER.unpack_from(buffer, offset)
+            end = offset + _HEADER.size + id_len + length
+            if length == 0 and crc == 0 or end > segment.size:
+                break
+            body = buffer[offset + _HEADER.size:end]
+            if zlib.crc32(body) != crc:
+                # torn write, the rest is garbage
+                break
+            segment.total += 1
+            if offset not in segment.acked:
+                receiver = body[:id_len].decode('utf-8')
+                self.__index.setdefault(receiver, {})[(segment.ident, offset)] = length
+                segment.live += 1
+            offset = end
+        segment.end = offset
+
+    def _roll(self, needed: int):
+        """ seal active segment, start a new one """
+        active = self.__active
+        ident = 1 if active is None else active.ident + 1
+        size = max(self.__segment_size, needed)
+        if active is not None:
+            active.sync()
+        segment = _Segment(ident=ident, path=self._segment_path(ident), size=size)
+        self.__segments[ident] = segment
+        self.__active = segment
+
+    #
+    #   Writing
+    #
+
+    def append(self, receiver: Union[ID, str], data: bytes) -> Position:
+        """
+        Store serialized message for receiver
+
+        :param receiver: receiver ID
+        :param data:     serialized message
+        :return: position of the record
+        """
+        receiver = str(receiver)
+        rid = receiver.encode('utf-8')
+        record_size = _HEADER.size + len(rid) + len(data)
+        segment = self.__active
+        if segment.end + record_size > segment.size:
+            self._roll(needed=record_size)
+            segment = self.__active
+        offset = segment.end
+        start = offset + _HEADER.size
+        buffer = segment.map
+        buffer[start:start + len(rid)] = rid
+        buffer[start + len(rid):start + len(rid) + len(data)] = data
+        crc = zlib.crc32(buffer[start:start + len(rid) + len(data)])
+        # header last, a torn record is invalid
+        _HEADER.pack_into(buffer, offset, len(data), crc, len(rid))
+        segment.end = offset + record_size
+        segment.total += 1
+        segment.live += 1
+        position = (segment.ident, offset)
+        self.__index.setdefault(receiver, {})[position] = len(data)
+        self._written()
+        return position
+
+    def append_message(self, msg: ReliableMessage) -> Position:
+        data = utf8_encode(string=json_encode(container=msg.to_dict()))
+        return self.append(receiver=msg.receiver, data=data)
+
+    def ack(self, receiver: Union[ID, str], position: Position) -> bool:
+        """
+        Mark record delivered
+
+        :return: False when not found
+        """
+        receiver = str(receiver)
+        moved = self.__moved
+        while position in moved:
+            # copied by compaction
+            position = moved.pop(position)
+        records = self.__index.get(receiver)
+        if records is None or records.pop(position, None) is None:
+            return False
+        if len(records) == 0:
+            self.__index.pop(receiver, None)
+        segment = self.__segments.get(position[0])
+        segment.acked.add(position[1])
+        segment.live -= 1
+        segment.write_ack(offset=position[1])
+        self._written()
+        return True
+
+    def _written(self):
+        self.__unsynced += 1
+        if self.__unsynced >= self.__sync_every or time.monotonic() - self.__last_sync >= self.__sync_interval:
+            self.sync()
+
+    def sync(self):
+        """ Flush pending writes to disk """
+        if self.__unsynced == 0:
+            return
+        for segment in self.__segments.values():
+            if segment is self.__active or segment.ack_file is not None:
+                segment.sync()
+        self.__unsynced = 0
+        self.__last_sync = time.monotonic()
+
+    #
+    #   Reading
+    #
+
+    def count(self, receiver: Union[ID, str]) -> int:
+        records = self.__index.get(str(receiver))
+        return 0 if records is None else len(records)
+
+    @property
+    def receivers(self) -> List[str]:
+        return list(self.__index.keys())
+
+    def read(self, position: Position) -> Optional[memoryview]:
+        """ Get raw message data (zero-copy, release it before compaction) """
+        segment = self.__segments.get(position[0])
+        if segment is None or position[1] >= segment.end:
+            return None
+        length, _, id_len = _HEADER.unpack_from(segment.map, position[1])
+        start = position[1] + _HEADER.size + id_len
+        return memoryview(segment.map)[start:start + length]
+
+    def pending(self, receiver: Union[ID, str], limit: Optional[int] = None) -> List[Tuple[Position, memoryview]]:
+        """
+        Get undelivered messages for receiver, in append order
+
+        :param receiver: receiver ID
+        :param limit:    max count
+        :return: (position, raw data) pairs, data views into the mapped segments
+        """
+        records = self.__index.get(str(receiver))
+        if records is None:
+            return []
+        segments = self.__segments
+        outputs = []
+        for position, length in records.items():
+            if limit is not None and len(outputs) >= limit:
+                break
+            segment = segments[position[0]]
+            id_len = _HEADER.unpack_from(segment.map, position[1])[2]
+            start = position[1] + _HEADER.size + id_len
+            outputs.append((position, memoryview(segment.map)[start:start + length]))
+        return outputs
+
+    #
+    #   Compaction
+    #
+
+    @property
+    def metrics(self) -> Dict:
+        segments = self.__segments.values()
+        return {
+            'segments': len(self.__segments),
+            'records': sum(segment.total for segment in segments),
+            'live': sum(segment.live for segment in segments),
+            'receivers': len(self.__index),
+            'bytes': sum(segment.size for segment in segments),
+        }
+
+    def compact(self, max_live_ratio: float = 0.5) -> int:
+        """
+        Remove sealed segments without live records, and rewrite those
+        with few live records into the active segment
+
+        :param max_live_ratio: rewrite segment when 'live / total <= max_live_ratio'
+        :return: count of segments removed
+        """
+        self._close_retired()
+        self._prune_moved()
+        removing = []
+        for segment in list(self.__segments.values()):
+            if segment is self.__active:
+                continue
+            if segment.live == 0 or segment.live <= segment.total * max_live_ratio:
+                removing.append(segment)
+        if len(removing) == 0:
+            return 0
+        moved = False
+        for segment in removing:
+            if segment.live > 0:
+                self._copy_live(segment=segment)
+                moved = True
+        if moved:
+            # copies must be durable before the originals are gone
+            self.__unsynced += 1
+            self.sync()
+        for segment in removing:
+            self.__segments.pop(segment.ident, None)
+            if not segment.close():
+                self.__retired.append(segment)
+            os.remove(segment.path)
+            if os.path.exists(segment.ack_path):
+                os.remove(segment.ack_path)
+        return len(removing)
+
+    def _copy_live(self, segment: _Segment):
+        buffer = segment.map
+        ident = segment.ident
+        offset = 0
+        while offset < segment.end:
+            length, _, id_len = _HEADER.unpack_from(buffer, offset)
+            start = offset + _HEADER.size
+            end = start + id_len + length
+            if offset not in segment.acked:
+                receiver = buffer[start:start + id_len].decode('utf-8')
+                records = self.__index.get(receiver)
+                if records is not None and records.pop((ident, offset), None) is not None:
+                    data = memoryview(buffer)[start + id_len:end]
+                    self.__moved[(ident, offset)] = self.append(receiver=receiver, data=data)
+                    data.release()
+            offset = end
+        segment.live = 0
+
+    def _prune_moved(self):
+        """ forget moved records which have been acknowledged """
+        segments = self.__segments
+        moved = self.__moved
+
+        def alive(position: Position) -> bool:
+            if position in moved:
+                return True
+            segment = segments.get(position[0])
+            return segment is not None and position[1] not in segment.acked
+
+        self.__moved = {old: new for old, new in moved.items() if alive(new)}
+
+    def _close_retired(self):
+        self.__retired = [segment for segment in self.__retired if not segment.close()]
+
+    def close(self):
+        self.__unsynced += 1
+        self.sync()
+        for segment in self.__segments.values():
+            segment.close()
+        self._close_retired()
+        self.__segments.clear()
+        self.__active = None
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Offline Queue
+    ~~~~~~~~~~~~~
+
+    Messages waiting for receivers to come back online:
+
+        1. expire by envelope time + TTL, swept by a timing wheel,
+           so abandoned accounts don't pile up messages forever;
+        2. drained in batch when the receiver is back, either into one
+           framed write (length-prefixed serialized messages), or into one
+           forward content carrying all messages as 'secrets';
+        3. backlog size (count & bytes) of each receiver for back-pressure.
+"""
+
+import struct
+import time
+from collections import OrderedDict
+from typing import Optional, Union, Iterable, Tuple, List, Dict
+
+from mkm.types import Converter
+from mkm.format import json_encode, utf8_encode
+from mkm.protocol import ID
+from dkd.protocol import ReliableMessage
+
+from ..protocol import ForwardContent
+
+from .wheel import TimingWheel
+
+
+class _Backlog:
+
+    def __init__(self):
+        super().__init__()
+        # seq => (message, serialized data)
+        self.messages: Dict[int, Tuple[ReliableMessage, bytes]] = OrderedDict()
+        self.size = 0
+
+
+class OfflineQueue:
+    """ Per-receiver queue of messages for offline users """
+
+    def __init__(self, ttl: float = 7 * 24 * 3600, max_count: Optional[int] = None,
+                 max_bytes: Optional[int] = None, tick: float = 60, slots: int = 1024,
+                 now: Optional[float] = None):
+        """
+        Create offline queue
+
+        :param ttl:       seconds to keep a message after its envelope time
+        :param max_count: max messages per receiver, None for unlimited
+        :param max_bytes: max serialized size per receiver, None for unlimited
+        :param tick:      seconds per slot of the timing wheel
+        :param slots:     number of slots of the timing wheel
+        :param now:       start time of the timing wheel, same clock as 'push()'
+        """
+        super().__init__()
+        self.__ttl = ttl
+        self.__max_count = max_count
+        self.__max_bytes = max_bytes
+        self.__wheel = TimingWheel(tick=tick, size=slots, now=now)
+        self.__backlogs: Dict[str, _Backlog] = {}
+        self.__seq = 0
+        # metrics
+        self.__count = 0
+        self.__size = 0
+        self.__expired = 0
+        self.__rejected = 0
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'messages': self.__count,
+            'bytes': self.__size,
+            'receivers': len(self.__backlogs),
+            'expired': self.__expired,
+            'rejected': self.__rejected,
+        }
+
+    def backlog(self, receiver: Union[ID, str]) -> Tuple[int, int]:
+        """
+        Get backlog size of receiver
+
+        :return: (count, bytes)
+        """
+        backlog = self.__backlogs.get(str(receiver))
+        if backlog is None:
+            return 0, 0
+        return len(backlog.messages), backlog.size
+
+    @property
+    def receivers(self) -> List[str]:
+        return list(self.__backlogs.keys())
+
+    def push(self, msg: ReliableMessage, data: Optional[bytes] = None, now: Optional[float] = None) -> bool:
+        """
+        Keep message for offline receiver
+
+        :param msg:  reliable message
+        :param data: serialized message, encode JsON when None
+        :param now:  current time
+        :return: False when expired already or backlog full
+        """
+        if now is None:
+            now = time.time()
+        expires = Converter.get_float(value=msg.get('time'), default=now) + self.__ttl
+        if expires <= now:
+            self.__expired += 1
+            return False
+        if data is None:
+            data = utf8_encode(string=json_encode(container=msg.to_dict()))
+        receiver = str(msg.receiver)
+        backlog = self.__backlogs.get(receiver)
+        if backlog is None:
+            backlog = _Backlog()
+        # check limits for every message, including the first one of a receiver
+        if self.__max_count is not None and len(backlog.messages) >= self.__max_count or \
+                self.__max_bytes is not None and backlog.size + len(data) > self.__max_bytes:
+            self.__rejected += 1
+            return False
+        self.__backlogs[receiver] = backlog
+        self.__seq += 1
+        seq = self.__seq
+        backlog.messages[seq] = (msg, data)
+        backlog.size += len(data)
+        self.__count += 1
+        self.__size += len(data)
+        self.__wheel.schedule(key=(receiver, seq), when=expires)
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Remove expired messages
+
+        :param now: current time
+        :return: count of messages removed
+        """
+        count = 0
+        for key, _ in self.__wheel.advance(now=now):
+            receiver, seq = key
+            if self._remove(receiver=receiver, seq=seq) is not None:
+                count += 1
+        self.__expired += count
+        return count
+
+    def _remove(self, receiver: str, seq: int) -> Optional[Tuple[ReliableMessage, bytes]]:
+        backlog = self.__backlogs.get(receiver)
+        if backlog is None:
+            return None
+        item = backlog.messages.pop(seq, None)
+        if item is None:
+            return None
+        size = len(item[1])
+        backlog.size -= size
+        self.__count -= 1
+        self.__size -= size
+        if len(backlog.messages) == 0:
+            self.__backlogs.pop(receiver, None)
+        return item
+
+    #
+    #   Draining
+    #
+
+    def drain(self, receiver: Union[ID, str], max_count: Optional[int] = None,
+              max_bytes: Optional[int] = None) -> List[Tuple[ReliableMessage, bytes]]:
+        """
+        Take messages of receiver, oldest first
+
+        :param receiver:  receiver ID
+        :param max_count: max messages to take
+        :param max_bytes: max serialized size to take (at least one message)
+        :return: (message, serialized data) pairs
+        """
+        receiver = str(receiver)
+        backlog = self.__backlogs.get(receiver)
+        if backlog is None:
+            return []
+        wheel = self.__wheel
+        outputs = []
+        size = 0
+        messages = backlog.messages
+        while len(messages) > 0:
+            seq, item = next(iter(messages.items()))
+            if max_count is not None and len(outputs) >= max_count:
+                break
+            if max_bytes is not None and outputs and size + len(item[1]) > max_bytes:
+                break
+            self._remove(receiver=receiver, seq=seq)
+            wheel.cancel(key=(receiver, seq))
+            outputs.append(item)
+            size += len(item[1])
+        return outputs
+
+    def drain_frame(self, receiver: Union[ID, str], max_count: Optional[int] = None,
+                    max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """ Take messages as one framed write, see 'frame_messages()' """
+        items = self.drain(receiver=receiver, max_count=max_count, max_bytes=max_bytes)
+        if len(items) > 0:
+            return frame_messages(data for _, data in items)
+
+    def drain_bundle(self, receiver: Union[ID, str], max_count: Optional[int] = None,
+                     max_bytes: Optional[int] = None) -> Optional[ForwardContent]:
+        """ Take messages as one forward content (with 'secrets') """
+        items = self.drain(receiver=receiver, max_count=max_count, max_bytes=max_bytes)
+        if len(items) > 0:
+            return ForwardContent.create(messages=[msg for msg, _ in items])
+
+
+"""
+    Frame
+    ~~~~~
+
+        +--------+-----------+--------+-----------+-----
+        | length | message 1 | length | message 2 | ...
+        |   4    |    ...    |   4    |    ...    |
+        +--------+-----------+--------+-----------+-----
+"""
+
+_LENGTH = struct.Struct('>I')
+
+
+def frame_messages(messages: Iterable[bytes]) -> bytes:
+    buffer = bytearray()
+    for data in messages:
+        buffer += _LENGTH.pack(len(data))
+        buffer += data
+    return bytes(buffer)
+
+
+def unframe_messages(data: bytes) -> Optional[List[bytes]]:
+    """ :return: None on broken frame """
+    messages = []
+    offset = 0
+    total = len(data)
+    while offset < total:
+        if offset + _LENGTH.size > total:
+            return None
+        length = _LENGTH.unpack_from(data, offset)[0]
+        offset += _LENGTH.size
+        if offset + length > total:
+            return None
+        messages.append(data[offset:offset + length])
+        offset += length
+    return messages
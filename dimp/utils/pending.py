@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Pending Delivery Index
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Outstanding messages waiting for receipts,
+    indexed by (receiver, sn) and by signature prefix,
+    with expiry and retry scheduling on a hashed timing wheel.
+"""
+
+import time
+from typing import Optional, Tuple, List, Dict
+
+from mkm.protocol import ID
+from dkd.protocol import ReliableMessage
+
+from ..protocol import ReceiptCommand
+
+from .wheel import TimingWheel
+
+
+class PendingMessage:
+    """ Outstanding message waiting for receipt """
+
+    def __init__(self, msg: ReliableMessage, sn: int, deadline: float):
+        super().__init__()
+        self.__msg = msg
+        self.__sn = sn
+        self.__receiver = str(msg.receiver)
+        self.__signature = msg.get_str(key='signature', default='')
+        self.deadline = deadline
+        self.retries = 0
+
+    @property
+    def msg(self) -> ReliableMessage:
+        return self.__msg
+
+    @property
+    def sn(self) -> int:
+        return self.__sn
+
+    @property
+    def receiver(self) -> str:
+        return self.__receiver
+
+    @property
+    def signature(self) -> str:
+        return self.__signature
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.__receiver, self.__sn
+
+    # Override
+    def __repr__(self) -> str:
+        clazz = self.__class__.__name__
+        return f'<{clazz} receiver="{self.__receiver}" sn={self.__sn} retries={self.retries} />'
+
+
+class PendingDeliveryIndex:
+    """
+        Outstanding Message Index
+        ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        1. receipt matching:
+            (receiver, sn)   => pending message
+            signature prefix => pending message
+        2. timeout handling:
+            timing wheel slots => pending messages due in that tick
+    """
+
+    def __init__(self, timeout: float = 120, max_retries: int = 3,
+                 prefix_length: int = 16, tick: float = 1.0, slots: int = 512,
+                 now: Optional[float] = None):
+        """
+        Create pending index
+
+        :param timeout:       seconds to wait for receipt before retry
+        :param max_retries:   times to resend before giving up
+        :param prefix_length: length of signature prefix for matching
+        :param tick:          seconds per slot of the timing wheel
+        :param slots:         number of slots of the timing wheel
+        :param now:           start time of the timing wheel, same clock as 'add()' & 'expire()'
+        """
+        super().__init__()
+        self.__timeout = timeout
+        self.__max_retries = max_retries
+        self.__prefix_length = prefix_length
+        self.__wheel = TimingWheel(tick=tick, size=slots, now=now)
+        # (receiver, sn) => pending message
+        self.__messages: Dict[Tuple[str, int], PendingMessage] = {}
+        # signature prefix => (receiver, sn)
+        self.__signatures: Dict[str, Tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__messages)
+
+    def _prefix(self, signature: Optional[str]) -> Optional[str]:
+        size = self.__prefix_length
+        if signature is None or len(signature) < size:
+            return None
+        return signature[:size]
+
+    def add(self, msg: ReliableMessage, sn: int, now: Optional[float] = None) -> PendingMessage:
+        """
+        Add sent message to wait for receipt
+
+        :param msg: reliable message sent
+        :param sn:  serial number of the message content
+        :param now: current time
+        :return: pending message
+        """
+        if now is None:
+            now = time.time()
+        item = PendingMessage(msg=msg, sn=sn, deadline=now + self.__timeout)
+        key = item.key
+        old = self.__messages.get(key)
+        if old is not None:
+            self._remove(item=old)
+        self.__messages[key] = item
+        prefix = self._prefix(signature=item.signature)
+        if prefix is not None:
+            self.__signatures[prefix] = key
+        self.__wheel.schedule(key=key, when=item.deadline)
+        return item
+
+    def get(self, receiver: ID, sn: int) -> Optional[PendingMessage]:
+        return self.__messages.get((str(receiver), sn))
+
+    def find(self, signature: str) -> Optional[PendingMessage]:
+        """ Get pending message with (partial) signature """
+        prefix = self._prefix(signature=signature)
+        if prefix is not None:
+            key = self.__signatures.get(prefix)
+            if key is not None:
+                return self.__messages.get(key)
+
+    def remove(self, receiver: ID, sn: int) -> Optional[PendingMessage]:
+        item = self.__messages.get((str(receiver), sn))
+        if item is not None:
+            self._remove(item=item)
+        return item
+
+    # protected
+    def _remove(self, item: PendingMessage):
+        key = item.key
+        self.__messages.pop(key, None)
+        prefix = self._prefix(signature=item.signature)
+        if prefix is not None and self.__signatures.get(prefix) == key:
+            self.__signatures.pop(prefix, None)
+        self.__wheel.cancel(key=key)
+
+    #
+    #   Receipt Correlation
+    #
+
+    def match(self, receipt: ReceiptCommand) -> Optional[PendingMessage]:
+        """
+        Match receipt with pending message, and remove it from the index
+
+        :param receipt: receipt command from the receiver
+        :return: acknowledged message, None on not found
+        """
+        item = None
+        # 1. check (receiver, sn)
+        sn = receipt.original_sn
+        if sn is not None and sn > 0:
+            env = receipt.original_envelope
+            if env is not None:
+                item = self.__messages.get((str(env.receiver), sn))
+        # 2. check signature
+        signature = receipt.original_signature
+        if item is None:
+            if signature is not None:
+                item = self.find(signature=signature)
+        elif signature is not None and len(signature) > 0:
+            # both matched?
+            if not (item.signature.startswith(signature) or item.signature.endswith(signature)):
+                return None
+        if item is not None:
+            self._remove(item=item)
+        return item
+
+    #
+    #   Timeout Handling
+    #
+
+    def expire(self, now: Optional[float] = None) -> Tuple[List[PendingMessage], List[PendingMessage]]:
+        """
+        Check timeout messages
+
+        :param now: current time
+        :return: messages to be resent, and messages failed (retried too many times)
+        """
+        if now is None:
+            now = time.time()
+        wheel = self.__wheel
+        resend = []
+        failed = []
+        for key, _ in wheel.advance(now=now):
+            item = self.__messages.get(key)
+            if item is None:
+                continue
+            elif item.retries < self.__max_retries:
+                item.retries += 1
+                item.deadline = now + self.__timeout
+                wheel.schedule(key=key, when=item.deadline)
+                resend.append(item)
+            else:
+                self._remove(item=item)
+                failed.append(item)
+        return resend, failed
+
+    def clear(self):
+        for item in list(self.__messages.values()):
+            self._remove(item=item)
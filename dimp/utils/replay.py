@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Replay Filter
+    ~~~~~~~~~~~~~
+
+    The same network message may arrive several times through different
+    routes. Instead of a set of signatures growing forever, remember
+    (sender, sn, signature digest) in Bloom filters sliced by the envelope
+    time, and drop whole slices as they fall out of the window:
+
+        window = 1 hour, slices = 6 (10 minutes each)
+
+        [  slice 0  ][  slice 1  ] ... [  slice 5  ][ future (skew) ]
+        ^ now - window                              ^ now
+
+    A copy of a message carries the same envelope time, so only the slice
+    of that time is probed: the false-positive rate of a check is the rate
+    of one slice. Messages older than the window (or too far in the future)
+    cannot be checked, and are rejected as expired.
+"""
+
+import hashlib
+import math
+import time
+from typing import Optional, Iterable, List, Dict
+
+from mkm.types import Converter
+from dkd.protocol import Message
+
+
+class BloomFilter:
+    """ Fixed size Bloom filter """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Create filter
+
+        :param capacity:   expected count of items
+        :param error_rate: false-positive rate when holding 'capacity' items
+        """
+        super().__init__()
+        assert capacity > 0 and 0 < error_rate < 1, f'bloom filter error: {capacity}, {error_rate}'
+        size = bloom_size(capacity=capacity, error_rate=error_rate)
+        self.__size = size
+        self.__hashes = max(1, round(size / capacity * math.log(2)))
+        self.__bits = bytearray((size + 7) >> 3)
+        self.__capacity = capacity
+        self.__count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def count(self) -> int:
+        """ items added """
+        return self.__count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.__bits)
+
+    @property
+    def error_rate(self) -> float:
+        """ estimated false-positive rate with current count """
+        return (1 - math.exp(-self.__hashes * self.__count / self.__size)) ** self.__hashes
+
+    def _positions(self, digest: bytes) -> List[int]:
+        # double hashing: h1 + i * h2
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        size = self.__size
+        return [(h1 + i * h2) % size for i in range(self.__hashes)]
+
+    def contains(self, digest: bytes) -> bool:
+        """ :param digest: 16 bytes hash of the item """
+        bits = self.__bits
+        for pos in self._positions(digest=digest):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, digest: bytes) -> bool:
+        """
+        Add item
+
+        :param digest: 16 bytes hash of the item
+        :return: True if it was (probably) added before
+        """
+        bits = self.__bits
+        found = True
+        for pos in self._positions(digest=digest):
+            index = pos >> 3
+            mask = 1 << (pos & 7)
+            if not bits[index] & mask:
+                bits[index] |= mask
+                found = False
+        if not found:
+            self.__count += 1
+        return found
+
+
+def bloom_size(capacity: int, error_rate: float) -> int:
+    """ bits needed: -n * ln(p) / ln(2)^2 """
+    return max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+
+
+def bloom_capacity(size: int, error_rate: float) -> int:
+    """ items fit in 'size' bits with the error rate """
+    return max(1, int(size * (math.log(2) ** 2) / -math.log(error_rate)))
+
+
+class ReplayFilter:
+    """ Duplicate suppression with time-sliced rotating Bloom filters """
+
+    def __init__(self, window: float = 3600, slices: int = 6, skew: float = 300,
+                 error_rate: float = 1e-6, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Create replay filter
+
+        :param window:     seconds of envelope time to remember
+        :param slices:     count of Bloom filters in the window
+        :param skew:       seconds of envelope time allowed ahead of local clock
+        :param error_rate: false-positive rate of a full slice
+        :param max_bytes:  memory cap of all slices
+        """
+        super().__init__()
+        assert window > 0 and slices > 0 and skew >= 0, f'replay filter error: {window}, {slices}, {skew}'
+        span = window / slices
+        self.__span = span
+        self.__window = window
+        self.__skew = skew
+        self.__error_rate = error_rate
+        # slices in window, the current one and future ones for skew
+        self.__max_slices = slices + 1 + int(math.ceil(skew / span))
+        self.__capacity = bloom_capacity(size=max_bytes * 8 // self.__max_slices, error_rate=error_rate)
+        self.__slices: Dict[int, BloomFilter] = {}  # slice index => filter
+        # metrics
+        self.__accepted = 0
+        self.__duplicated = 0
+        self.__expired = 0
+
+    @property
+    def capacity(self) -> int:
+        """ messages per slice within the error rate """
+        return self.__capacity
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bloom.nbytes for bloom in self.__slices.values())
+
+    @property
+    def metrics(self) -> Dict:
+        slices = self.__slices
+        return {
+            'accepted': self.__accepted,
+            'duplicated': self.__duplicated,
+            'expired': self.__expired,
+            'slices': len(slices),
+            'bytes': self.nbytes,
+            # worst slice, above the configured rate when it holds more than 'capacity'
+            'error_rate': max([bloom.error_rate for bloom in slices.values()], default=0.0),
+        }
+
+    # protected
+    def _digest(self, msg: Message) -> bytes:
+        """ hash of (sender, sn, signature) """
+        sn = msg.get('sn')
+        if sn is None:
+            content = msg.get('content')
+            if isinstance(content, dict):
+                sn = content.get('sn')
+        text = '%s|%s|%s' % (msg.get('sender'), sn, msg.get('signature'))
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _rotate(self, now: float):
+        oldest = int((now - self.__window) // self.__span)
+        slices = self.__slices
+        for index in [index for index in slices if index < oldest]:
+            slices.pop(index, None)
+
+    def _get_slice(self, when: float, now: float) -> Optional[BloomFilter]:
+        if when < now - self.__window or when > now + self.__skew:
+            return None
+        index = int(when // self.__span)
+        bloom = self.__slices.get(index)
+        if bloom is None:
+            self._rotate(now=now)
+            bloom = BloomFilter(capacity=self.__capacity, error_rate=self.__error_rate)
+            self.__slices[index] = bloom
+        return bloom
+
+    def check(self, msg: Message, now: Optional[float] = None) -> bool:
+        """
+        Check and remember message
+
+        :param msg: received message
+        :param now: current time
+        :return: True for new message, False for duplicated or expired one
+        """
+        if now is None:
+            now = time.time()
+        when = Converter.get_float(value=msg.get('time'), default=0)
+        bloom = self._get_slice(when=when, now=now)
+        if bloom is None:
+            self.__expired += 1
+            return False
+        if bloom.add(digest=self._digest(msg=msg)):
+            self.__duplicated += 1
+            return False
+        self.__accepted += 1
+        return True
+
+    def check_messages(self, messages: Iterable[Message], now: Optional[float] = None) -> List[bool]:
+        """
+        Check and remember messages, a copy in the same batch is a duplicate too
+
+        :return: True for new messages
+        """
+        if now is None:
+            now = time.time()
+        self._rotate(now=now)
+        return [self.check(msg=msg, now=now) for msg in messages]
+
+    def seen(self, msg: Message, now: Optional[float] = None) -> bool:
+        """ Check without remembering """
+        if now is None:
+            now = time.time()
+        when = Converter.get_float(value=msg.get('time'), default=0)
+        if when < now - self.__window or when > now + self.__skew:
+            return False
+        bloom = self.__slices.get(int(when // self.__span))
+        return bloom is not None and bloom.contains(digest=self._digest(msg=msg))
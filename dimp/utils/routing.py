@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Receiver Routing
+    ~~~~~~~~~~~~~~~~
+
+    Route each receiver (user or group ID) to the station node owning it,
+    by consistent hashing with virtual nodes: each node puts many points on
+    a hash ring, an ID belongs to the first point clockwise from its hash.
+    When a node joins or leaves, only the IDs next to its points move.
+
+        table = RoutingTable(nodes=['s1', 's2', 's3'])
+        table.lookup(msg.receiver)               # 's2'
+        table.lookup_replicas(msg.receiver, 2)   # ['s2', 's3']
+        table.route_messages(messages)           # node => messages
+"""
+
+import hashlib
+from bisect import bisect_right
+from typing import Optional, Union, Iterable, List, Dict
+
+from mkm.protocol import ID
+from dkd.protocol import Message
+
+
+def ring_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class RoutingTable:
+    """ Consistent hash ring of station nodes """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 160, cache_size: int = 65536):
+        """
+        Create routing table
+
+        :param nodes:      node names
+        :param vnodes:     points on the ring per weight unit of node
+        :param cache_size: max IDs to remember, 0 to disable
+        """
+        super().__init__()
+        self.__vnodes = vnodes
+        self.__weights: Dict[str, int] = {}
+        self.__points: List[int] = []
+        self.__owners: List[str] = []
+        self.__cache_size = cache_size
+        self.__cache: Dict[str, str] = {}
+        for node in nodes:
+            self.__weights[node] = 1
+        self._rebuild()
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self.__weights.keys())
+
+    def __len__(self) -> int:
+        return len(self.__weights)
+
+    def add_node(self, node: str, weight: int = 1):
+        """ Add node, or change its weight """
+        assert weight > 0, f'node weight error: {node}, {weight}'
+        self.__weights[node] = weight
+        self._rebuild()
+
+    def remove_node(self, node: str) -> bool:
+        if self.__weights.pop(node, None) is None:
+            return False
+        self._rebuild()
+        return True
+
+    def _rebuild(self):
+        ring = []
+        for node, weight in self.__weights.items():
+            for index in range(self.__vnodes * weight):
+                ring.append((ring_hash('%s#%d' % (node, index)), node))
+        ring.sort()
+        self.__points = [point for point, _ in ring]
+        self.__owners = [node for _, node in ring]
+        self.__cache.clear()
+
+    #
+    #   Lookup
+    #
+
+    @staticmethod
+    def route_key(identifier: Union[ID, str]) -> str:
+        """ ID without terminal: all devices of a user go to the same node """
+        text = str(identifier)
+        pos = text.find('/')
+        return text if pos < 0 else text[:pos]
+
+    def lookup(self, identifier: Union[ID, str]) -> Optional[str]:
+        """
+        Get the node owning the ID
+
+        :param identifier: receiver, or group ID
+        :return: None when no node
+        """
+        key = self.route_key(identifier=identifier)
+        cache = self.__cache
+        node = cache.get(key)
+        if node is not None:
+            return node
+        points = self.__points
+        if len(points) == 0:
+            return None
+        index = bisect_right(points, ring_hash(key))
+        node = self.__owners[index if index < len(points) else 0]
+        if self.__cache_size > 0:
+            if len(cache) >= self.__cache_size:
+                cache.clear()
+            cache[key] = node
+        return node
+
+    def lookup_batch(self, identifiers: Iterable[Union[ID, str]]) -> List[Optional[str]]:
+        """ Get owning nodes of IDs, in the same order """
+        points = self.__points
+        if len(points) == 0:
+            return [None for _ in identifiers]
+        owners = self.__owners
+        total = len(points)
+        cache = self.__cache
+        cache_size = self.__cache_size
+        route_key = self.route_key
+        blake2b = hashlib.blake2b
+        nodes = []
+        for identifier in identifiers:
+            key = route_key(identifier=identifier)
+            node = cache.get(key)
+            if node is None:
+                point = int.from_bytes(blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+                index = bisect_right(points, point)
+                node = owners[index if index < total else 0]
+                if cache_size > 0:
+                    if len(cache) >= cache_size:
+                        cache.clear()
+                    cache[key] = node
+            nodes.append(node)
+        return nodes
+
+    def lookup_replicas(self, identifier: Union[ID, str], count: int) -> List[str]:
+        """
+        Get distinct nodes for the ID: owner first, then the next ones clockwise
+
+        :param identifier: receiver, or group ID
+        :param count:      number of replicas (including the owner)
+        :return: nodes, fewer when not enough nodes
+        """
+        points = self.__points
+        owners = self.__owners
+        total = len(points)
+        count = min(count, len(self.__weights))
+        if count <= 0:
+            return []
+        start = bisect_right(points, ring_hash(self.route_key(identifier=identifier)))
+        nodes = []
+        for offset in range(total):
+            node = owners[(start + offset) % total]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == count:
+                    break
+        return nodes
+
+    def route_messages(self, messages: Iterable[Message]) -> Dict[str, List[Message]]:
+        """ Group messages by the node owning their receivers """
+        routes: Dict[str, List[Message]] = {}
+        lookup = self.lookup
+        for msg in messages:
+            node = lookup(identifier=msg.get('receiver'))
+            if node is not None:
+                routes.setdefault(node, []).append(msg)
+        return routes
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Async Message Transforming
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        Instant Message <-> Secure Message <-> Reliable Message
+
+        Algorithm:
+            data      = password.encrypt(content)
+            key       = receiver.public_key.encrypt(password)
+            signature = sender.private_key.sign(data)
+
+    CPU-bound steps (encrypt, decrypt, sign, verify) run in an executor,
+    so the event loop keeps serving other connections.
+
+    With a compressor, long contents are compressed before encryption,
+    and decompressed after decryption when the payload is flagged.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Optional, Iterable, Tuple, List, Dict
+
+from mkm.crypto import SymmetricKey, EncryptKey, DecryptKey, SignKey, VerifyKey
+from mkm.format import TransportableData
+from mkm.format import json_encode, json_decode, utf8_encode, utf8_decode
+from dkd.protocol import Content
+from dkd.protocol import InstantMessage, SecureMessage, ReliableMessage
+
+from ..format import Base64Data, PlainData
+from ..dkd import BaseMessage
+from ..mkm.verifier import shared_signature_verifier
+
+from .compress import ContentCompressor, decompress_content
+
+
+class AsyncMessageTransformer:
+    """
+        Async Transformer
+        ~~~~~~~~~~~~~~~~~
+
+        Keys are given by the caller:
+            encrypt: password & public keys of receivers (str(ID) => EncryptKey)
+            sign:    private key of sender
+            verify:  public keys of sender
+            decrypt: private keys of receiver, and the receiver ID as 'keys' index
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, concurrency: int = 64,
+                 compressor: Optional[ContentCompressor] = None):
+        """
+        Create async transformer
+
+        :param executor:    executor for crypto jobs (default executor of the loop when None)
+        :param concurrency: max messages processing at the same time in batch functions
+        :param compressor:  compress contents before encryption (for peers supporting it), None to disable
+        """
+        super().__init__()
+        self.__executor = executor
+        self.__concurrency = concurrency
+        self.__compressor = compressor
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        return self.__executor
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, func, *args)
+
+    async def _gather(self, jobs: Iterable) -> List:
+        semaphore = asyncio.Semaphore(self.__concurrency)
+
+        async def run(coro):
+            async with semaphore:
+                return await coro
+
+        return await asyncio.gather(*[run(coro) for coro in jobs])
+
+    #
+    #   Instant Message -> Secure Message
+    #
+
+    async def encrypt(self, msg: InstantMessage, password: SymmetricKey,
+                      keys: Optional[Dict[str, EncryptKey]] = None) -> Optional[SecureMessage]:
+        """
+        Encrypt message content with password, and encrypt password for receivers
+
+        :param msg:      instant message
+        :param password: symmetric key
+        :param keys:     receiver ID (or group member IDs) => public key; None for reused key
+        :return: secure message
+        """
+        info = await self._run(encrypt_message, msg, password, keys, self.__compressor)
+        if info is not None:
+            return SecureMessage.parse(msg=info)
+
+    async def encrypt_messages(self, items: Iterable[Tuple[InstantMessage, SymmetricKey,
+                                                           Optional[Dict[str, EncryptKey]]]]
+                               ) -> List[Optional[SecureMessage]]:
+        return await self._gather(self.encrypt(msg, password, keys) for msg, password, keys in items)
+
+    #
+    #   Secure Message -> Reliable Message
+    #
+
+    async def sign(self, msg: SecureMessage, key: SignKey) -> ReliableMessage:
+        info = await self._run(sign_message, msg, key)
+        return ReliableMessage.parse(msg=info)
+
+    async def sign_messages(self, items: Iterable[Tuple[SecureMessage, SignKey]]) -> List[ReliableMessage]:
+        return await self._gather(self.sign(msg, key) for msg, key in items)
+
+    #
+    #   Reliable Message -> Secure Message
+    #
+
+    async def verify(self, msg: ReliableMessage, keys: List[VerifyKey]) -> Optional[SecureMessage]:
+        """
+        Verify message data with sender's public keys (meta.key, visa.key, ...)
+
+        :param msg:  reliable message
+        :param keys: sender's public keys
+        :return: secure message, None on signature not matched
+        """
+        info = await self._run(verify_message, msg, keys)
+        if info is not None:
+            return SecureMessage.parse(msg=info)
+
+    async def verify_messages(self, items: Iterable[Tuple[ReliableMessage, List[VerifyKey]]]
+                              ) -> List[Optional[SecureMessage]]:
+        return await self._gather(self.verify(msg, keys) for msg, keys in items)
+
+    #
+    #   Secure Message -> Instant Message
+    #
+
+    async def decrypt(self, msg: SecureMessage, receiver: str, keys: List[DecryptKey],
+                      password: Optional[SymmetricKey] = None) -> Optional[InstantMessage]:
+        """
+        Decrypt password with receiver's private keys, and decrypt content with password
+
+        :param msg:      secure message
+        :param receiver: receiver ID (the index of 'keys' in message)
+        :param keys:     receiver's private keys
+        :param password: reused symmetric key (when 'keys' not in message)
+        :return: instant message, None on failed
+        """
+        info = await self._run(decrypt_message, msg, receiver, keys, password)
+        if info is not None:
+            return InstantMessage.parse(msg=info)
+
+    async def decrypt_messages(self, items: Iterable[Tuple[SecureMessage, str, List[DecryptKey],
+                                                           Optional[SymmetricKey]]]
+                               ) -> List[Optional[InstantMessage]]:
+        return await self._gather(self.decrypt(msg, receiver, keys, password)
+                                  for msg, receiver, keys, password in items)
+
+
+#
+#   Blocking transforms (run in executor)
+#
+
+
+def encrypt_message(msg: InstantMessage, password: SymmetricKey,
+                    keys: Optional[Dict[str, EncryptKey]],
+                    compressor: Optional[ContentCompressor] = None) -> Dict:
+    body = msg.content.to_dict()
+    info = msg.copy_dict()
+    info.pop('content', None)
+    broadcast = BaseMessage.is_broadcast(msg=msg)
+    # 1. data = password.encrypt(content)
+    plaintext = utf8_encode(string=json_encode(container=body))
+    if compressor is not None and not broadcast:
+        # broadcast message data should be readable JsON
+        # the algorithm is flagged inside the payload
+        plaintext, _ = compressor.compress(plaintext)
+    ciphertext = password.encrypt(plaintext, extra=info)
+    if broadcast:
+        # broadcast message content will not be encrypted (just encoded to JsON)
+        ted = PlainData.create(binary=ciphertext)
+    else:
+        ted = Base64Data.create(binary=ciphertext)
+    info['data'] = ted.serialize()
+    if keys is None:
+        # broadcast message, or reused key
+        return info
+    # 2. key = receiver.public_key.encrypt(password)
+    pwd = utf8_encode(string=json_encode(container=password.to_dict()))
+    encrypted_keys = {}
+    for receiver, key in keys.items():
+        data = key.encrypt(pwd, extra=info)
+        encrypted_keys[str(receiver)] = Base64Data.create(binary=data).serialize()
+    info['keys'] = encrypted_keys
+    return info
+
+
+def sign_message(msg: SecureMessage, key: SignKey) -> Dict:
+    # signature = sender.private_key.sign(data)
+    data = msg.data.to_bytes()
+    signature = key.sign(data)
+    info = msg.copy_dict()
+    info['signature'] = Base64Data.create(binary=signature).serialize()
+    return info
+
+
+def verify_message(msg: ReliableMessage, keys: List[VerifyKey]) -> Optional[Dict]:
+    data = msg.data.to_bytes()
+    signature = msg.signature.to_bytes()
+    if data is None or signature is None:
+        return None
+    for key in keys:
+        if shared_signature_verifier.verify(key=key, data=data, signature=signature):
+            info = msg.copy_dict()
+            info.pop('signature', None)
+            return info
+
+
+def decrypt_message(msg: SecureMessage, receiver: str, keys: List[DecryptKey],
+                    password: Optional[SymmetricKey]) -> Optional[Dict]:
+    info = msg.copy_dict()
+    # 1. password = receiver.private_key.decrypt(key)
+    encrypted_keys = msg.encrypted_keys
+    if encrypted_keys is not None:
+        ted = TransportableData.parse(encrypted_keys.get(str(receiver)))
+        data = None if ted is None else ted.to_bytes()
+        if data is None:
+            return None
+        pwd = None
+        for key in keys:
+            pwd = key.decrypt(data, params=info)
+            if pwd is not None:
+                break
+        if pwd is None:
+            return None
+        password = SymmetricKey.parse(key=_decode_map(data=pwd))
+    if password is None:
+        return None
+    # 2. content = password.decrypt(data)
+    plaintext = password.decrypt(msg.data.to_bytes(), params=info)
+    if plaintext is None:
+        return None
+    plaintext = decompress_content(plaintext)
+    if plaintext is None:
+        return None
+    body = _decode_map(data=plaintext)
+    if body is None or Content.parse(content=body) is None:
+        return None
+    info.pop('data', None)
+    info.pop('key', None)
+    info.pop('keys', None)
+    info['content'] = body
+    return info
+
+
+def _decode_map(data: bytes) -> Optional[Dict]:
+    """ Decode JsON object, None on error """
+    try:
+        info = json_decode(string=utf8_decode(data=data))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if isinstance(info, Dict):
+        return info
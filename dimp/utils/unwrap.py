@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Forward Unwrapping
+    ~~~~~~~~~~~~~~~~~~
+
+    Verify & decrypt secret messages in a forward chain concurrently,
+    yielding the results lazily in the original order.
+"""
+
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Callable, Iterator, Iterable, Any, List, Dict
+
+from dkd.protocol import InstantMessage, ReliableMessage
+
+from ..protocol import ForwardContent
+
+
+# verify & decrypt a secret message, return None on invalid
+Unwrap = Callable[[ReliableMessage], Optional[InstantMessage]]
+
+
+def raw_secrets(content: ForwardContent) -> List[Any]:
+    """ Get raw secret messages from 'secrets' or 'forward', without parsing """
+    array = content.get('secrets')
+    if isinstance(array, List):
+        return array
+    assert array is None, f'secret messages error: {array}'
+    forward = content.get('forward')
+    return [] if forward is None else [forward]
+
+
+class ForwardUnwrapper:
+    """
+        Forward Unwrap Pipeline
+        ~~~~~~~~~~~~~~~~~~~~~~~
+
+        1. parse secrets lazily (only when submitting to the pool);
+        2. verify & decrypt secrets concurrently, with bounded in-flight jobs;
+        3. yield instant messages in order, unwrapping nested forwards recursively;
+        4. stop on the first invalid secret.
+    """
+
+    def __init__(self, unwrap: Unwrap, executor: Optional[Executor] = None,
+                 max_workers: int = 4, max_depth: int = 4, window: int = 0):
+        """
+        Create forward unwrapper
+
+        :param unwrap:      function to verify & decrypt a reliable message
+        :param executor:    worker pool (a thread pool will be created if empty)
+        :param max_workers: size of the default thread pool
+        :param max_depth:   max levels of nested forwards
+        :param window:      max in-flight jobs (2 * max_workers as default)
+        """
+        super().__init__()
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='unwrap')
+        if window <= 0:
+            window = max_workers * 2
+        self.__unwrap = unwrap
+        self.__executor = executor
+        self.__max_depth = max_depth
+        self.__window = window
+
+    @property
+    def executor(self) -> Executor:
+        return self.__executor
+
+    def shutdown(self, wait: bool = True):
+        self.__executor.shutdown(wait=wait)
+
+    def unwrap(self, content: ForwardContent) -> 'SecretIterator':
+        """ Unwrap secrets in forward content """
+        return SecretIterator(unwrapper=self, secrets=raw_secrets(content=content))
+
+    def unwrap_messages(self, secrets: Iterable[Any]) -> 'SecretIterator':
+        """ Unwrap secrets (reliable messages or their dictionaries) """
+        return SecretIterator(unwrapper=self, secrets=secrets)
+
+    # protected
+    def _process(self, secret: Any) -> Optional[InstantMessage]:
+        if isinstance(secret, ReliableMessage):
+            msg = secret
+        else:
+            msg = ReliableMessage.parse(msg=secret)
+            if msg is None:
+                return None
+        return self.__unwrap(msg)
+
+    # protected
+    def _iterate(self, secrets: Iterable[Any], depth: int, errors: List[Dict]) -> Iterator[InstantMessage]:
+        executor = self.__executor
+        window = self.__window
+        pending = deque()
+        source = iter(secrets)
+        index = 0
+        exhausted = False
+        try:
+            while True:
+                # keep the pool busy
+                while not exhausted and len(pending) < window:
+                    try:
+                        secret = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append((index, secret, executor.submit(self._process, secret)))
+                    index += 1
+                if len(pending) == 0:
+                    break
+                # wait for the head job to keep the order
+                pos, secret, future = pending.popleft()
+                try:
+                    msg = future.result()
+                except Exception as error:
+                    errors.append({'depth': depth, 'index': pos, 'secret': secret, 'error': error})
+                    return
+                if msg is None:
+                    errors.append({'depth': depth, 'index': pos, 'secret': secret, 'error': None})
+                    return
+                body = msg.content
+                if not isinstance(body, ForwardContent):
+                    yield msg
+                elif depth < self.__max_depth:
+                    # nested forward
+                    yield from self._iterate(secrets=raw_secrets(content=body), depth=depth + 1, errors=errors)
+                    if len(errors) > 0:
+                        return
+                else:
+                    errors.append({'depth': depth, 'index': pos, 'secret': secret, 'error': 'too deep'})
+                    return
+        finally:
+            # stop early, drop jobs not started yet
+            for _, _, future in pending:
+                future.cancel()
+
+
+class SecretIterator:
+    """ Lazy iterator of unwrapped messages """
+
+    def __init__(self, unwrapper: ForwardUnwrapper, secrets: Iterable[Any]):
+        super().__init__()
+        self.__unwrapper = unwrapper
+        self.__secrets = secrets
+        self.__errors: List[Dict] = []
+
+    @property
+    def error(self) -> Optional[Dict]:
+        """ The first invalid secret: { depth, index, secret, error } """
+        errors = self.__errors
+        if len(errors) > 0:
+            return errors[0]
+
+    def __iter__(self) -> Iterator[InstantMessage]:
+        self.__errors.clear()
+        return self.__unwrapper._iterate(secrets=self.__secrets, depth=1, errors=self.__errors)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Hashed Timing Wheel
+    ~~~~~~~~~~~~~~~~~~~
+
+    Schedule, cancel and expire timers in O(1) amortized time,
+    for huge numbers of pending items (in-flight messages, offline queues, ...)
+"""
+
+import time
+from typing import Optional, Any, List, Dict, Hashable
+
+
+class TimingWheel:
+    """
+        Hashed Timing Wheel
+        ~~~~~~~~~~~~~~~~~~~
+
+        Timers are hashed into a ring of slots by their due tick;
+        timers further than one revolution away keep a 'rounds' counter.
+
+            slot = (due_tick) % wheel_size
+    """
+
+    def __init__(self, tick: float = 1.0, size: int = 512, now: Optional[float] = None):
+        """
+        Create timing wheel
+
+        :param tick: seconds per slot
+        :param size: number of slots
+        :param now:  start time (seconds)
+        """
+        super().__init__()
+        assert tick > 0 and size > 0, f'timing wheel error: {tick}, {size}'
+        if now is None:
+            now = time.time()
+        self.__tick = tick
+        self.__slots: List[Dict[Hashable, Any]] = [{} for _ in range(size)]
+        self.__current = int(now / tick)  # last processed tick
+        # key => (slot index, due tick)
+        self.__timers: Dict[Hashable, tuple] = {}
+
+    @property
+    def tick(self) -> float:
+        return self.__tick
+
+    def __len__(self) -> int:
+        return len(self.__timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__timers
+
+    def schedule(self, key: Hashable, when: float, value: Any = None):
+        """
+        Schedule (or re-schedule) a timer
+
+        :param key:   timer key
+        :param when:  expiring time (seconds)
+        :param value: user data returned when expired
+        """
+        self.cancel(key=key)
+        due = int(when / self.__tick)
+        if due <= self.__current:
+            # expired already, fire on next advance
+            due = self.__current + 1
+        slots = self.__slots
+        index = due % len(slots)
+        slots[index][key] = value
+        self.__timers[key] = (index, due)
+
+    def cancel(self, key: Hashable) -> Optional[Any]:
+        """ Remove timer, return its user data """
+        pos = self.__timers.pop(key, None)
+        if pos is not None:
+            return self.__slots[pos[0]].pop(key, None)
+
+    def expiring_time(self, key: Hashable) -> Optional[float]:
+        """ Get due time of the timer """
+        pos = self.__timers.get(key)
+        if pos is not None:
+            return pos[1] * self.__tick
+
+    def advance(self, now: Optional[float] = None) -> List[tuple]:
+        """
+        Move the wheel to current time
+
+        :param now: current time (seconds)
+        :return: expired timers as (key, value) pairs, in due order
+        """
+        if now is None:
+            now = time.time()
+        target = int(now / self.__tick)
+        current = self.__current
+        if target <= current:
+            return []
+        slots = self.__slots
+        size = len(slots)
+        timers = self.__timers
+        expired = []
+        if target - current > size:
+            # idle for more than one revolution, visit each slot only once
+            steps = range(current + 1, current + 1 + size)
+        else:
+            steps = range(current + 1, target + 1)
+        for step in steps:
+            bucket = slots[step % size]
+            if len(bucket) == 0:
+                continue
+            fired = [key for key in bucket if timers[key][1] <= target]
+            for key in fired:
+                due = timers.pop(key)[1]
+                expired.append((due, key, bucket.pop(key)))
+        self.__current = target
+        if target - current > size:
+            expired.sort(key=lambda item: item[0])
+        return [(key, value) for _, key, value in expired]
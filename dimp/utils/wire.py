@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+#
+#   DIMP : Decentralized Instant Messaging Protocol
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Wire Codecs
+    ~~~~~~~~~~~
+
+    Serialize reliable/secure messages & documents for the network,
+    JsON as default, or a compact binary map (MessagePack format) which
+    carries 'data', 'signature', 'key(s)' & 'fingerprint' as raw bytes
+    instead of base64 strings.
+
+    Both sides offer the codec names they support when connecting,
+    and the first name acceptable by both is used on that connection.
+"""
+
+import struct
+import binascii
+from abc import ABC, abstractmethod
+from typing import Optional, Any, List, Dict, Union
+
+from mkm.format import json_encode, json_decode
+from mkm.format import utf8_encode, utf8_decode
+
+from ..protocol import Document, SecureMessage, ReliableMessage
+
+try:
+    # optional C extension, same bytes as the pure python packer below
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class WireCodec(ABC):
+    """ Message/document serializer for one connection """
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """ codec name for negotiation """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.name getter'
+        )
+
+    @abstractmethod
+    def encode(self, info: Dict) -> bytes:
+        """ Serialize a message/document map """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.encode()'
+        )
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Optional[Dict]:
+        """ Deserialize a message/document map, it's the same as the JsON form """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.decode()'
+        )
+
+    #
+    #   Messages & Documents
+    #
+
+    def encode_message(self, msg: SecureMessage) -> bytes:
+        return self.encode(info=msg.to_dict())
+
+    def decode_message(self, data: bytes) -> Union[SecureMessage, ReliableMessage, None]:
+        """ Reliable message if signed, else secure message """
+        info = self.decode(data=data)
+        if info is None:
+            return None
+        elif 'signature' in info:
+            return ReliableMessage.parse(msg=info)
+        else:
+            return SecureMessage.parse(msg=info)
+
+    def encode_document(self, doc: Document) -> bytes:
+        return self.encode(info=doc.to_dict())
+
+    def decode_document(self, data: bytes) -> Optional[Document]:
+        info = self.decode(data=data)
+        if info is not None:
+            return Document.parse(document=info)
+
+
+class JSONWireCodec(WireCodec):
+    """ JsON (UTF-8) """
+
+    @property  # Override
+    def name(self) -> str:
+        return 'json'
+
+    # Override
+    def encode(self, info: Dict) -> bytes:
+        return utf8_encode(string=json_encode(container=info))
+
+    # Override
+    def decode(self, data: bytes) -> Optional[Dict]:
+        info = json_decode(string=utf8_decode(data=data))
+        if isinstance(info, Dict):
+            return info
+
+
+class PackWireCodec(WireCodec):
+    """
+        MessagePack with raw byte fields
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        Base64 strings in byte fields are packed as 'bin', and decoded back
+        to the same base64 strings, so the result equals the JsON form.
+        A value that is not canonical base64 (plaintext 'data' of broadcast
+        message, data URI, ...) is packed as 'str' without change.
+    """
+
+    # values in these fields (of any nested map) are raw bytes
+    BYTE_FIELDS = {'data', 'signature', 'key', 'fingerprint'}
+    # values in these maps are raw bytes: {'keys': {ID: base64}}
+    BYTE_MAPS = {'keys'}
+
+    @property  # Override
+    def name(self) -> str:
+        return 'msgpack'
+
+    # Override
+    def encode(self, info: Dict) -> bytes:
+        return msgpack_encode(obj=self._to_binary(info))
+
+    # Override
+    def decode(self, data: bytes) -> Optional[Dict]:
+        try:
+            info = msgpack_decode(data=data)
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError):
+            return None
+        if isinstance(info, Dict):
+            return _to_base64(info)
+
+    # protected
+    def _to_binary(self, info: Dict) -> Dict:
+        byte_fields = self.BYTE_FIELDS
+        byte_maps = self.BYTE_MAPS
+        result = {}
+        for key, value in info.items():
+            if isinstance(value, str):
+                if key in byte_fields:
+                    value = _from_base64(value)
+            elif isinstance(value, Dict):
+                if key in byte_maps:
+                    value = {k: _from_base64(v) if isinstance(v, str) else v for k, v in value.items()}
+                else:
+                    value = self._to_binary(value)
+            result[key] = value
+        return result
+
+
+def _from_base64(text: str) -> Union[bytes, str]:
+    """ raw bytes if text is canonical base64, else text itself """
+    try:
+        data = binascii.a2b_base64(text)
+    except (binascii.Error, ValueError):
+        return text
+    if binascii.b2a_base64(data, newline=False).decode('ascii') == text:
+        return data
+    return text
+
+
+def _to_base64(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return binascii.b2a_base64(value, newline=False).decode('ascii')
+    elif isinstance(value, Dict):
+        return {k: _to_base64(v) for k, v in value.items()}
+    elif isinstance(value, List):
+        return [_to_base64(v) for v in value]
+    return value
+
+
+class WireNegotiator:
+    """ Choose codec for a connection """
+
+    def __init__(self, codecs: List[WireCodec] = None):
+        super().__init__()
+        if codecs is None:
+            codecs = [PackWireCodec(), JSONWireCodec()]
+        self.__codecs = codecs  # in order of preference
+
+    @property
+    def offers(self) -> List[str]:
+        """ codec names to send to the remote peer """
+        return [codec.name for codec in self.__codecs]
+
+    def get_codec(self, name: str) -> Optional[WireCodec]:
+        for codec in self.__codecs:
+            if codec.name == name:
+                return codec
+
+    def select(self, offers: Optional[List[str]]) -> WireCodec:
+        """
+        Choose the first local codec also offered by the remote peer
+
+        :param offers: codec names from remote peer, None for old clients
+        :return: JsON codec when no common one
+        """
+        if offers is not None:
+            for codec in self.__codecs:
+                if codec.name in offers:
+                    return codec
+        codec = self.get_codec(name='json')
+        return JSONWireCodec() if codec is None else codec
+
+
+"""
+    MessagePack
+    ~~~~~~~~~~~
+
+    Subset for message maps: nil, bool, int, float, str, bin, array & map,
+    uses the 'msgpack' package when it's installed.
+"""
+
+
+def msgpack_encode(obj: Any) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    buffer = bytearray()
+    _pack(obj, buffer)
+    return bytes(buffer)
+
+
+def msgpack_decode(data: bytes) -> Any:
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    obj, offset = _unpack(data, 0)
+    if offset != len(data):
+        raise ValueError('extra bytes after msgpack object: %d' % (len(data) - offset))
+    return obj
+
+
+def _pack(obj: Any, buffer: bytearray):
+    if obj is None:
+        buffer.append(0xc0)
+    elif obj is True:
+        buffer.append(0xc3)
+    elif obj is False:
+        buffer.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, buffer)
+    elif isinstance(obj, float):
+        buffer.append(0xcb)
+        buffer += struct.pack('>d', obj)
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        _pack_head(len(data), buffer, fix=0xa0, fix_max=31, codes=(0xd9, 0xda, 0xdb))
+        buffer += data
+    elif isinstance(obj, (bytes, bytearray)):
+        _pack_head(len(obj), buffer, fix=None, fix_max=-1, codes=(0xc4, 0xc5, 0xc6))
+        buffer += obj
+    elif isinstance(obj, (list, tuple)):
+        _pack_head(len(obj), buffer, fix=0x90, fix_max=15, codes=(None, 0xdc, 0xdd))
+        for item in obj:
+            _pack(item, buffer)
+    elif isinstance(obj, Dict):
+        _pack_head(len(obj), buffer, fix=0x80, fix_max=15, codes=(None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack(key, buffer)
+            _pack(value, buffer)
+    else:
+        raise TypeError('cannot pack type: %s' % type(obj))
+
+
+def _pack_head(size: int, buffer: bytearray, fix: Optional[int], fix_max: int, codes: tuple):
+    if size <= fix_max:
+        buffer.append(fix | size)
+    elif size <= 0xff and codes[0] is not None:
+        buffer.append(codes[0])
+        buffer.append(size)
+    elif size <= 0xffff:
+        buffer.append(codes[1])
+        buffer += struct.pack('>H', size)
+    elif size <= 0xffffffff:
+        buffer.append(codes[2])
+        buffer += struct.pack('>I', size)
+    else:
+        raise ValueError('object too large: %d' % size)
+
+
+def _pack_int(value: int, buffer: bytearray):
+    if 0 <= value <= 0x7f:
+        buffer.append(value)
+    elif -32 <= value < 0:
+        buffer.append(value & 0xff)
+    elif value > 0:
+        if value <= 0xff:
+            buffer.append(0xcc)
+            buffer.append(value)
+        elif value <= 0xffff:
+            buffer.append(0xcd)
+            buffer += struct.pack('>H', value)
+        elif value <= 0xffffffff:
+            buffer.append(0xce)
+            buffer += struct.pack('>I', value)
+        elif value <= 0xffffffffffffffff:
+            buffer.append(0xcf)
+            buffer += struct.pack('>Q', value)
+        else:
+            raise ValueError('integer too large: %d' % value)
+    elif value >= -0x80:
+        buffer.append(0xd0)
+        buffer += struct.pack('>b', value)
+    elif value >= -0x8000:
+        buffer.append(0xd1)
+        buffer += struct.pack('>h', value)
+    elif value >= -0x80000000:
+        buffer.append(0xd2)
+        buffer += struct.pack('>i', value)
+    elif value >= -0x8000000000000000:
+        buffer.append(0xd3)
+        buffer += struct.pack('>q', value)
+    else:
+        raise ValueError('integer too small: %d' % value)
+
+
+# type code => (struct format, size)
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+
+# type code => size of length field
+_STR = {0xd9: 1, 0xda: 2, 0xdb: 4}
+_BIN = {0xc4: 1, 0xc5: 2, 0xc6: 4}
+_ARRAY = {0xdc: 2, 0xdd: 4}
+_MAP = {0xde: 2, 0xdf: 4}
+
+
+def _read_size(data: bytes, offset: int, width: int):
+    end = offset + width
+    if end > len(data):
+        raise ValueError('msgpack data truncated')
+    return int.from_bytes(data[offset:end], 'big'), end
+
+
+def _unpack(data: bytes, offset: int):
+    code = data[offset]
+    offset += 1
+    if code <= 0x7f:
+        return code, offset
+    elif code >= 0xe0:
+        return code - 0x100, offset
+    elif 0xa0 <= code <= 0xbf:
+        return _unpack_str(data, offset, code & 0x1f)
+    elif 0x90 <= code <= 0x9f:
+        return _unpack_array(data, offset, code & 0x0f)
+    elif 0x80 <= code <= 0x8f:
+        return _unpack_map(data, offset, code & 0x0f)
+    elif code == 0xc0:
+        return None, offset
+    elif code == 0xc2:
+        return False, offset
+    elif code == 0xc3:
+        return True, offset
+    fixed = _FIXED.get(code)
+    if fixed is not None:
+        fmt, size = fixed
+        return struct.unpack_from(fmt, data, offset)[0], offset + size
+    width = _STR.get(code)
+    if width is not None:
+        size, offset = _read_size(data, offset, width)
+        return _unpack_str(data, offset, size)
+    width = _BIN.get(code)
+    if width is not None:
+        size, offset = _read_size(data, offset, width)
+        end = offset + size
+        if end > len(data):
+            raise ValueError('msgpack data truncated')
+        return data[offset:end], end
+    width = _ARRAY.get(code)
+    if width is not None:
+        size, offset = _read_size(data, offset, width)
+        return _unpack_array(data, offset, size)
+    width = _MAP.get(code)
+    if width is not None:
+        size, offset = _read_size(data, offset, width)
+        return _unpack_map(data, offset, size)
+    raise ValueError('unsupported msgpack type: 0x%02x' % code)
+
+
+def _unpack_str(data: bytes, offset: int, size: int):
+    end = offset + size
+    if end > len(data):
+        raise ValueError('msgpack data truncated')
+    return data[offset:end].decode('utf-8'), end
+
+
+def _unpack_array(data: bytes, offset: int, size: int):
+    array = []
+    for _ in range(size):
+        item, offset = _unpack(data, offset)
+        array.append(item)
+    return array, offset
+
+
+def _unpack_map(data: bytes, offset: int, size: int):
+    info = {}
+    for _ in range(size):
+        key, offset = _unpack(data, offset)
+        value, offset = _unpack(data, offset)
+        info[key] = value
+    return info, offset
@@ -0,0 +1,213 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Chunked File Transfer
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Upload & download chunks through HTTPChunkTransport against a local
+    HTTP server stand-in (PUT/GET in memory), with failing requests.
+
+    NOTICE: codecs, keys & factories come from 'dimplugins', install it first.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimp import FileContent, SymmetricKey, SymmetricAlgorithms
+from dimp.utils import HTTPChunkTransport, ChunkManifest, ChunkedTransfer
+
+
+class Storage:
+
+    def __init__(self):
+        super().__init__()
+        self.files = {}
+        self.fail = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def failing(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            if random.random() < self.fail:
+                self.failures += 1
+                return True
+        return False
+
+
+def handler_class(storage: Storage):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_PUT(self):
+            data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if storage.failing():
+                self.send_response(503)
+            else:
+                storage.files[self.path] = data
+                self.send_response(201)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            data = storage.files.get(self.path)
+            if storage.failing():
+                self.send_response(503)
+                data = b''
+            elif data is None:
+                self.send_response(404)
+                data = b''
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def resume(run, limit: int = 50) -> int:
+    """ call until succeeded, return rounds """
+    for rounds in range(1, limit + 1):
+        if run():
+            return rounds
+    raise AssertionError(f'not completed in {limit} rounds')
+
+
+class TestChunkedTransfer(unittest.TestCase):
+
+    CHUNK_SIZE = 64 * 1024
+
+    @classmethod
+    def setUpClass(cls):
+        ExtensionLoader().load()
+        PluginLoader().load()
+        cls.storage = Storage()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class(storage=cls.storage))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = 'http://127.0.0.1:%d/files' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        random.seed(1189795)
+        self.storage.files.clear()
+        self.storage.fail = 0.0
+        self.storage.requests = self.storage.failures = 0
+        self.transfer = ChunkedTransfer(transport=HTTPChunkTransport(base_url=self.base_url),
+                                        chunk_size=self.CHUNK_SIZE, max_workers=4)
+        self.data = os.urandom(self.CHUNK_SIZE * 20 + 1234)
+        self.folder = tempfile.mkdtemp()
+        self.target = os.path.join(self.folder, 'video.mp4')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def read_target(self) -> bytes:
+        with open(self.target, 'rb') as file:
+            return file.read()
+
+    def upload(self) -> ChunkManifest:
+        manifest = self.transfer.upload(data=self.data, filename='video.mp4')
+        self.assertTrue(manifest.completed)
+        return manifest
+
+    def test_round_trip(self):
+        manifest = self.upload()
+        self.assertEqual(len(manifest.chunks), 21)
+        self.assertTrue(self.transfer.download(manifest=manifest, path=self.target))
+        self.assertEqual(self.read_target(), self.data)
+        self.assertFalse(os.path.exists(self.target + '.part'))
+        self.assertFalse(os.path.exists(self.target + '.part.done'))
+
+    def test_resume_upload(self):
+        self.storage.fail = 0.3
+        state = {'manifest': None}
+
+        def upload() -> bool:
+            state['manifest'] = self.transfer.upload(data=self.data, filename='video.mp4',
+                                                     manifest=state['manifest'])
+            return state['manifest'].completed
+
+        rounds = resume(upload)
+        self.assertGreater(rounds, 1)
+        self.storage.fail = 0.0
+        self.assertTrue(self.transfer.download(manifest=state['manifest'], path=self.target))
+        self.assertEqual(self.read_target(), self.data)
+
+    def test_resume_download(self):
+        manifest = self.upload()
+        self.storage.fail = 0.3
+        self.storage.requests = self.storage.failures = 0
+        rounds = resume(lambda: self.transfer.download(manifest=manifest, path=self.target))
+        self.assertGreater(rounds, 1)
+        self.assertEqual(self.read_target(), self.data)
+        # verified chunks are never downloaded again
+        self.assertEqual(self.storage.requests - self.storage.failures, len(manifest.chunks))
+
+    def test_corrupted_chunk(self):
+        manifest = self.upload()
+        url = manifest.chunks[0]['URL']
+        key = url[url.index('/files'):]
+        good = self.storage.files[key]
+        self.storage.files[key] = b'x' + good[1:]
+        self.assertFalse(self.transfer.download(manifest=manifest, path=self.target))
+        # kept for resuming
+        self.assertTrue(os.path.exists(self.target + '.part'))
+        self.storage.files[key] = good
+        self.storage.requests = 0
+        self.assertTrue(self.transfer.download(manifest=manifest, path=self.target))
+        self.assertEqual(self.storage.requests, 1)
+        self.assertEqual(self.read_target(), self.data)
+
+    def test_file_digest_mismatch(self):
+        manifest = self.upload()
+        manifest['digest'] = '00' * 32
+        self.assertFalse(self.transfer.download(manifest=manifest, path=self.target))
+        self.assertFalse(os.path.exists(self.target + '.part'))
+        self.assertFalse(os.path.exists(self.target))
+
+    def test_file_content(self):
+        password = SymmetricKey.generate(algorithm=SymmetricAlgorithms.AES)
+        params = password.to_dict().copy()
+        encrypted = password.encrypt(self.data, extra=params)
+        content = FileContent.video(filename='video.mp4', password=password)
+        manifest = self.transfer.upload_content(content=content, data=encrypted)
+        self.assertTrue(manifest.completed)
+        url = content.url
+        self.assertTrue(ChunkManifest.is_manifest_url(url=url))
+        # sent as PNF in the content
+        info = content.to_dict()
+        self.assertEqual(info.get('URL'), url)
+        self.assertNotIn('data', info)
+        received = FileContent.parse(content=info)
+        self.assertTrue(self.transfer.download_content(content=received, path=self.target))
+        self.assertEqual(received.password.decrypt(self.read_target(), params=params), self.data)
+
+    def test_not_chunked(self):
+        content = FileContent.file(filename='a.txt', url='https://example.com/a.txt')
+        self.assertFalse(ChunkManifest.is_manifest_url(url=content.url))
+        self.assertFalse(self.transfer.download_content(content=content, path=self.target))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+    Receiver Routing
+    ~~~~~~~~~~~~~~~~
+
+    Simulate station nodes locally and check the routing table: stable
+    lookups, which receivers move when nodes join or leave, replica sets,
+    and terminal affinity.
+"""
+
+import os
+import sys
+import unittest
+
+path = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, os.path.dirname(path))
+
+from dimp.utils import RoutingTable
+
+
+def receivers(count: int) -> list:
+    return ['user%d@4DnqXWdTV8wuZgfqSCX9GjE2kNq7HJrUg%d' % (index, index % 10) for index in range(count)]
+
+
+def assignment(table: RoutingTable, ids: list) -> dict:
+    return dict(zip(ids, table.lookup_batch(identifiers=ids)))
+
+
+class TestRoutingTable(unittest.TestCase):
+
+    NODES = ['station%d' % index for index in range(8)]
+
+    def setUp(self):
+        self.ids = receivers(20000)
+
+    def test_empty(self):
+        table = RoutingTable()
+        self.assertIsNone(table.lookup(identifier=self.ids[0]))
+        self.assertEqual(table.lookup_batch(identifiers=self.ids[:3]), [None, None, None])
+        self.assertEqual(table.lookup_replicas(identifier=self.ids[0], count=2), [])
+        self.assertEqual(table.route_messages(messages=[{'receiver': self.ids[0]}]), {})
+
+    def test_stable_lookup(self):
+        table = RoutingTable(nodes=self.NODES)
+        other = RoutingTable(nodes=list(reversed(self.NODES)), cache_size=0)
+        before = assignment(table=table, ids=self.ids)
+        # same ring in other table (node order & cache don't matter)
+        self.assertEqual(before, assignment(table=other, ids=self.ids))
+        # single lookups, repeated (cached) ones agree with batch lookup
+        for identifier in self.ids[:1000]:
+            self.assertEqual(table.lookup(identifier=identifier), before[identifier])
+            self.assertEqual(table.lookup(identifier=identifier), before[identifier])
+        # every node gets a share
+        loads = {node: 0 for node in self.NODES}
+        for node in before.values():
+            loads[node] += 1
+        expected = len(self.ids) / len(self.NODES)
+        for node, load in loads.items():
+            self.assertGreater(load, expected * 0.7, node)
+            self.assertLess(load, expected * 1.3, node)
+
+    def test_node_join(self):
+        table = RoutingTable(nodes=self.NODES)
+        before = assignment(table=table, ids=self.ids)
+        table.add_node(node='station8')
+        after = assignment(table=table, ids=self.ids)
+        moved = [key for key in self.ids if before[key] != after[key]]
+        # only receivers taken by the new node move
+        for key in moved:
+            self.assertEqual(after[key], 'station8')
+        ratio = len(moved) / len(self.ids)
+        self.assertGreater(ratio, 1 / 9 * 0.7)
+        self.assertLess(ratio, 1 / 9 * 1.3)
+
+    def test_node_leave(self):
+        table = RoutingTable(nodes=self.NODES)
+        before = assignment(table=table, ids=self.ids)
+        self.assertTrue(table.remove_node(node='station3'))
+        self.assertFalse(table.remove_node(node='station3'))
+        after = assignment(table=table, ids=self.ids)
+        for key in self.ids:
+            if before[key] == 'station3':
+                self.assertNotEqual(after[key], 'station3')
+            else:
+                # receivers of other nodes stay
+                self.assertEqual(after[key], before[key])
+        # joins back, all return
+        table.add_node(node='station3')
+        self.assertEqual(assignment(table=table, ids=self.ids), before)
+
+    def test_node_weight(self):
+        table = RoutingTable(nodes=['s1', 's2'])
+        table.add_node(node='s2', weight=3)
+        nodes = table.lookup_batch(identifiers=self.ids)
+        ratio = nodes.count('s2') / len(nodes)
+        self.assertGreater(ratio, 0.65)
+        self.assertLess(ratio, 0.85)
+
+    def test_replicas(self):
+        table = RoutingTable(nodes=self.NODES)
+        for identifier in self.ids[:1000]:
+            replicas = table.lookup_replicas(identifier=identifier, count=3)
+            self.assertEqual(len(replicas), 3)
+            self.assertEqual(len(set(replicas)), 3)
+            # owner first
+            self.assertEqual(replicas[0], table.lookup(identifier=identifier))
+            # fewer replicas are a prefix of more
+            self.assertEqual(table.lookup_replicas(identifier=identifier, count=2), replicas[:2])
+        # no more than the nodes
+        replicas = table.lookup_replicas(identifier=self.ids[0], count=20)
+        self.assertEqual(sorted(replicas), sorted(self.NODES))
+        self.assertEqual(table.lookup_replicas(identifier=self.ids[0], count=0), [])
+
+    def test_replicas_on_leave(self):
+        table = RoutingTable(nodes=self.NODES)
+        before = {key: table.lookup_replicas(identifier=key, count=3) for key in self.ids[:1000]}
+        table.remove_node(node='station5')
+        for key, replicas in before.items():
+            after = table.lookup_replicas(identifier=key, count=3)
+            # the rest keep their order, the next node fills the gap
+            rest = [node for node in replicas if node != 'station5']
+            self.assertEqual(after[:len(rest)], rest)
+            self.assertNotIn('station5', after)
+
+    def test_terminal_affinity(self):
+        table = RoutingTable(nodes=self.NODES)
+        for identifier in self.ids[:1000]:
+            node = table.lookup(identifier=identifier)
+            for terminal in ['phone', 'desktop', 'web']:
+                device = '%s/%s' % (identifier, terminal)
+                self.assertEqual(RoutingTable.route_key(identifier=device), identifier)
+                self.assertEqual(table.lookup(identifier=device), node)
+                self.assertEqual(table.lookup_batch(identifiers=[device]), [node])
+                self.assertEqual(table.lookup_replicas(identifier=device, count=2),
+                                 table.lookup_replicas(identifier=identifier, count=2))
+
+    def test_route_messages(self):
+        table = RoutingTable(nodes=self.NODES)
+        messages = [{'receiver': key} for key in self.ids[:1000]]
+        messages += [{'receiver': key + '/phone'} for key in self.ids[:100]]
+        routes = table.route_messages(messages=messages)
+        self.assertEqual(sum(len(items) for items in routes.values()), len(messages))
+        for node, items in routes.items():
+            for msg in items:
+                self.assertEqual(table.lookup(identifier=msg['receiver']), node)
+
+
+if __name__ == '__main__':
+    unittest.main()